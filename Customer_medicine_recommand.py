@@ -1,8 +1,10 @@
 import pandas as pd
+import instrumentation
+from medicine_data import load_medicine_info
 
 # 1. 데이터 불러오기
-file_path = "raw_Medicine_data/filtered_medicine_info.csv"  # 파일 경로 맞게 수정
-medicine_df = pd.read_csv(file_path)
+file_path = "data/filtered_medicine_info.csv"
+medicine_df = load_medicine_info(file_path)
 
 # 2. ATC_3 코드 → 내부 효능 카테고리 매핑
 atc3_effect_mapping = {
@@ -65,48 +67,122 @@ symptom_to_effects = {
 
 
 # 4. e약은요 링크 생성 (e_code 사용)
+E_DRUG_BASE_URL = "https://nedrug.mfds.go.kr/searchEasyDrug/easyDetail?itemSeq="
+
+
 def generate_e_drug_url(e_code):
     if pd.isna(e_code):  # e_code가 NaN이면 링크 없음 처리
         return "링크없음"
     e_code_int = int(float(e_code))  # float를 int로 변환해서 .0 완벽 제거
     e_code_str = str(e_code_int)
-    base_url = "https://nedrug.mfds.go.kr/searchEasyDrug/easyDetail?itemSeq="
-    return base_url + e_code_str
+    return E_DRUG_BASE_URL + e_code_str
+
+
+# e_code 컬럼 전체를 한 번에 링크로 변환 (generate_e_drug_url과 같은 결과)
+def generate_e_drug_urls(e_codes):
+    e_codes = e_codes.astype(float)
+    has_code = e_codes.notna()
+    urls = pd.Series("링크없음", index=e_codes.index, dtype=object)
+    urls[has_code] = E_DRUG_BASE_URL + e_codes[has_code].astype('int64').astype(str)
+    return urls
 
 
-# 5. 데이터 전처리: 효능 매핑
+# 5. 데이터 전처리: 효능 매핑 + e약은요 링크
 medicine_df['effect_category'] = medicine_df['atc_3'].map(atc3_effect_mapping)
 medicine_df['effect_category'] = medicine_df['effect_category'].fillna('기타(Other)')
+medicine_df['e약은요_링크'] = generate_e_drug_urls(medicine_df['e_code'])
 
 
 # 6. 추천 시스템 함수 (랜덤 X, 전체 출력)
-def recommend_by_symptom_grouped(symptom_keyword, data):
+def build_symptom_table(data):
+    """
+    증상 → [(효능, 해당 효능 제품 DataFrame[product_name, comp, e약은요_링크]), ...] 사전 계산
+    효능별 제품 목록은 한 번의 groupby로 만들고 증상끼리 공유 (증상/효능 매핑은 고정이므로 시작 시 한 번만 생성)
+    """
+    display_cols = ['product_name', 'comp', 'e약은요_링크']
+    if 'e약은요_링크' not in data.columns:
+        data = data.assign(**{'e약은요_링크': generate_e_drug_urls(data['e_code'])})
+    by_effect = {effect: group[display_cols] for effect, group in data.groupby('effect_category', sort=False)}
+
+    return {
+        symptom: [(effect, by_effect[effect]) for effect in effect_list if effect in by_effect]
+        for symptom, effect_list in symptom_to_effects.items()
+    }
+
+
+with instrumentation.stage("build_symptom_table"):
+    symptom_table = build_symptom_table(medicine_df)
+
+
+def find_products_by_symptom(symptom_keyword, data=None):
+    """
+    증상 키워드 → [(효능, 제품 DataFrame), ...]
+    data: effect_category 컬럼이 있는 제품 DataFrame (None 또는 medicine_df면 사전 계산된 표에서 조회)
+    등록되지 않은 증상이면 None (서비스/CLI 공용)
+    """
+    if not symptom_to_effects.get(symptom_keyword):
+        return None
+    table = symptom_table if data is None or data is medicine_df else build_symptom_table(data)
+    return table[symptom_keyword]
+
+
+def build_symptom_results(table):
+    """
+    증상 → 구조화된 결과 (JSON 변환 가능, 서비스 응답용으로 시작 시 한 번만 생성)
+    {'symptom': ..., 'effects': [{'effect': ..., 'products': [{'product_name', 'comp', 'e약은요_링크'}, ...]}, ...]}
+    """
+    return {
+        symptom: {
+            'symptom': symptom,
+            'effects': [{'effect': effect, 'products': products.to_dict(orient='records')}
+                        for effect, products in grouped],
+        }
+        for symptom, grouped in table.items()
+    }
+
+
+with instrumentation.stage("build_symptom_results"):
+    symptom_results = build_symptom_results(symptom_table)
+
+# 증상별 결과 제품 수 (조회마다 matched 카운터에 더할 값)
+symptom_product_counts = {symptom: sum(len(e['products']) for e in result['effects'])
+                          for symptom, result in symptom_results.items()}
+
+
+@instrumentation.timed()
+def recommend_by_symptom(symptom_keyword):
+    """
+    증상 키워드 → 구조화된 결과 (출력 없이 반환, 공유 객체이므로 수정하지 말 것)
+    등록되지 않은 증상이면 None
+    """
+    if not symptom_to_effects.get(symptom_keyword):
+        instrumentation.count("unknown_symptoms")
+        return None
+    instrumentation.count("products_matched", symptom_product_counts[symptom_keyword])
+    return symptom_results[symptom_keyword]
+
+
+@instrumentation.timed()
+def recommend_by_symptom_grouped(symptom_keyword, data=None):
     """
     증상 키워드 기반 복수 효능 매칭 + 효능별 전체 제품 출력 시스템
     """
-    effect_list = symptom_to_effects.get(symptom_keyword)
+    grouped = find_products_by_symptom(symptom_keyword, data)
 
-    if not effect_list:
+    if grouped is None:
         print(f"❌ '{symptom_keyword}'에 해당하는 등록된 효능이 없습니다.")
         return
 
     print(f"\n✅ '{symptom_keyword}' 관련 추천 제품 (효능별 그룹핑)\n")
 
-    for effect in effect_list:
-        matched = data[data['effect_category'] == effect].copy()  # ✅ 슬라이스 copy 추가
-
-        if matched.empty:
-            continue
-
-        matched['e약은요_링크'] = matched['e_code'].apply(generate_e_drug_url)
-
+    for effect, products in grouped:
         print(f"\n🩺 [효능: {effect}]")
-        display_cols = ['product_name', 'comp', 'e약은요_링크']
-        print(matched[display_cols].to_string(index=False))
+        print(products.to_string(index=False))
 
 
 # 7. 메인 실행
 if __name__ == "__main__":
+    instrumentation.start_run("recommend_symptom")
     print("💊 고도화된 의약품 추천 시스템에 오신 걸 환영합니다!")
 
     while True:
@@ -1,65 +1,83 @@
+import argparse
 import pandas as pd
+import instrumentation
+from ingredient_index import load_or_build
+from medicine_data import load_medicine_info
+
+# 기준 설정 (association_02의 규칙 요약 기준과 같은 기본값)
+parser = argparse.ArgumentParser(description="ATC 그룹별 최적 성분 조합 + 조합 포함 OTC 제품")
+parser.add_argument("--min-support", type=float, default=0.1, help="최소 support")
+parser.add_argument("--min-confidence", type=float, default=0.6, help="최소 confidence")
+parser.add_argument("--min-lift", type=float, default=1.5, help="최소 lift")
+parser.add_argument("--top-n", type=int, default=5, help="그룹당 최대 조합 수")
+instrumentation.add_arguments(parser)
+args = parser.parse_args()
+
+# 실행 manifest 기록 (저장 폴더 / cProfile 단계는 --manifest-dir / --profile 또는 환경 변수)
+instrumentation.start_run("optimal_combination", args)
 
 # 파일 불러오기
 rules_df = pd.read_csv("data/atc_rule_summary.csv")
-medicine_df = pd.read_csv("data/filtered_medicine_info.csv")
+medicine_df = load_medicine_info("data/filtered_medicine_info.csv")
 
-# 기준 설정
-min_support = 0.1
-min_confidence = 0.6
-min_lift = 1.5
-top_n = 5  # 각 그룹당 최대 5개
+# 성분 → 제품 번호 역색인 (한 번만 생성, 원본 변경 시에만 재생성)
+with instrumentation.stage("ingredient_index"):
+    product_index = load_or_build("data/filtered_medicine_info.csv", "data/ingredient_index.npz")
+product_names = medicine_df["product_name"].to_numpy()
+
+min_support = args.min_support
+min_confidence = args.min_confidence
+min_lift = args.min_lift
+top_n = args.top_n  # 각 그룹당 최대 조합 수
 
 results = []
 
 # 그룹별로 수행
-for atc_group in rules_df["ATC 그룹"].unique():
-    group_rules = rules_df[rules_df["ATC 그룹"] == atc_group]
+with instrumentation.stage("match"):
+    for atc_group in rules_df["ATC 그룹"].unique():
+        group_rules = rules_df[rules_df["ATC 그룹"] == atc_group]
 
-    # 조건 필터링
-    filtered = group_rules[
-        (group_rules["support"] >= min_support) &
-        (group_rules["confidence"] >= min_confidence) &
-        (group_rules["lift"] >= min_lift)
-    ].sort_values(by="lift", ascending=False)
+        # 조건 필터링
+        filtered = group_rules[
+            (group_rules["support"] >= min_support) &
+            (group_rules["confidence"] >= min_confidence) &
+            (group_rules["lift"] >= min_lift)
+        ].sort_values(by="lift", ascending=False)
 
-    seen_combos = set()
-    count = 0
+        seen_combos = set()
+        count = 0
 
-    for _, row in filtered.iterrows():
-        antecedents = set(row["Antecedents"].split(", "))
-        consequents = set(row["Consequents"].split(", "))
-        combo_set = frozenset(antecedents.union(consequents))
+        for _, row in filtered.iterrows():
+            antecedents = set(row["Antecedents"].split(", "))
+            consequents = set(row["Consequents"].split(", "))
+            combo_set = frozenset(antecedents.union(consequents))
 
-        if combo_set in seen_combos:
-            continue
+            if combo_set in seen_combos:
+                continue
 
-        seen_combos.add(combo_set)
+            seen_combos.add(combo_set)
 
-        # 조합 포함 제품 검색
-        matched = []
-        for _, prod in medicine_df.iterrows():
-            if pd.isna(prod["ing_en"]):
-                continue
-            prod_ings = set(i.strip().lower() for i in prod["ing_en"].split("/"))
-            if combo_set.issubset(prod_ings):
-                matched.append(prod["product_name"])
-
-        results.append({
-            "ATC 그룹": atc_group,
-            "조합": " + ".join(sorted(combo_set)),
-            "Lift": round(row["lift"], 3),
-            "Support": round(row["support"], 3),
-            "Confidence": round(row["confidence"], 3),
-            "사용 OTC 수": len(matched),
-            "사용 OTC 예시": ", ".join(matched[:10]) + (" ..." if len(matched) > 10 else "")
-        })
-
-        count += 1
-        if count >= top_n:
-            break
+            # 조합 포함 제품 검색 (성분별 제품 posting list 교집합, 원본 행 순서 유지)
+            matched = product_names[product_index.products_with_all(combo_set)].tolist()
+
+            results.append({
+                "ATC 그룹": atc_group,
+                "조합": " + ".join(sorted(combo_set)),
+                "Lift": round(row["lift"], 3),
+                "Support": round(row["support"], 3),
+                "Confidence": round(row["confidence"], 3),
+                "사용 OTC 수": len(matched),
+                "사용 OTC 예시": ", ".join(matched[:10]) + (" ..." if len(matched) > 10 else "")
+            })
+            instrumentation.count("combinations", 1, group=atc_group)
+            instrumentation.count("products_matched", len(matched))
+
+            count += 1
+            if count >= top_n:
+                break
 
 # 결과 저장
 final_df = pd.DataFrame(results)
 final_df.to_csv("final_optimal_combinations_groupwise.csv", index=False)
+instrumentation.record("combinations", len(final_df))
 print(final_df.head(10))
\ No newline at end of file
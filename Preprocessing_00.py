@@ -1,24 +1,12 @@
+import argparse
+import csv
 import pandas as pd
+from openpyxl import load_workbook
+import instrumentation
+from medicine_data import MEDICINE_PATH, build_cache
 
+XLSX_PATH = "raw_Medicine_data/1_의약품등제품정보목록.xlsx"
 
-## 원본 데이터 확인
-# 1번 테이블 엑셀 파일 불러오기
-file_path = "raw_Medicine_data/1_의약품등제품정보목록.xlsx"
-medicine_info = pd.read_excel(file_path)
-
-# ATC 코드 컬럼 이름 확인 (필요하면 변경)
-print("컬럼명:", medicine_info.columns.tolist())
-
-# ATC 코드별 개수 계산
-atc_column = "ATC코드"  # 실제 컬럼명을 확인하고 변경
-atc_counts = medicine_info[atc_column].value_counts()
-
-# 데이터 확인
-print("\n✅ ATC 코드별 개수")
-print(atc_counts.head(10))  # 상위 10개 출력
-
-
-## 데이터 전처리
 # 1번 데이블 속성명 변경 (한글 → 새 이름)
 column_map = {
     "품목기준코드": "product_code",
@@ -53,41 +41,143 @@ column_map = {
     "색상": "color"
 }
 
-mod_medicine_info = medicine_info.rename(columns=column_map)
-
-print("************************컬럼명 수정된 데이터 프레임 확인**************************")
-print(mod_medicine_info.head(10))
-
 # 필요한 속성만 추출
 selected_columns = [
     "product_code", "product_name", "comp", "cancel", "appr_date", "std_code", "atc",
     "ing_en", "e_code", "raw_material", "appr_type"
 ]
 
-selected_medicine_info = mod_medicine_info[selected_columns].copy()
-
-print("************************추출한 속성 데이터 프레임 확인****************************")
-print(selected_medicine_info.head())
-print(selected_medicine_info.info())
-
-## 이상치&결측치 제거
-# cancel 변수가 "정상"이고 atc 값이 존재하는 sample 필터링
-filtered_medicine_info = selected_medicine_info[
-    (selected_medicine_info["cancel"] == "정상") &
-    (selected_medicine_info["atc"].notna())
-].copy()
-
-print("************************결측치 제거 데이터 프레임 확인****************************")
-print(filtered_medicine_info.head())
-print(filtered_medicine_info.info())
-
-# ATC 코드 단계별 분리
-filtered_medicine_info["atc_1"] = filtered_medicine_info["atc"].str[0] #1단계
-filtered_medicine_info["atc_2"] = filtered_medicine_info["atc"].str[:3] #2단계
-filtered_medicine_info["atc_3"] = filtered_medicine_info["atc"].str[:4] #3단계
-filtered_medicine_info["atc_4"] = filtered_medicine_info["atc"].str[:5] #4단계
-
-# 전처리 완료된 데이터 저장(CSV)
-filtered_medicine_info.to_csv("raw_Medicine_data/filtered_medicine_info.csv", index=False)
-
-
+# ATC 코드 단계별 분리 컬럼
+ATC_LEVELS = [("atc_1", 1), ("atc_2", 3), ("atc_3", 4), ("atc_4", 5)]
+
+
+def preprocess_in_memory(file_path=XLSX_PATH, out_path=MEDICINE_PATH):
+    """엑셀 전체를 메모리에 올려서 전처리 (컬럼/결측치 확인 출력 포함)"""
+    ## 원본 데이터 확인
+    # 1번 테이블 엑셀 파일 불러오기
+    with instrumentation.stage("read_xlsx"):
+        medicine_info = pd.read_excel(file_path)
+    instrumentation.record("rows_read", len(medicine_info))
+
+    # ATC 코드 컬럼 이름 확인 (필요하면 변경)
+    print("컬럼명:", medicine_info.columns.tolist())
+
+    # ATC 코드별 개수 계산
+    atc_column = "ATC코드"  # 실제 컬럼명을 확인하고 변경
+    atc_counts = medicine_info[atc_column].value_counts()
+
+    # 데이터 확인
+    print("\n✅ ATC 코드별 개수")
+    print(atc_counts.head(10))  # 상위 10개 출력
+
+
+    ## 데이터 전처리
+    # 1번 데이블 속성명 변경 (한글 → 새 이름)
+    mod_medicine_info = medicine_info.rename(columns=column_map)
+
+    print("************************컬럼명 수정된 데이터 프레임 확인**************************")
+    print(mod_medicine_info.head(10))
+
+    # 필요한 속성만 추출
+    selected_medicine_info = mod_medicine_info[selected_columns].copy()
+
+    print("************************추출한 속성 데이터 프레임 확인****************************")
+    print(selected_medicine_info.head())
+    print(selected_medicine_info.info())
+
+    ## 이상치&결측치 제거
+    # cancel 변수가 "정상"이고 atc 값이 존재하는 sample 필터링
+    filtered_medicine_info = selected_medicine_info[
+        (selected_medicine_info["cancel"] == "정상") &
+        (selected_medicine_info["atc"].notna())
+    ].copy()
+
+    print("************************결측치 제거 데이터 프레임 확인****************************")
+    print(filtered_medicine_info.head())
+    print(filtered_medicine_info.info())
+
+    # ATC 코드 단계별 분리
+    filtered_medicine_info["atc_1"] = filtered_medicine_info["atc"].str[0] #1단계
+    filtered_medicine_info["atc_2"] = filtered_medicine_info["atc"].str[:3] #2단계
+    filtered_medicine_info["atc_3"] = filtered_medicine_info["atc"].str[:4] #3단계
+    filtered_medicine_info["atc_4"] = filtered_medicine_info["atc"].str[:5] #4단계
+
+    # 전처리 완료된 데이터 저장(CSV)
+    with instrumentation.stage("write_csv"):
+        filtered_medicine_info.to_csv(out_path, index=False)
+    instrumentation.record("rows_written", len(filtered_medicine_info))
+
+
+def _csv_value(column, value):
+    """read_excel + to_csv와 같은 형식으로 변환 (빈 문자열 = 결측치)"""
+    if value is None or value == "":
+        return ""
+    if column == "product_code":
+        return str(int(value))  # 정수 컬럼
+    if column == "e_code":
+        return repr(float(value))  # 결측치가 있어 실수 컬럼으로 저장됨 (예: 201507217.0)
+    return value
+
+
+def preprocess_streaming(file_path=XLSX_PATH, out_path=MEDICINE_PATH, chunk_size=5000):
+    """
+    엑셀을 read-only 모드로 한 행씩 읽어서 전처리 (메모리 사용량이 전체 행 수와 무관)
+    필요한 컬럼만 남기고, cancel == "정상" & ATC 코드 존재 필터와 atc_1~atc_4 분리를 행 단위로 적용
+    chunk_size 행마다 CSV에 이어쓰기
+    """
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [column_map.get(name, name) for name in next(rows)]
+        positions = [header.index(col) for col in selected_columns]
+        cancel_pos, atc_pos = header.index("cancel"), header.index("atc")
+
+        n_read, n_written = 0, 0
+        with open(out_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(selected_columns + [name for name, _ in ATC_LEVELS])
+
+            chunk = []
+            for row in rows:
+                n_read += 1
+                atc = row[atc_pos]
+                # cancel 변수가 "정상"이고 atc 값이 존재하는 sample만
+                if row[cancel_pos] != "정상" or atc is None or atc == "":
+                    continue
+                chunk.append([_csv_value(col, row[pos]) for col, pos in zip(selected_columns, positions)]
+                             + [atc[:length] for _, length in ATC_LEVELS])
+                if len(chunk) >= chunk_size:
+                    writer.writerows(chunk)
+                    n_written += len(chunk)
+                    chunk = []
+            writer.writerows(chunk)
+            n_written += len(chunk)
+    finally:
+        workbook.close()
+
+    instrumentation.record("rows_read", n_read)
+    instrumentation.record("rows_written", n_written)
+    print(f"✅ 전체 {n_read}행 중 {n_written}행 저장 완료 → {out_path}")
+    return n_written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="의약품 제품 목록 전처리")
+    parser.add_argument("--xlsx", default=XLSX_PATH, help="식약처 의약품등제품정보목록 엑셀 파일")
+    parser.add_argument("--out", default=MEDICINE_PATH, help="전처리 결과 CSV")
+    parser.add_argument("--streaming", action="store_true", help="행 단위 스트리밍 처리 (대용량 엑셀용)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="스트리밍 모드 CSV 쓰기 단위(행)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.start_run("preprocess", args)
+
+    with instrumentation.stage("preprocess"):
+        if args.streaming:
+            preprocess_streaming(args.xlsx, args.out, args.chunk_size)
+        else:
+            preprocess_in_memory(args.xlsx, args.out)
+
+    # 다른 스크립트가 공용으로 읽는 컬럼형 캐시 생성
+    # (스트리밍 모드는 전체 CSV를 다시 메모리에 올리지 않도록 생략 → 처음 load_medicine_info 호출 시 생성)
+    if not args.streaming:
+        build_cache(args.out)
@@ -1,116 +1,257 @@
-from mlxtend.preprocessing import TransactionEncoder
 from mlxtend.frequent_patterns import fpgrowth, association_rules
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+from numpy_miner import mine_itemsets_and_rules
+import argparse
+import os
+import time
+import numpy as np
 import pandas as pd
-from eda_01 import selected_groups, atc_group_cutoff
-
-# 연관 규칙 적용 결과 저장 dictionary 설정
-fp_results = {}
-rules_results = {}
-single_rules_results = {}
-multi_rules_results = {}
-
-
-for atc_code in selected_groups:
-    print(f"\n🔍 ATC 그룹: {atc_code}")
-    group_df = atc_group_cutoff[atc_group_cutoff['atc_3'] == atc_code]
-
-    # 주성분 리스트로 분리
-    transactions = group_df['ing_en'].dropna().apply(
-        lambda x: [i.strip().lower() for i in x.split('/') if i.strip()]
-    ).tolist()
-
-    if len(transactions) == 0:
-        print("⚠️ 트랜잭션 없음 → 건너뜀")
-        continue
-
-    # 전체 성분 빈도 기준 상위 50개만 사용
-    all_ingredients = [i for sublist in transactions for i in sublist]
-    top_50 = pd.Series(all_ingredients).value_counts().head(50).index.tolist()
-
-    # 원-핫 인코딩(주성분이 있으면 1, 없으면 0)
-    te = TransactionEncoder()
-    te_arr = te.fit(transactions).transform(transactions)
-    df = pd.DataFrame(te_arr, columns=te.columns_)[top_50]
-
-    # FP-Growth 실행 + 최대 조합 수 3개로 제한(일반 OTC 조합 주성분 2~3가지)
-    freq_items = fpgrowth(df, min_support=0.1, use_colnames=True, max_len=3)
-    if freq_items.empty:
-        continue
-    fp_results[atc_code] = freq_items
-
-    # 연관 규칙 추출
-    rules = association_rules(freq_items, metric="lift", min_threshold=1.0)
-    if rules.empty:
-        continue
-    rules_results[atc_code] = rules
-
-    # 단항 규칙 (1:1)
-    single_rules = rules[
-        (rules['antecedents'].apply(len) == 1) &
-        (rules['consequents'].apply(len) == 1)
-    ]
-    single_rules_results[atc_code] = single_rules
-
-    # 다항 규칙 (2+:1 or N:M)
-    multi_rules = rules[
-        (rules['antecedents'].apply(len) > 1) |
-        (rules['consequents'].apply(len) > 1)
-    ]
-    multi_rules_results[atc_code] = multi_rules
-
-    print(f"✅ 단항 {len(single_rules)}개, 다항 {len(multi_rules)}개 규칙 추출 완료")
-
-
-"""
-연관 규칙 기반 최적 조합 리스트 정리
-"""
-
-# 결과 저장용 리스트
-summary_rows = []
-
-# 기준값(하이퍼파라미터 조정할 것)
-min_support = 0.1 #최소 지지도
-min_confidence = 0.6 #최소 신뢰도
-min_lift = 1.5 #최소 향상도
-top_n = 5  # 각 그룹당 상위 5개 rule 추출
-
-for atc_code in selected_groups:
+import instrumentation
+from atc_groups import get_atc_groups
+from medicine_data import load_vocabulary
+from rule_store import write_rule_store
+
+# 규칙 요약 CSV 컬럼
+SUMMARY_COLUMNS = ['ATC 그룹', 'Antecedents', 'Consequents', 'support', 'confidence', 'lift']
+
+
+# 그룹 내 제품 주성분 id 배열 (medicine_data의 ing_ids, 주성분 결측 제품 제외)
+def extract_transactions(group_df):
+    return group_df.loc[group_df['ing_en'].notna(), 'ing_ids'].tolist()
+
+
+def encode_top_n(transactions, top_n=50, vocabulary=None):
+    """
+    전체 성분 빈도 기준 상위 top_n개 성분만 희소 행렬(CSR, bool)로 원-핫 인코딩
+    (동점은 처음 등장한 순서, 그룹 전체 vocabulary 크기의 dense 배열을 만들지 않음)
+    transactions: 주성분 id 배열 리스트, vocabulary: id → 이름 (기본: 전체 제품 목록 vocabulary)
+    반환: (CSR 행렬, 컬럼 성분 이름 리스트)
+    """
+    vocabulary = load_vocabulary() if vocabulary is None else vocabulary
+    lengths = [len(items) for items in transactions]
+    flat = np.concatenate(transactions) if transactions else np.empty(0, dtype=np.int32)
+    ids, first, counts = np.unique(flat, return_index=True, return_counts=True)
+    top_ids = ids[np.lexsort((first, -counts))[:top_n]]
+
+    col_of = np.full(len(vocabulary), -1, dtype=np.int64)
+    col_of[top_ids] = np.arange(len(top_ids))
+    rows = np.repeat(np.arange(len(transactions)), lengths)
+    cols = col_of[flat]
+    keep = cols >= 0
+    matrix = sparse.csr_matrix(
+        (np.ones(int(keep.sum()), dtype=bool), (rows[keep], cols[keep])), shape=(len(transactions), len(top_ids))
+    )
+    matrix.sum_duplicates()
+    return matrix, vocabulary.decode(top_ids)
+
+
+def mine_group(atc_code, transactions, min_support=0.1, max_len=3, top_n=50, backend="fpgrowth", vocabulary=None):
+    """
+    한 ATC 그룹의 FP-Growth + 연관 규칙 추출 (그룹끼리 독립 → 프로세스 풀에서 병렬 실행)
+    backend: "fpgrowth"(mlxtend) 또는 "numpy"(행렬곱 기반, max_len <= 3 전용)
+    반환: (atc_code, 빈발 항목집합, 연관 규칙, 통계) / 빈발 항목집합이 없으면 연관 규칙은 None
+    통계: 소요 시간, 트랜잭션 수, 인코딩 행렬 메모리(희소 / 전체 vocabulary dense 환산)
+    """
+    start = time.perf_counter()
+
+    # 상위 top_n개 성분만 희소 원-핫 인코딩(주성분이 있으면 1, 없으면 0)
+    matrix, columns = encode_top_n(transactions, top_n, vocabulary)
+
+    rules = None
+    if backend == "numpy":
+        freq_items, rules = mine_itemsets_and_rules(
+            matrix, columns, min_support=min_support, max_len=max_len, metric="lift", min_threshold=1.0
+        )
+        if freq_items.empty:
+            rules = None
+    else:
+        df = pd.DataFrame.sparse.from_spmatrix(matrix, columns=columns)
+
+        # FP-Growth 실행 + 최대 조합 수 3개로 제한(일반 OTC 조합 주성분 2~3가지)
+        freq_items = fpgrowth(df, min_support=min_support, use_colnames=True, max_len=max_len)
+        if not freq_items.empty:
+            # 연관 규칙 추출
+            rules = association_rules(freq_items, metric="lift", min_threshold=1.0)
+
+    stats = {
+        'seconds': time.perf_counter() - start,
+        'transactions': len(transactions),
+        'encoded_bytes': matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes,
+        # 기존 방식(그룹 전체 vocabulary dense bool 배열)으로 인코딩했을 때의 추정 크기 (실제로 만들지 않음, 1칸 = 1 byte)
+        'dense_bytes_estimate': len(transactions) * len(np.unique(np.concatenate(transactions))),
+    }
+    return atc_code, freq_items, rules, stats
+
+
+def mine_groups(group_transactions, workers=1, min_support=0.1, max_len=3, top_n=50, backend="fpgrowth",
+                vocabulary=None, verbose=True):
+    """
+    group_transactions: {ATC 그룹: 트랜잭션(주성분 id 배열) 리스트} (순서 유지)
+    vocabulary: 트랜잭션 id의 vocabulary (기본: 전체 제품 목록 vocabulary)
+    workers > 1이면 그룹별 마이닝을 프로세스 풀에 분배, 결과는 입력 그룹 순서대로 수집
+    그룹별 트랜잭션 / 빈발 항목집합 / 규칙 수는 부모 프로세스에서 instrumentation 카운터로 기록
+    verbose=False이면 그룹별 추출 로그를 출력하지 않음 (벤치마크 등)
+    반환: fp_results, rules_results, single_rules_results, multi_rules_results, 그룹별 통계
+    """
+    fp_results = {}
+    rules_results = {}
+    single_rules_results = {}
+    multi_rules_results = {}
+    group_stats = {}
+
+    codes = list(group_transactions)
+    n = len(codes)
+    vocabulary = load_vocabulary() if vocabulary is None else vocabulary
+    args = ([group_transactions[c] for c in codes], [min_support] * n, [max_len] * n, [top_n] * n, [backend] * n,
+            [vocabulary] * n)
+    with instrumentation.stage("mine"):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                mined = list(executor.map(mine_group, codes, *args))
+        else:
+            mined = list(map(mine_group, codes, *args))
+
+    for atc_code, freq_items, rules, stats in mined:
+        group_stats[atc_code] = stats
+        elapsed = stats['seconds']
+        instrumentation.record("transactions", stats['transactions'], group=atc_code)
+        instrumentation.record("mine_seconds", elapsed, group=atc_code)
+        instrumentation.record("itemsets", len(freq_items), group=atc_code)
+        instrumentation.count("itemsets_found", len(freq_items))
+        if freq_items.empty:
+            continue
+        fp_results[atc_code] = freq_items
+
+        if rules is None or rules.empty:
+            continue
+        rules_results[atc_code] = rules
+
+        # 단항 규칙 (1:1) / 다항 규칙 (2+:1 or N:M) - 항목 수는 한 번만 계산
+        is_single = (itemset_lengths(rules['antecedents']) == 1) & (itemset_lengths(rules['consequents']) == 1)
+        single_rules = rules[is_single]
+        single_rules_results[atc_code] = single_rules
+        multi_rules = rules[~is_single]
+        multi_rules_results[atc_code] = multi_rules
+        instrumentation.record("rules", len(rules), group=atc_code)
+        instrumentation.count("rules_found", len(rules))
+        instrumentation.count("single_rules", len(single_rules))
+        instrumentation.count("multi_rules", len(multi_rules))
+
+        if verbose:
+            print(f"✅ {atc_code}: 단항 {len(single_rules)}개, 다항 {len(multi_rules)}개 규칙 추출 완료 ({elapsed:.2f}s)")
+
+    return fp_results, rules_results, single_rules_results, multi_rules_results, group_stats
+
+
+def itemset_lengths(itemsets):
+    """frozenset 컬럼의 항목 수 배열"""
+    return np.fromiter(map(len, itemsets), dtype=np.int64, count=len(itemsets))
+
+
+def itemset_labels(itemsets):
+    """frozenset 컬럼 → 정렬된 'a, b, c' 문자열 (서로 다른 항목집합마다 한 번만 join)"""
+    codes, uniques = pd.factorize(pd.Series(itemsets, dtype=object))
+    labels = np.array([', '.join(sorted(u)) for u in uniques], dtype=object)
+    return labels[codes]
+
+
+def round_column(values, digits=3):
+    """
+    파이썬 round와 같은 결과의 배열 반올림
+    numpy round는 x.xxx5 경계 근처에서 결과가 다를 수 있어 경계 근처 값만 파이썬 round로 다시 계산
+    """
+    rounded = np.round(values, digits)
+    scaled = values * 10 ** digits
+    near_half = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    rounded[near_half] = [round(v, digits) for v in values[near_half].tolist()]
+    return rounded
+
+
+def summarize_rules(rules_results, groups, min_support=0.1, min_confidence=0.6, min_lift=1.5):
+    """
+    연관 규칙 기반 최적 조합 리스트 정리
+    groups 순서대로 기준값을 넘는 규칙을 lift 내림차순으로 정리한 요약 DataFrame
+    전체 그룹 규칙을 하나로 합친 뒤 필터/정렬/문자열 변환/반올림을 컬럼 단위로 한 번에 처리
+    (lift 동점은 마이닝 결과 순서 유지)
+    """
     # 규칙이 없는 그룹은 제외
-    if atc_code not in rules_results:
-        continue
-    rules_df = rules_results[atc_code]
-    if rules_df.empty:
-        continue
+    frames = [(atc_code, rules_results[atc_code]) for atc_code in groups
+              if atc_code in rules_results and not rules_results[atc_code].empty]
+    if not frames:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    def column(name):
+        return np.concatenate([rules[name].to_numpy() for _, rules in frames])
+
+    group_order = np.repeat(np.arange(len(frames)), [len(rules) for _, rules in frames])
 
     # 필터링된 연관 규칙 추출
-    filtered = rules_df[
-        (rules_df['support'] >= min_support) &
-        (rules_df['confidence'] >= min_confidence) &
-        (rules_df['lift'] >= min_lift)
-    ]
-    # print(f"✅ {atc_code}: {len(filtered)}개의 필터된 룰")
-
-    if filtered.empty:
-        continue
-
-    # lift 기준 정렬 → 상위 N개 추출
-    # top_rules = filtered.sort_values(by='lift', ascending=False).head(top_n)
-    top_rules = filtered.sort_values(by='lift', ascending=False)
-
-    # 결과 정리
-    for _, row in top_rules.iterrows():
-        summary_rows.append({
-            'ATC 그룹': atc_code,
-            'Antecedents': ', '.join(sorted(row['antecedents'])),
-            'Consequents': ', '.join(sorted(row['consequents'])),
-            'support': round(row['support'], 3),
-            'confidence': round(row['confidence'], 3),
-            'lift': round(row['lift'], 3)
-        })
-
-# 결과 DataFrame 생성
-rules_summary_df = pd.DataFrame(summary_rows)
-print(rules_summary_df.head(20))  # 앞부분 미리보기
-
-# 연관 규칙 결과 저장
-rules_summary_df.to_csv("atc_rule_summary.csv", index=False)
\ No newline at end of file
+    support = column('support')
+    confidence = column('confidence')
+    lift = column('lift')
+    keep = np.flatnonzero((support >= min_support) & (confidence >= min_confidence) & (lift >= min_lift))
+
+    # 그룹 순서 → lift 내림차순 (안정 정렬)
+    keep = keep[np.lexsort((-lift[keep], group_order[keep]))]
+
+    return pd.DataFrame({
+        'ATC 그룹': np.array([atc_code for atc_code, _ in frames], dtype=object)[group_order[keep]],
+        'Antecedents': itemset_labels(column('antecedents')[keep]),
+        'Consequents': itemset_labels(column('consequents')[keep]),
+        'support': round_column(support[keep]),
+        'confidence': round_column(confidence[keep]),
+        'lift': round_column(lift[keep]),
+    }, columns=SUMMARY_COLUMNS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ATC 그룹별 FP-Growth 연관 규칙 추출")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="그룹 병렬 마이닝 프로세스 수 (1이면 순차 실행)")
+    parser.add_argument("--min-support", type=float, default=0.1, help="FP-Growth 최소 지지도")
+    parser.add_argument("--max-len", type=int, default=3, help="최대 조합 성분 수")
+    parser.add_argument("--top-n", type=int, default=50, help="그룹별 마이닝에 사용할 상위 성분 수")
+    parser.add_argument("--backend", choices=["fpgrowth", "numpy"], default="fpgrowth",
+                        help="마이닝 백엔드 (numpy: 행렬곱 기반, max_len <= 3 전용)")
+    parser.add_argument("--min-count", type=int, default=50, help="마이닝 대상 ATC 그룹 최소 제품 수")
+    parser.add_argument("--min-confidence", type=float, default=0.6, help="규칙 요약 최소 confidence")
+    parser.add_argument("--min-lift", type=float, default=1.5, help="규칙 요약 최소 lift")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.start_run("association", args)
+
+    selected_groups, _, atc_group_cutoff, _ = get_atc_groups(min_count=args.min_count, level='atc_3')
+
+    # 그룹별 트랜잭션 준비 (트랜잭션 없는 그룹은 제외)
+    group_transactions = {}
+    with instrumentation.stage("transactions"):
+        for atc_code in selected_groups:
+            transactions = extract_transactions(atc_group_cutoff[atc_group_cutoff['atc_3'] == atc_code])
+            if len(transactions) == 0:
+                print(f"⚠️ {atc_code}: 트랜잭션 없음 → 건너뜀")
+                continue
+            group_transactions[atc_code] = transactions
+
+    print(f"\n🔍 ATC 그룹 {len(group_transactions)}개 마이닝 (백엔드 {args.backend}, 프로세스 {args.workers}개)")
+    start = time.perf_counter()
+    fp_results, rules_results, single_rules_results, multi_rules_results, group_stats = mine_groups(
+        group_transactions, workers=args.workers, min_support=args.min_support, max_len=args.max_len,
+        top_n=args.top_n, backend=args.backend
+    )
+    total_seconds = sum(s['seconds'] for s in group_stats.values())
+    print(f"⏱️ 전체 마이닝 {time.perf_counter() - start:.2f}s (그룹별 합계 {total_seconds:.2f}s)")
+    for atc_code, stats in sorted(group_stats.items(), key=lambda x: -x[1]['seconds'])[:10]:
+        print(f"   {atc_code}: {stats['seconds']:.2f}s, 트랜잭션 {stats['transactions']}개, "
+              f"인코딩 {stats['encoded_bytes'] / 1024:.1f} KB (dense 추정 {stats['dense_bytes_estimate'] / 1024:.1f} KB)")
+
+    # 연관 규칙 기반 최적 조합 리스트 정리 (임계값 조합별 규칙 수 탐색은 itemset_lattice 사용)
+    with instrumentation.stage("summarize"):
+        rules_summary_df = summarize_rules(rules_results, selected_groups, args.min_support, args.min_confidence,
+                                           args.min_lift)
+    instrumentation.record("rules_kept", len(rules_summary_df))
+    print(rules_summary_df.head(20))  # 앞부분 미리보기
+
+    # 연관 규칙 결과 저장 (요약 CSV + 추천 시스템용 단항 규칙 저장 폴더)
+    with instrumentation.stage("save"):
+        rules_summary_df.to_csv("data/atc_rule_summary.csv", index=False)
+        write_rule_store(single_rules_results, "data/fp_rules")
@@ -177,6 +177,15 @@ A, D → B
 A → B
 B → A
 """
+import argparse
+import hashlib
+import html
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import holoviews as hv
 from holoviews import opts
@@ -186,53 +195,117 @@ from bokeh.palettes import Category20
 from bokeh.models import Div
 from bokeh.layouts import row
 from bokeh.io import output_file, save
+from bokeh.resources import Resources
 
-# 연관 규칙 데이터 불러오기
-df = pd.read_csv("data/atc_rule_summary.csv")
+import instrumentation
 
-# ATC 그룹 목록 추출
-atc_groups = df["ATC 그룹"].unique()
+RULES_PATH = "data/atc_rule_summary.csv"
+OUTPUT_DIR = "chord_diagrams"
+BUNDLE_DIR = "chord_diagrams/bundle"  # 대시보드 모드 출력 (index.html + chord.js + 그룹별 JSON)
+ASSETS_DIR = "chord_assets"  # 대시보드 공용 리소스 (index.html, chord.js)
+MODES = ["html", "bundle"]
+# 대시보드용 BokehJS (core + plotting API, chord.js가 브라우저에서 figure를 만듦)
+# 오프라인 키오스크용이라 CDN 대신 설치된 bokeh의 스크립트를 대시보드 폴더에 한 번 저장해서 사용
+BOKEH_RESOURCES = Resources(mode="inline", components=["bokeh", "bokeh-api"])
+BOKEH_JS_NAME = "bokeh.min.js"
+MANIFEST_NAME = "manifest.json"  # 그룹별 fingerprint / 렌더링 시간 기록 (OUTPUT_DIR 안에 저장)
+RULE_COLUMNS = ["Antecedents", "Consequents", "support", "confidence", "lift"]
 
-# 각 ATC 그룹별로 Chord Diagram 생성
-for target_atc in atc_groups:
-    sub_df = df[df["ATC 그룹"] == target_atc].sort_values(by="lift", ascending=False).head(5)
+# 렌더링 옵션 (값이 바뀌면 모든 그룹을 다시 렌더링)
+# render_version은 렌더링 코드 자체를 바꿨을 때 올릴 것
+RENDER_OPTIONS = {
+    "render_version": 3,
+    "top_n": 5,
+    "width": 800,
+    "height": 800,
+    "legend_width": 300,
+    "node_size": 15,
+    "edge_width_scale": 2,
+}
 
-    if sub_df.empty:
-        continue
 
-    # 엣지 생성
-    edges = []
-    nodes_set = set()
-    for _, r in sub_df.iterrows():
-        ante = r["Antecedents"].split(", ")
-        cons = r["Consequents"].split(", ")
-        for a in ante:
-            for c in cons:
-                if a != c:
-                    edges.append((a, c, r["lift"]))
-                    nodes_set.update([a, c])
+def top_rule_table(df, top_n=5):
+    """그룹별 lift 상위 top_n개 규칙 (전체 규칙 표에서 한 번에, 동점은 원래 순서 유지)"""
+    ranked = df.sort_values(by="lift", ascending=False, kind="stable")
+    return ranked.groupby("ATC 그룹", sort=False).head(top_n)
 
-    if not edges:
-        continue
 
-    nodes = sorted(list(nodes_set))
-    node_df = pd.DataFrame({'name': nodes})
+def expand_edges(rules):
+    """
+    규칙 표 → 전체 그룹의 엣지 표 [ATC 그룹, source, target, lift, rule_count, value]
+    Antecedents x Consequents 성분 쌍을 explode로 한 번에 펼치고 (자기 자신으로 가는 쌍 제외)
+    (그룹, source, target)별 lift 평균 + 관여 규칙 수, 그룹 내 lift 최소/최대로 엣지 굵기(value) 정규화
+    그룹 순서는 규칙 표 등장 순서, 그룹 안에서는 (source, target) 이름순
+    """
+    pairs = pd.DataFrame({
+        "ATC 그룹": rules["ATC 그룹"],
+        "source": rules["Antecedents"].str.split(", "),
+        "target": rules["Consequents"].str.split(", "),
+        "lift": rules["lift"],
+    }).explode("source").explode("target")
+    pairs = pairs[pairs["source"] != pairs["target"]]
+    pairs["ATC 그룹"] = pd.Categorical(pairs["ATC 그룹"], categories=rules["ATC 그룹"].unique())
 
     # DataFrame 생성 및 중복 관계 요약
-    edge_df = pd.DataFrame(edges, columns=["source", "target", "lift"])
-    edge_df["rule_count"] = 1
-    edge_df = edge_df.groupby(["source", "target"], as_index=False).agg({
-        "lift": "mean", # lift는 평균값으로 대체
-        "rule_count": "sum" # 관여된 규칙 수 합산
-    })
-    min_lift = edge_df["lift"].min()
-    max_lift = edge_df["lift"].max()
-    edge_df["value"] = 1 + 5 * (edge_df["lift"] - min_lift) / (max_lift - min_lift)
+    edges = pairs.groupby(["ATC 그룹", "source", "target"], observed=True, sort=True).agg(
+        lift=("lift", "mean"),  # lift는 평균값으로 대체
+        rule_count=("lift", "size"),  # 관여된 규칙 수 합산
+    ).reset_index()
+    edges["ATC 그룹"] = edges["ATC 그룹"].astype(str)
 
+    lift_range = edges.groupby("ATC 그룹", sort=False)["lift"].agg(["min", "max"])
+    min_lift = edges["ATC 그룹"].map(lift_range["min"])
+    max_lift = edges["ATC 그룹"].map(lift_range["max"])
+    edges["value"] = 1 + 5 * (edges["lift"] - min_lift) / (max_lift - min_lift)
+    return edges
 
-    # 색상 매핑
+
+def build_edge_table(df, top_n=5):
+    """atc_rule_summary 전체 → 그룹별 lift 상위 top_n개 규칙의 엣지 표 (렌더러/API 공용)"""
+    return expand_edges(top_rule_table(df, top_n))
+
+
+def group_nodes(edge_df):
+    """엣지에 등장하는 성분 이름 (이름순)"""
+    return sorted(set(edge_df["source"]) | set(edge_df["target"]))
+
+
+def node_colors(nodes):
+    """노드 이름 → 색상 (Category20 순환)"""
     palette = Category20[20]
-    color_map = {name: palette[i % len(palette)] for i, name in enumerate(nodes)}
+    return {name: palette[i % len(palette)] for i, name in enumerate(nodes)}
+
+
+def chord_path(target_atc, output_dir=OUTPUT_DIR):
+    safe_atc = target_atc.replace("/", "_")
+    return os.path.join(output_dir, f"{safe_atc}_chord_with_legend.html")
+
+
+def payload_path(target_atc, output_dir=BUNDLE_DIR):
+    safe_atc = target_atc.replace("/", "_")
+    return os.path.join(output_dir, "groups", f"{safe_atc}.json")
+
+
+def group_fingerprint(target_atc, sub_df, options):
+    """그룹의 top-N 규칙 + 렌더링 옵션 해시 (같으면 기존 HTML 재사용)"""
+    h = hashlib.sha1()
+    h.update(target_atc.encode("utf-8"))
+    h.update(sub_df[RULE_COLUMNS].to_csv(index=False).encode("utf-8"))
+    h.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def chord_plot(target_atc, edge_df, options=RENDER_OPTIONS):
+    """
+    그룹 하나의 Chord Diagram bokeh 객체 (html / 대시보드 모드 공용)
+    반환: (bokeh figure, 노드 이름 리스트, 노드 이름 → 색상)
+    """
+    edge_df = edge_df[["source", "target", "lift", "rule_count", "value"]].reset_index(drop=True)
+    nodes = group_nodes(edge_df)
+    node_df = pd.DataFrame({'name': nodes})
+
+    # 색상 매핑
+    color_map = node_colors(nodes)
 
     # Chord 생성
     chord = hv.Chord((edge_df, hv.Dataset(node_df, 'name'))).opts(
@@ -242,11 +315,11 @@ for target_atc in atc_groups:
             edge_color=hv.dim('source').categorize(color_map),
             cmap='Category20',
             edge_cmap='Category20',
-            edge_line_width=hv.dim('value') * 2,
+            edge_line_width=hv.dim('value') * options["edge_width_scale"],
             edge_alpha=0.7,
-            node_size=15,
-            width=800,
-            height=800,
+            node_size=options["node_size"],
+            width=options["width"],
+            height=options["height"],
             title=f"{target_atc} 주성분 Chord Diagram",
             tools=['hover'],
             inspection_policy='edges',
@@ -256,24 +329,197 @@ for target_atc in atc_groups:
         )
     )
 
-    # 주성분 범례 생성
-    legend_html = f"<h3 style='font-family:sans-serif;'>{target_atc} 주성분</h3><ul style='list-style:none;padding-left:0;'>"
+    # bokeh object로 변환
+    return hv.render(chord, backend='bokeh'), nodes, color_map
+
+
+def legend_html(target_atc, nodes, color_map):
+    """주성분 범례 HTML (성분 이름 / ATC 코드는 원본 데이터 값이므로 이스케이프)"""
+    legend = f"<h3 style='font-family:sans-serif;'>{html.escape(target_atc)} 주성분</h3><ul style='list-style:none;padding-left:0;'>"
     for name in nodes:
         color = color_map[name]
-        legend_html += f"<li style='margin-bottom:4px;'><span style='display:inline-block;width:14px;height:14px;background:{color};margin-right:6px;border-radius:50%;'></span>{name}</li>"
-    legend_html += "</ul>"
+        legend += f"<li style='margin-bottom:4px;'><span style='display:inline-block;width:14px;height:14px;background:{color};margin-right:6px;border-radius:50%;'></span>{html.escape(name)}</li>"
+    return legend + "</ul>"
 
-    legend_div = Div(text=legend_html, width=300, height=800)
 
-    # bokeh object로 변환
-    bokeh_plot = hv.render(chord, backend='bokeh')
+def render_chord(target_atc, edge_df, out_path, options=RENDER_OPTIONS):
+    """그룹 하나의 Chord Diagram + 범례를 HTML로 저장 → 렌더링 시간(초), 엣지가 없으면 None"""
+    start = time.perf_counter()
+    if edge_df.empty:
+        return None
+    bokeh_plot, nodes, color_map = chord_plot(target_atc, edge_df, options)
+
+    # 주성분 범례 생성
+    legend_div = Div(text=legend_html(target_atc, nodes, color_map), width=options["legend_width"],
+                     height=options["height"])
 
     # layout 구성
     layout = row(bokeh_plot, legend_div)
 
     # 저장
-    safe_atc = target_atc.replace("/", "_")
-    output_file(f"chord_diagrams/{safe_atc}_chord_with_legend.html")
+    output_file(out_path)
     save(layout)
+    return time.perf_counter() - start
+
+
+def write_payload(target_atc, edge_df, out_path, options=RENDER_OPTIONS):
+    """
+    대시보드 모드: 그룹 하나의 Chord 데이터(노드/색상/엣지 lift, rule_count, value)를 JSON으로 저장
+    → 처리 시간(초), 엣지가 없으면 None / 렌더링은 브라우저에서 공용 chord.js가 수행
+    """
+    start = time.perf_counter()
+    if edge_df.empty:
+        return None
+    nodes = group_nodes(edge_df)
+    color_map = node_colors(nodes)
+    node_ids = {name: i for i, name in enumerate(nodes)}
+
+    payload = {
+        "atc": target_atc,
+        "title": f"{target_atc} 주성분 Chord Diagram",
+        "nodes": [{"name": name, "color": color_map[name]} for name in nodes],
+        "edges": [
+            # 그룹 내 lift가 모두 같으면 value가 NaN(0으로 나눔) → JSON에 NaN을 쓸 수 없으므로 최소 굵기 1로 저장
+            {"source": node_ids[source], "target": node_ids[target], "lift": round(float(lift), 6),
+             "rule_count": int(rule_count), "value": 1.0 if pd.isna(value) else round(float(value), 6)}
+            for source, target, lift, rule_count, value
+            in edge_df[["source", "target", "lift", "rule_count", "value"]].itertuples(index=False)
+        ],
+        "options": {key: options[key] for key in ("width", "height", "node_size", "edge_width_scale")},
+    }
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    return time.perf_counter() - start
+
+
+def write_bokeh_js(output_dir=BUNDLE_DIR, resources=BOKEH_RESOURCES):
+    """
+    설치된 bokeh의 BokehJS(core + plotting API)를 대시보드 폴더에 한 파일로 저장 (내용이 같으면 그대로 둠)
+    payload를 만든 bokeh와 항상 같은 버전, 네트워크 없이 동작
+    """
+    script = "\n".join(resources.js_raw)
+    path = os.path.join(output_dir, BOKEH_JS_NAME)
+    if os.path.exists(path):
+        with open(path) as f:
+            if f.read() == script:
+                return path
+    with open(path, "w") as f:
+        f.write(script)
+    return path
+
+
+def write_bundle_index(groups, output_dir=BUNDLE_DIR):
+    """대시보드 index.html / 공용 chord.js 복사 + 로컬 BokehJS 저장, 그룹 목록(groups.json) 저장"""
+    for name in ("index.html", "chord.js"):
+        shutil.copyfile(os.path.join(ASSETS_DIR, name), os.path.join(output_dir, name))
+    write_bokeh_js(output_dir)
+    with open(os.path.join(output_dir, "groups.json"), "w") as f:
+        json.dump([{"atc": code, "file": os.path.relpath(payload_path(code, output_dir), output_dir)}
+                   for code in groups], f, ensure_ascii=False, indent=2)
+
+
+def load_manifest(output_dir=OUTPUT_DIR):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, output_dir=OUTPUT_DIR):
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def generate_chords(rules_path=RULES_PATH, output_dir=OUTPUT_DIR, options=RENDER_OPTIONS, workers=1, force=False,
+                    mode="html"):
+    """
+    그룹별 Chord Diagram 생성 (fingerprint가 manifest와 같고 출력 파일이 있으면 건너뜀)
+    변경된 그룹만 workers개 프로세스로 병렬 렌더링
+    mode: html(그룹별 독립 HTML) / bundle(index.html + 공용 chord.js + 그룹별 JSON)
+    반환: {그룹: 렌더링 시간(초)} (렌더링한 그룹만), 건너뛴 그룹 리스트
+    """
+    if mode not in MODES:
+        raise ValueError(f"알 수 없는 출력 모드: {mode} (가능: {', '.join(MODES)})")
+    render, output_path = (render_chord, chord_path) if mode == "html" else (write_payload, payload_path)
+    df = pd.read_csv(rules_path)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(output_dir)
+
+    # 그룹별 top-N 규칙과 엣지 표를 전체 규칙에서 한 번에 생성
+    with instrumentation.stage("edge_tables"):
+        top = top_rule_table(df, options["top_n"])
+        rule_groups = dict(tuple(top.groupby("ATC 그룹", sort=False)))
+        edges = expand_edges(top)
+        edge_groups = dict(tuple(edges.groupby("ATC 그룹", sort=False)))
+    instrumentation.record("edges", len(edges))
+
+    # 각 ATC 그룹별로 fingerprint 비교
+    tasks, skipped, fingerprints = [], [], {}
+    for target_atc in df["ATC 그룹"].unique():
+        sub_df = rule_groups.get(target_atc)
+        if sub_df is None:
+            continue
+        out_path = output_path(target_atc, output_dir)
+        fingerprint = group_fingerprint(target_atc, sub_df, options)
+        fingerprints[target_atc] = fingerprint
+
+        entry = manifest.get(target_atc, {})
+        if entry.get("fingerprint") == fingerprint and (entry.get("empty") or os.path.exists(out_path)):
+            skipped.append(target_atc)
+        else:
+            tasks.append((target_atc, edge_groups.get(target_atc, edges.iloc[:0]), out_path))
+
+    codes = [t[0] for t in tasks]
+    args = ([t[1] for t in tasks], [t[2] for t in tasks], [options] * len(tasks))
+    with instrumentation.stage("render"):
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                seconds = list(executor.map(render, codes, *args))
+        else:
+            seconds = list(map(render, codes, *args))
+
+    render_times = {}
+    for (target_atc, edge_df, _), elapsed in zip(tasks, seconds):
+        instrumentation.record("edges", len(edge_df), group=target_atc)
+        manifest[target_atc] = {"fingerprint": fingerprints[target_atc], "empty": elapsed is None,
+                                "render_seconds": None if elapsed is None else round(elapsed, 3)}
+        if elapsed is not None:
+            render_times[target_atc] = elapsed
+
+    # 규칙 파일에서 사라진 그룹은 manifest에서 제거
+    manifest = {code: entry for code, entry in manifest.items() if code in fingerprints}
+    save_manifest(manifest, output_dir)
+    if mode == "bundle":
+        write_bundle_index([code for code in fingerprints if not manifest[code]["empty"]], output_dir)
+    instrumentation.record("groups_rendered", len(render_times))
+    instrumentation.record("groups_skipped", len(skipped))
+    return render_times, skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ATC 그룹별 연관 규칙 Chord Diagram 생성")
+    parser.add_argument("--rules", default=RULES_PATH, help="규칙 요약 CSV (association_02 결과)")
+    parser.add_argument("--mode", choices=MODES, default="html",
+                        help="html: 그룹별 독립 HTML / bundle: 대시보드(index.html + 공용 chord.js + 그룹별 JSON)")
+    parser.add_argument("--out", default=None, help=f"저장 폴더 (기본: html → {OUTPUT_DIR}, bundle → {BUNDLE_DIR})")
+    parser.add_argument("--top-n", type=int, default=RENDER_OPTIONS["top_n"], help="그룹별 시각화할 lift 상위 규칙 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="렌더링 프로세스 수 (1이면 순차 실행)")
+    parser.add_argument("--force", action="store_true", help="manifest를 무시하고 모든 그룹 다시 렌더링")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.start_run("visualization", args)
+
+    options = dict(RENDER_OPTIONS, top_n=args.top_n)
+    start = time.perf_counter()
+    output_dir = args.out or (OUTPUT_DIR if args.mode == "html" else BUNDLE_DIR)
+    render_times, skipped = generate_chords(args.rules, output_dir, options, workers=args.workers, force=args.force,
+                                            mode=args.mode)
 
-    print(f"{target_atc} 저장 완료.")
\ No newline at end of file
+    for target_atc, elapsed in render_times.items():
+        print(f"{target_atc} 저장 완료. ({elapsed:.2f}s)")
+    print(f"\n렌더링 {len(render_times)}개 그룹, 변경 없음 {len(skipped)}개 그룹 건너뜀 "
+          f"(전체 {time.perf_counter() - start:.2f}s, 프로세스 {args.workers}개)")
+    if args.mode == "bundle":
+        print(f"대시보드: {os.path.join(output_dir, 'index.html')} (로컬 서버로 열기: python -m http.server -d {output_dir})")
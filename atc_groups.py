@@ -0,0 +1,45 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import instrumentation
+from medicine_data import MEDICINE_PATH, load_medicine_info
+
+"""
+효능이 같은(ATC 단계별) OTC 그룹화 + 빈도가 적은 그룹 cutoff
+import 시점에는 아무것도 계산하지 않고, get_atc_groups() 호출 시 한 번 계산해서 파라미터별로 재사용
+(시각화 라이브러리 import 없음 → 마이닝/추천 코드에서 가볍게 사용)
+"""
+
+# selected_groups: cutoff 통과 그룹 리스트(빈도 내림차순), group_counts: 전체 그룹 빈도
+# group_cutoff: 선택된 그룹에 속한 제품, filtered_group_counts: 선택된 그룹의 빈도
+AtcGroups = namedtuple("AtcGroups", ["selected_groups", "group_counts", "group_cutoff", "filtered_group_counts"])
+
+
+def count_groups(medicine_df, level="atc_3"):
+    """ATC 단계별 그룹 빈도 (빈도 내림차순, 동점 그룹은 제품 목록 등장 순서)"""
+    group_counts = medicine_df[level].value_counts().reset_index()
+    group_counts.columns = [level, "count"]
+    return group_counts
+
+
+def select_groups(medicine_df, min_count=50, level="atc_3"):
+    """제품 수가 min_count 이상인 그룹 리스트"""
+    group_counts = count_groups(medicine_df, level)
+    return group_counts[group_counts["count"] >= min_count][level].tolist()
+
+
+@lru_cache(maxsize=None)
+def get_atc_groups(min_count=50, level="atc_3", csv_path=MEDICINE_PATH):
+    """
+    (min_count, level, csv_path)별로 한 번만 계산 (반환된 DataFrame은 공유되므로 수정하지 말 것)
+    """
+    medicine_info = load_medicine_info(csv_path)
+    with instrumentation.stage("atc_groups"):
+        group_counts = count_groups(medicine_info, level)
+        selected_groups = group_counts[group_counts["count"] >= min_count][level].tolist()
+
+        # 원본 데이터에서 해당 그룹들만 필터링
+        group_cutoff = medicine_info[medicine_info[level].isin(selected_groups)]
+        filtered_group_counts = group_counts[group_counts[level].isin(selected_groups)]
+    instrumentation.record("groups_selected", len(selected_groups))
+    return AtcGroups(selected_groups, group_counts, group_cutoff, filtered_group_counts)
@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+
+from ing_recommendation import df, recommend_batch, recommend_from_ingredients, clean_ingredient_list
+
+"""
+성분 추천 일괄 처리 벤치마크: recommend_from_ingredients 반복 호출 vs recommend_batch
+실행: 프로젝트 루트에서 python -m benchmarks.bench_batch_recommend
+판매 장바구니 대신 실제 제품의 주성분 중 1~3개를 뽑아 쿼리 생성 (시드 고정)
+반복 호출은 LOOP_QUERIES개만 측정하고, 같은 쿼리에 대해 결과가 일치하는지 확인
+"""
+
+BATCH_SIZES = [1000, 10000]
+LOOP_QUERIES = 300
+SEED = 0
+
+
+def sample_baskets(n, seed=SEED):
+    rng = np.random.default_rng(seed)
+    ing_lists = [ings for ings in df['ing_en'].fillna('').map(clean_ingredient_list) if ings]
+    baskets = []
+    for i in rng.integers(len(ing_lists), size=n):
+        ings = ing_lists[i]
+        size = min(len(ings), int(rng.integers(1, 4)))
+        baskets.append([ings[j] for j in rng.choice(len(ings), size=size, replace=False)])
+    return baskets
+
+
+def same_result(single, row):
+    return (single['recommended_ingredients'] == row['recommended_ingredients']
+            and single['expanded_combination'] == row['expanded_combination']
+            and single['predicted_atc'] == row['predicted_atc']
+            and single['atc_internal_coverage_percent'] == row['atc_internal_coverage_percent'])
+
+
+if __name__ == "__main__":
+    baskets = sample_baskets(LOOP_QUERIES)
+    start = time.perf_counter()
+    singles = [recommend_from_ingredients(b) for b in baskets]
+    loop_qps = len(baskets) / (time.perf_counter() - start)
+
+    batch = recommend_batch(baskets)
+    mismatched = sum(not same_result(s, row) for s, (_, row) in zip(singles, batch.iterrows()))
+    print(f"반복 호출  : {loop_qps:9.1f} queries/s ({len(baskets)}개, 결과 불일치 {mismatched}개)")
+
+    for n in BATCH_SIZES:
+        baskets = sample_baskets(n)
+        start = time.perf_counter()
+        result = recommend_batch(baskets)
+        elapsed = time.perf_counter() - start
+        print(f"일괄 {n:>6}개: {n / elapsed:9.1f} queries/s ({elapsed:.2f}s, x{n / elapsed / loop_qps:.0f})")
@@ -0,0 +1,78 @@
+import time
+
+import numpy as np
+import pandas as pd
+from mlxtend.frequent_patterns import fpgrowth, association_rules
+
+from association_02 import extract_transactions, encode_top_n
+from atc_groups import get_atc_groups
+from numpy_miner import mine_itemsets_and_rules, RULE_METRICS
+
+"""
+마이닝 백엔드 검증 + 벤치마크: mlxtend(fpgrowth + association_rules) vs numpy_miner
+실행: 프로젝트 루트에서 python -m benchmarks.bench_numpy_miner
+그룹별 빈발 항목집합/연관 규칙(지표 포함)이 같은지 확인하고 마이닝 시간을 비교 (인코딩 시간 제외)
+"""
+
+SETTINGS = [
+    # (min_support, top_n)
+    (0.1, 50),
+    (0.05, 200),
+]
+
+
+def mine_mlxtend(matrix, columns, min_support, max_len=3):
+    df = pd.DataFrame.sparse.from_spmatrix(matrix, columns=columns)
+    freq_items = fpgrowth(df, min_support=min_support, use_colnames=True, max_len=max_len)
+    if freq_items.empty:
+        return freq_items, None
+    return freq_items, association_rules(freq_items, metric="lift", min_threshold=1.0)
+
+
+def same_results(expected, actual):
+    exp_items, exp_rules = expected
+    act_items, act_rules = actual
+    if dict(zip(exp_items['itemsets'], exp_items['support'])) != dict(zip(act_items['itemsets'], act_items['support'])):
+        return False
+    if exp_rules is None:
+        return act_items.empty or act_rules.empty
+
+    def keyed(rules):
+        return {(a, c): row for a, c, row in zip(rules['antecedents'], rules['consequents'],
+                                                  rules[RULE_METRICS].to_numpy(dtype=float))}
+
+    exp_keyed, act_keyed = keyed(exp_rules), keyed(act_rules)
+    if exp_keyed.keys() != act_keyed.keys():
+        return False
+    return all(np.allclose(exp_keyed[k], act_keyed[k], equal_nan=True) for k in exp_keyed)
+
+
+if __name__ == "__main__":
+    selected_groups, _, atc_group_cutoff, _ = get_atc_groups()
+    group_transactions = {}
+    for atc_code in selected_groups:
+        transactions = extract_transactions(atc_group_cutoff[atc_group_cutoff['atc_3'] == atc_code])
+        if transactions:
+            group_transactions[atc_code] = transactions
+
+    for min_support, top_n in SETTINGS:
+        encoded = {code: encode_top_n(t, top_n) for code, t in group_transactions.items()}
+        mlxtend_time, numpy_time, mismatched, n_rules = 0.0, 0.0, [], 0
+
+        for atc_code, (matrix, columns) in encoded.items():
+            start = time.perf_counter()
+            expected = mine_mlxtend(matrix, columns, min_support)
+            mlxtend_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = mine_itemsets_and_rules(matrix, columns, min_support=min_support, max_len=3)
+            numpy_time += time.perf_counter() - start
+
+            n_rules += 0 if expected[1] is None else len(expected[1])
+            if not same_results(expected, actual):
+                mismatched.append(atc_code)
+
+        print(f"min_support={min_support}, top_n={top_n}: 그룹 {len(encoded)}개, 규칙 {n_rules}개")
+        print(f"   mlxtend : {mlxtend_time * 1000:8.1f} ms")
+        print(f"   numpy   : {numpy_time * 1000:8.1f} ms (x{mlxtend_time / numpy_time:.1f})")
+        print(f"   불일치 그룹: {mismatched if mismatched else '없음'}")
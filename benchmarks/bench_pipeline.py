@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from benchmarks.synthetic_registry import SEED, synthetic_registry, write_registry_xlsx
+from instrumentation import git_commit
+from medicine_data import MEDICINE_PATH
+
+"""
+전체 파이프라인 규모 벤치마크 (합성 의약품등제품정보목록 1x / 10x / 100x)
+실행: 프로젝트 루트에서 python -m benchmarks.bench_pipeline [--scales 1 10 100] [--baseline 이전결과.json]
+규모마다 임시 작업 폴더에 합성 엑셀을 만들고, 각 단계를 새 프로세스에서 작업 폴더 기준으로 실행
+(스크립트들이 data/... 상대 경로를 쓰므로 저장소 data/는 건드리지 않음)
+- 단계별 소요 시간, 최대 메모리(자식 프로세스 ru_maxrss, import 포함, 단위 변환은 instrumentation.peak_rss_mb)
+- 추천: 모듈 로드 시간 + 쿼리당 지연시간 p50 / p99 (+ 성분 추천 일괄 처리량)
+결과는 JSON으로 저장 (--baseline을 주면 단계별 이전 결과 대비 배율 출력)
+"""
+
+SCALES = [1, 10, 100]
+RESULTS_DIR = "benchmarks/results"
+RESULT_VERSION = 1
+N_QUERIES = 200
+BATCH_QUERIES = 1000
+
+# (단계 이름, 스크립트, 인자) - 파이프라인 순서
+STAGES = [
+    ("preprocess", "Preprocessing_00.py", ["--streaming", "--xlsx", "raw/registry.xlsx"]),
+    ("eda", "eda_01.py", ["--report", "--workers", "1"]),
+    ("association", "association_02.py", ["--workers", "1"]),
+    ("visualization", "association_visualization_03.py", ["--workers", "1"]),
+    ("optimal_combination", "OTC_optimal_combination_04.py", []),
+]
+
+# 자식 프로세스: 스크립트를 __main__으로 실행하고 소요 시간 / 최대 메모리를 JSON 파일로 기록
+RUN_SCRIPT = """
+import json, runpy, sys, time
+from instrumentation import peak_rss_mb
+result_path, script = sys.argv[1:3]
+sys.argv = [script] + sys.argv[3:]
+start = time.perf_counter()
+runpy.run_path(script, run_name="__main__")
+seconds = time.perf_counter() - start
+with open(result_path, "w") as f:
+    json.dump({"seconds": seconds, "peak_rss_mb": peak_rss_mb()}, f)
+"""
+
+# 자식 프로세스: 추천 모듈 로드 + 쿼리 지연시간
+RUN_RECOMMEND = """
+import json, sys, time
+import numpy as np
+from instrumentation import peak_rss_mb
+result_path, kind, n_queries, batch_queries = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+start = time.perf_counter()
+if kind == "ingredients":
+    import ing_recommendation as rec
+    from benchmarks.bench_batch_recommend import sample_baskets
+    load_seconds = time.perf_counter() - start
+    queries, run = sample_baskets(n_queries), rec.recommend_from_ingredients
+else:
+    import Customer_medicine_recommand as rec
+    load_seconds = time.perf_counter() - start
+    symptoms = list(rec.symptom_to_effects)
+    queries, run = [symptoms[i % len(symptoms)] for i in range(n_queries)], rec.recommend_by_symptom
+latencies = []
+for query in queries:
+    query_start = time.perf_counter()
+    run(query)
+    latencies.append(time.perf_counter() - query_start)
+result = {"load_seconds": load_seconds, "queries": len(queries),
+          "p50_ms": float(np.percentile(latencies, 50)) * 1000, "p99_ms": float(np.percentile(latencies, 99)) * 1000}
+if kind == "ingredients":
+    baskets = sample_baskets(batch_queries, seed=1)
+    batch_start = time.perf_counter()
+    rec.recommend_batch(baskets)
+    result["batch_qps"] = len(baskets) / (time.perf_counter() - batch_start)
+result["peak_rss_mb"] = peak_rss_mb()
+with open(result_path, "w") as f:
+    json.dump(result, f)
+"""
+
+RECOMMENDERS = [("recommend_ingredients", "ingredients"), ("recommend_symptom", "symptom")]
+
+
+def run_child(code, args, workspace, log):
+    """작업 폴더에서 자식 프로세스 실행 → 기록된 JSON 결과 (출력은 log 파일로)"""
+    result_path = os.path.join(workspace, "result.json")
+    env = dict(os.environ, PYTHONPATH=os.getcwd(), MPLBACKEND="Agg")
+    subprocess.run([sys.executable, "-c", code, result_path] + args, cwd=workspace, env=env, stdout=log,
+                   stderr=subprocess.STDOUT, check=True)
+    with open(result_path) as f:
+        return json.load(f)
+
+
+def run_scale(scale, medicine_df, seed=SEED):
+    """합성 엑셀 생성 → 단계별 실행 → {규모 정보, 단계별 결과}"""
+    with tempfile.TemporaryDirectory() as workspace:
+        os.makedirs(os.path.join(workspace, "data"))
+        os.makedirs(os.path.join(workspace, "raw"))
+
+        start = time.perf_counter()
+        registry = synthetic_registry(medicine_df, scale, seed)
+        raw_rows = write_registry_xlsx(registry, os.path.join(workspace, "raw/registry.xlsx"), seed=seed)
+        result = {"products": len(registry), "raw_rows": raw_rows,
+                  "generate_seconds": time.perf_counter() - start, "stages": {}}
+        print(f"\n{scale:>4}x: 제품 {len(registry)}개 (엑셀 {raw_rows}행), 생성 {result['generate_seconds']:.1f}s")
+
+        with open(os.path.join(workspace, "stages.log"), "w") as log:
+            for name, script, args in STAGES:
+                stage = run_child(RUN_SCRIPT, [os.path.abspath(script)] + args, workspace, log)
+                result["stages"][name] = stage
+                print(f"   {name:<22}: {stage['seconds']:8.2f}s | 최대 메모리 {stage['peak_rss_mb']:8.1f} MB")
+
+            for name, kind in RECOMMENDERS:
+                stage = run_child(RUN_RECOMMEND, [kind, str(N_QUERIES), str(BATCH_QUERIES)], workspace, log)
+                result["stages"][name] = stage
+                line = (f"   {name:<22}: 로드 {stage['load_seconds']:6.2f}s | p50 {stage['p50_ms']:8.4f} ms | "
+                        f"p99 {stage['p99_ms']:8.4f} ms | 최대 메모리 {stage['peak_rss_mb']:8.1f} MB")
+                if "batch_qps" in stage:
+                    line += f" | 일괄 {stage['batch_qps']:.0f} queries/s"
+                print(line)
+
+        # 산출물 규모 (규칙 수 등)
+        summary_path = os.path.join(workspace, "data/atc_rule_summary.csv")
+        result["rule_summary_rows"] = len(pd.read_csv(summary_path)) if os.path.exists(summary_path) else 0
+    return result
+
+
+def compare(results, baseline):
+    """같은 규모 / 단계의 이전 결과 대비 배율 (시간, 최대 메모리, 지연시간 p50)"""
+    print(f"\n이전 결과({baseline.get('git_commit')}) 대비 배율 (1보다 크면 느려짐 / 메모리 증가)")
+    for scale, result in results["scales"].items():
+        old = baseline.get("scales", {}).get(scale)
+        if old is None:
+            continue
+        for name, stage in result["stages"].items():
+            old_stage = old["stages"].get(name)
+            if old_stage is None:
+                continue
+            ratios = [f"{key} x{stage[key] / old_stage[key]:.2f}" for key in ("seconds", "load_seconds", "p50_ms",
+                                                                             "peak_rss_mb")
+                      if key in stage and old_stage.get(key)]
+            print(f"   {scale:>4}x {name:<22}: " + ", ".join(ratios))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="합성 의약품 목록 기반 전체 파이프라인 벤치마크")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES, help="실제 제품 수 대비 배수")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", default=None, help=f"결과 JSON (기본: {RESULTS_DIR}/pipeline-<커밋>.json)")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    medicine_df = pd.read_csv(MEDICINE_PATH)
+    results = {
+        "benchmark": "pipeline",
+        "version": RESULT_VERSION,
+        "git_commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "scales": {},
+    }
+    for scale in args.scales:
+        results["scales"][str(scale)] = run_scale(scale, medicine_df, args.seed)
+
+    out_path = args.out or os.path.join(RESULTS_DIR, f"pipeline-{commit}.json")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장 → {out_path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
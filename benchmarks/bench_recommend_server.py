@@ -0,0 +1,61 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import numpy as np
+
+from recommend_server import make_server
+
+"""
+추천 서비스 부하 테스트: 서버를 같은 프로세스의 스레드로 띄우고 동시 요청을 보내 지연시간 측정
+실행: 프로젝트 루트에서 python -m benchmarks.bench_recommend_server
+데이터/인덱스 로드는 서버 시작 전에 한 번만 수행되므로 요청 지연시간에는 포함되지 않음
+"""
+
+CONCURRENCY = 8
+REQUESTS_PER_ENDPOINT = 200
+SYMPTOMS = ["두통", "감기", "기침", "소화불량", "근육통", "알레르기"]
+INGREDIENTS = [
+    "acetaminophen",
+    "ibuprofen",
+    "acetaminophen,chlorpheniramine maleate",
+    "pyridoxine hydrochloride,nicotinamide",
+    "magnesium oxide",
+]
+
+
+def fetch(url):
+    start = time.perf_counter()
+    with urlopen(url) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def run(base_url, paths):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        latencies = np.array(list(pool.map(fetch, [base_url + p for p in paths])))
+    return latencies, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    server = make_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    workloads = {
+        "symptom": [f"/symptom?q={quote(SYMPTOMS[i % len(SYMPTOMS)])}" for i in range(REQUESTS_PER_ENDPOINT)],
+        "ingredients": [f"/ingredients?q={quote(INGREDIENTS[i % len(INGREDIENTS)])}" for i in range(REQUESTS_PER_ENDPOINT)],
+    }
+    for name, paths in workloads.items():
+        latencies, elapsed = run(base_url, paths)
+        print(f"{name:<12} 요청 {len(paths)}개 (동시 {CONCURRENCY}) | "
+              f"p50 {np.percentile(latencies, 50) * 1000:7.2f} ms | p99 {np.percentile(latencies, 99) * 1000:7.2f} ms | "
+              f"{len(paths) / elapsed:7.1f} req/s")
+
+    with urlopen(base_url + "/stats") as response:
+        print("서버 측 통계:", json.dumps(json.loads(response.read()), ensure_ascii=False))
+    server.shutdown()
@@ -0,0 +1,66 @@
+import time
+
+import numpy as np
+
+from medicine_data import load_medicine_info
+from rule_index import RuleIndex, RULES_PATH
+from rule_store import RuleStore
+
+"""
+연관 규칙 조회 벤치마크: 기존 전체 스캔(iterrows + issubset) vs 성분 역색인(RuleIndex)
+실행: 프로젝트 루트에서 python -m benchmarks.bench_rule_index
+쿼리: 실제 제품 성분 조합(정규화된 ing_list, 규칙과 같은 성분 이름)에서 무작위 추출한 1~4개 성분
+"""
+
+N_QUERIES = 300
+
+
+# 기존 ing_recommendation의 1단계 (전체 스캔)
+def full_scan(fp_rules, input_ings):
+    candidate_rules = []
+    for atc, rules in fp_rules.items():
+        for _, row in rules.iterrows():
+            if input_ings and row['antecedents'].issubset(set(input_ings)):
+                candidate_rules.append((atc, min(row['consequents']), row['lift']))
+    return candidate_rules
+
+
+def make_queries(n, seed=0):
+    baskets = [sorted(ings) for ings in load_medicine_info()['ing_list'] if ings]
+    rng = np.random.default_rng(seed)
+    queries = []
+    for basket_no in rng.integers(0, len(baskets), size=n):
+        basket = baskets[basket_no]
+        size = min(len(basket), int(rng.integers(1, 5)))
+        queries.append(list(rng.choice(basket, size=size, replace=False)))
+    return queries
+
+
+if __name__ == "__main__":
+    queries = make_queries(N_QUERIES)
+
+    start = time.perf_counter()
+    fp_rules = RuleStore(RULES_PATH).to_dict()
+    frames_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = RuleIndex.load(RULES_PATH)
+    index_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scan_results = [full_scan(fp_rules, q) for q in queries]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_results = [index.candidate_rules(q) for q in queries]
+    index_time = time.perf_counter() - start
+
+    # 결과 일치 확인 (규칙 순서까지 동일해야 함)
+    mismatch = sum(a != b for a, b in zip(scan_results, index_results))
+    matched = sum(len(r) for r in index_results)
+
+    print(f"규칙 {len(index)}개 / 그룹 {len(fp_rules)}개 / 쿼리 {N_QUERIES}개 (매칭 규칙 합계 {matched}개)")
+    print(f"그룹별 DataFrame 로드 {frames_load * 1000:.1f} ms, 인덱스 로드 {index_build * 1000:.1f} ms")
+    print(f"전체 스캔   : {scan_time / N_QUERIES * 1000:8.3f} ms/쿼리")
+    print(f"RuleIndex   : {index_time / N_QUERIES * 1000:8.3f} ms/쿼리 (x{scan_time / index_time:.0f})")
+    print(f"결과 불일치 : {mismatch}건")
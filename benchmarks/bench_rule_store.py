@@ -0,0 +1,88 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from rule_store import STORE_PATH, RuleStore, write_rule_store
+
+"""
+규칙 저장 형식 벤치마크: 그룹별 DataFrame pickle(기존 fp_rules.pkl) vs 규칙 저장 폴더(rule_store)
+실행: 프로젝트 루트에서 python -m benchmarks.bench_rule_store
+실제 단항 규칙을 그룹 안에서 복제해서 1x / 10x / 100x 규모로 저장한 뒤,
+측정마다 새 프로세스에서 로드 시간과 로드 직후 상주 메모리 증가량(/proc/self/statm RSS, import 이후 기준)을 측정
+(ru_maxrss는 import 중 최대치에 가려져서 쓰지 않음, Linux 전용)
+"그룹 하나"는 규칙이 가장 많은 그룹 기준
+"""
+
+SCALES = [1, 10, 100]
+
+# 측정용 자식 프로세스 코드 (import 이후 메모리를 기준으로 로드 단계만 측정)
+MEASURE = """
+import json, os, pickle, sys, time
+from rule_index import RuleIndex
+from rule_store import RuleStore
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+case, path, group = sys.argv[1:4]
+base = rss_kb()
+start = time.perf_counter()
+if case == "pickle: 전체 로드":
+    with open(path, "rb") as f:
+        rules = pickle.load(f)
+elif case == "pickle: 그룹 하나":
+    with open(path, "rb") as f:
+        rules = pickle.load(f)[group]
+elif case == "pickle: RuleIndex":
+    with open(path, "rb") as f:
+        index = RuleIndex(pickle.load(f))
+elif case == "store : 열기(mmap)":
+    store = RuleStore(path)
+elif case == "store : 그룹 하나":
+    frame = RuleStore(path).group_frame(group)
+elif case == "store : 전체 DataFrame":
+    rules = RuleStore(path).to_dict()
+elif case == "store : RuleIndex":
+    index = RuleIndex.load(path)
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "rss_kb": rss_kb() - base}))
+"""
+
+PICKLE_CASES = ["pickle: 전체 로드", "pickle: 그룹 하나", "pickle: RuleIndex"]
+STORE_CASES = ["store : 열기(mmap)", "store : 그룹 하나", "store : 전체 DataFrame", "store : RuleIndex"]
+
+
+def measure(case, path, group):
+    result = subprocess.run([sys.executable, "-c", MEASURE, case, path, group],
+                            capture_output=True, text=True, check=True, cwd=os.getcwd())
+    return json.loads(result.stdout)
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+if __name__ == "__main__":
+    rules = RuleStore(STORE_PATH).to_dict()
+    sample_group = max(rules, key=lambda code: len(rules[code]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in SCALES:
+            scaled = {code: pd.concat([frame] * scale, ignore_index=True) for code, frame in rules.items()}
+            pickle_path = os.path.join(tmp, f"fp_rules_{scale}x.pkl")
+            store_path = os.path.join(tmp, f"fp_rules_{scale}x")
+            with open(pickle_path, "wb") as f:
+                pickle.dump(scaled, f)
+            write_rule_store(scaled, store_path)
+
+            n_rules = sum(len(frame) for frame in scaled.values())
+            print(f"{scale:>4}x: 규칙 {n_rules}개 | pickle {os.path.getsize(pickle_path) / 1024:8.0f} KB | "
+                  f"store {dir_size(store_path) / 1024:8.0f} KB")
+            for case in PICKLE_CASES + STORE_CASES:
+                path = pickle_path if case.startswith("pickle") else store_path
+                result = measure(case, path, sample_group)
+                print(f"   {case:<22}: {result['seconds'] * 1000:8.1f} ms | 메모리 +{result['rss_kb'] / 1024:6.1f} MB")
@@ -0,0 +1,67 @@
+import time
+
+import pandas as pd
+
+from association_02 import extract_transactions, mine_groups, summarize_rules
+from atc_groups import get_atc_groups
+
+"""
+규칙 요약 단계 벤치마크: 기존 그룹별 iterrows 루프 vs 컬럼 단위 summarize_rules
+실행: 프로젝트 루트에서 python -m benchmarks.bench_rule_summary
+실제 마이닝 결과를 그룹 안에서 복제해서 규칙 수를 1x / 10x / 100x로 늘림 (min_support를 낮춘 경우와 비슷한 규모)
+"""
+
+SCALES = [1, 10, 100]
+LOOP_MAX_SCALE = 10  # 기존 루프는 100x에서 너무 오래 걸려 생략
+
+
+# 기존 association_02의 요약 루프
+def summarize_rules_loop(rules_results, groups, min_support=0.1, min_confidence=0.6, min_lift=1.5):
+    summary_rows = []
+    for atc_code in groups:
+        if atc_code not in rules_results:
+            continue
+        rules_df = rules_results[atc_code]
+        filtered = rules_df[
+            (rules_df['support'] >= min_support) &
+            (rules_df['confidence'] >= min_confidence) &
+            (rules_df['lift'] >= min_lift)
+        ]
+        for _, row in filtered.sort_values(by='lift', ascending=False).iterrows():
+            summary_rows.append({
+                'ATC 그룹': atc_code,
+                'Antecedents': ', '.join(sorted(row['antecedents'])),
+                'Consequents': ', '.join(sorted(row['consequents'])),
+                'support': round(row['support'], 3),
+                'confidence': round(row['confidence'], 3),
+                'lift': round(row['lift'], 3)
+            })
+    return pd.DataFrame(summary_rows)
+
+
+if __name__ == "__main__":
+    selected_groups, _, atc_group_cutoff, _ = get_atc_groups()
+    group_transactions = {}
+    for atc_code in selected_groups:
+        transactions = extract_transactions(atc_group_cutoff[atc_group_cutoff['atc_3'] == atc_code])
+        if transactions:
+            group_transactions[atc_code] = transactions
+    _, rules_results, _, _, _ = mine_groups(group_transactions, backend="numpy", verbose=False)
+
+    for scale in SCALES:
+        scaled = {code: pd.concat([rules] * scale, ignore_index=True) for code, rules in rules_results.items()}
+        groups = list(scaled)
+        n_rules = sum(len(r) for r in scaled.values())
+
+        start = time.perf_counter()
+        summary = summarize_rules(scaled, groups)
+        columnar = time.perf_counter() - start
+        line = f"{scale:>4}x: 규칙 {n_rules:>8}개 → 요약 {len(summary):>7}행 | summarize_rules {columnar:7.3f}s"
+
+        if scale <= LOOP_MAX_SCALE:
+            start = time.perf_counter()
+            expected = summarize_rules_loop(scaled, groups)
+            loop = time.perf_counter() - start
+            same = sorted(map(tuple, expected.values.tolist())) == sorted(map(tuple, summary.values.tolist()))
+            line += f" | 기존 루프 {loop:7.3f}s (x{loop / columnar:.0f}, 결과 일치: {same})"
+        print(line)
@@ -0,0 +1,81 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_batch_recommend import sample_baskets
+from ingredient_index import IngredientIndex
+from medicine_data import load_medicine_info
+from similarity_search import MinHashLSH
+
+"""
+유사 제품 검색 백엔드 벤치마크: exact(희소 posting) vs minhash(MinHash-LSH + 후보 재정렬)
+실행: 프로젝트 루트에서 python -m benchmarks.bench_similarity_search
+카탈로그 1x(실제 제품) / 10x(실제 제품 + 성분을 일부 바꾼 합성 제품) 에서 쿼리당 지연시간과 recall@5 측정
+recall@5: 근사 결과 중 exact 5번째 유사도 이상인 제품 비율 (동점 제품은 어느 쪽이든 정답으로 인정)
+"""
+
+SCALES = [1, 10]
+LSH_SETTINGS = [
+    # (num_perm, bands)
+    (64, 64),
+    (64, 32),
+    (128, 32),
+]
+N_QUERIES = 500
+K = 5
+SEED = 0
+
+
+def synthetic_catalog(medicine_df, scale, seed=SEED):
+    """실제 제품 + (scale - 1)배의 합성 제품 (성분 하나를 빼거나 빈도 비례로 뽑은 성분 하나를 추가)"""
+    if scale == 1:
+        return medicine_df[['ing_en']]
+    rng = np.random.default_rng(seed)
+    ing_lists = medicine_df['ing_list'].tolist()
+    vocab, counts = np.unique(np.concatenate([ings for ings in ing_lists if ings]), return_counts=True)
+    copies = []
+    for _ in range(scale - 1):
+        for ings in ing_lists:
+            ings = list(ings)
+            if len(ings) > 1 and rng.random() < 0.3:
+                ings.pop(int(rng.integers(len(ings))))
+            if rng.random() < 0.5:
+                ings.append(str(vocab[rng.choice(len(vocab), p=counts / counts.sum())]))
+            copies.append('/'.join(ings))
+    return pd.concat([medicine_df[['ing_en']], pd.DataFrame({'ing_en': copies})], ignore_index=True)
+
+
+def timed_queries(search, baskets):
+    results, latencies = [], []
+    for basket in baskets:
+        start = time.perf_counter()
+        results.append(search.top_k(basket, K))
+        latencies.append(time.perf_counter() - start)
+    return results, np.array(latencies)
+
+
+def recall_at_k(exact, approx):
+    hits = [np.sum(a_scores >= e_scores[-1] - 1e-12) for (_, e_scores), (_, a_scores) in zip(exact, approx)]
+    return np.mean(np.minimum(hits, K)) / K
+
+
+if __name__ == "__main__":
+    medicine_df = load_medicine_info()
+    baskets = sample_baskets(N_QUERIES)
+
+    for scale in SCALES:
+        index = IngredientIndex.from_frame(synthetic_catalog(medicine_df, scale))
+        exact, latencies = timed_queries(index, baskets)
+        print(f"{scale:>3}x: 제품 {index.n_products}개")
+        print(f"   exact              : p50 {np.percentile(latencies, 50) * 1000:6.3f} ms | "
+              f"p99 {np.percentile(latencies, 99) * 1000:6.3f} ms | recall@{K} 1.000")
+
+        for num_perm, bands in LSH_SETTINGS:
+            start = time.perf_counter()
+            lsh = MinHashLSH(index, num_perm=num_perm, bands=bands)
+            build = time.perf_counter() - start
+            approx, latencies = timed_queries(lsh, baskets)
+            print(f"   minhash {num_perm:>3}/{bands:<3}    : p50 {np.percentile(latencies, 50) * 1000:6.3f} ms | "
+                  f"p99 {np.percentile(latencies, 99) * 1000:6.3f} ms | recall@{K} {recall_at_k(exact, approx):.3f} "
+                  f"| 빌드 {build:.2f}s")
@@ -0,0 +1,123 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from medicine_data import MEDICINE_PATH
+from Preprocessing_00 import column_map, selected_columns
+
+"""
+합성 식약처 의약품등제품정보목록(엑셀) 생성기 (파이프라인 규모 벤치마크용)
+배포된 filtered_medicine_info.csv를 기준으로 scale배 규모의 원본 형식 엑셀을 만듦
+- 실제 제품은 그대로 포함하고, 나머지는 실제 제품을 무작위로 골라 복제 → ATC 분포 유지
+- 복제 제품의 주성분은 같은 atc_3 그룹의 성분 동시 등장을 따라 변형
+  (성분 하나 제거 / 기존 성분 하나를 가진 같은 그룹 제품에서 다른 성분 하나 추가)
+- 원본 엑셀처럼 전처리에서 걸러지는 행(취소/취하, ATC 코드 없음)도 같은 비율로 추가
+실행: python -m benchmarks.synthetic_registry --scale 10 --out /tmp/registry_10x.xlsx
+"""
+
+SEED = 0
+DROP_PROB = 0.3  # 성분이 2개 이상인 복제 제품에서 성분 하나를 뺄 확률
+ADD_PROB = 0.5  # 동시 등장 성분 하나를 추가할 확률
+FILTERED_RATIO = 1960 / 8338  # 원본 엑셀에서 전처리로 걸러지는 행 비율 (8338행 중 6378행 사용)
+
+# 전처리 결과 컬럼 → 원본 엑셀 컬럼 (한글)
+RAW_COLUMNS = {new: raw for raw, new in column_map.items()}
+
+
+def split_raw(raw):
+    """원본 표기 그대로 '/' 분리 (정규화는 파이프라인이 수행)"""
+    return [i.strip() for i in str(raw).split('/') if i.strip()] if isinstance(raw, str) else []
+
+
+def cooccurrence_sampler(medicine_df, rng):
+    """
+    atc_3 그룹별 성분 → 그 성분을 가진 그룹 내 제품 리스트
+    add(group, ings): 기존 성분 하나를 골라 그 성분을 가진 같은 그룹 제품의 다른 성분 하나를 반환 (없으면 None)
+    """
+    ing_lists = medicine_df['ing_en'].map(split_raw).tolist()
+    postings = {}
+    for row, (group, ings) in enumerate(zip(medicine_df['atc_3'], ing_lists)):
+        for ing in ings:
+            postings.setdefault((group, ing), []).append(row)
+
+    def add(group, ings):
+        if not ings:
+            return None
+        anchor = ings[int(rng.integers(len(ings)))]
+        rows = postings.get((group, anchor), [])
+        partner = ing_lists[rows[int(rng.integers(len(rows)))]] if rows else []
+        choices = [ing for ing in partner if ing not in ings]
+        return choices[int(rng.integers(len(choices)))] if choices else None
+
+    return ing_lists, add
+
+
+def synthetic_registry(medicine_df, scale, seed=SEED):
+    """
+    전처리 결과 형식(selected_columns + atc_1~4) DataFrame → scale배 규모의 합성 제품 DataFrame
+    (앞의 len(medicine_df)행은 실제 제품 그대로)
+    """
+    rng = np.random.default_rng(seed)
+    n = len(medicine_df)
+    templates = rng.integers(n, size=n * (scale - 1))
+    ing_lists, add = cooccurrence_sampler(medicine_df, rng)
+
+    groups = medicine_df['atc_3'].tolist()
+    new_ings = []
+    for row in templates.tolist():
+        ings = list(ing_lists[row])
+        if len(ings) > 1 and rng.random() < DROP_PROB:
+            ings.pop(int(rng.integers(len(ings))))
+        if rng.random() < ADD_PROB:
+            extra = add(groups[row], ings)
+            if extra is not None:
+                ings.append(extra)
+        new_ings.append('/'.join(ings))
+
+    copies = medicine_df.iloc[templates].reset_index(drop=True)
+    copies['ing_en'] = new_ings
+    first_code = int(medicine_df['product_code'].max()) + 1
+    copies['product_code'] = np.arange(first_code, first_code + len(copies))
+    copies['e_code'] = copies['product_code'].where(copies['e_code'].notna())
+    return pd.concat([medicine_df, copies], ignore_index=True)
+
+
+def write_registry_xlsx(registry_df, path, filtered_ratio=FILTERED_RATIO, seed=SEED):
+    """
+    합성 제품 → 원본 형식 엑셀 (한글 컬럼명, 전처리에 필요한 컬럼만)
+    전처리에서 걸러지는 행(취소/취하 또는 ATC 코드 없음)을 filtered_ratio 비율만큼 뒤에 추가
+    반환: 전체 행 수
+    """
+    rng = np.random.default_rng(seed + 1)
+    n_filtered = int(round(len(registry_df) * filtered_ratio / (1 - filtered_ratio)))
+    dropped = registry_df.iloc[rng.integers(len(registry_df), size=n_filtered)].copy()
+    cancelled = rng.random(n_filtered) < 0.5
+    dropped['cancel'] = np.where(cancelled, '취소', '정상')
+    dropped['atc'] = dropped['atc'].where(cancelled, None)
+    dropped['product_code'] = np.arange(len(dropped)) + int(registry_df['product_code'].max()) + 1
+
+    rows = pd.concat([registry_df, dropped], ignore_index=True)[selected_columns]
+    rows['product_code'] = rows['product_code'].astype('int64').astype(str)
+    rows['e_code'] = rows['e_code'].map(lambda v: '' if pd.isna(v) else str(int(v)))
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([RAW_COLUMNS[col] for col in selected_columns])
+    for values in rows.itertuples(index=False, name=None):
+        sheet.append(['' if isinstance(v, float) and np.isnan(v) else v for v in values])
+    workbook.save(path)
+    return len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="합성 의약품등제품정보목록 엑셀 생성")
+    parser.add_argument("--scale", type=int, default=10, help="실제 제품 수 대비 배수")
+    parser.add_argument("--out", required=True, help="저장할 엑셀 파일")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    registry = synthetic_registry(pd.read_csv(MEDICINE_PATH), args.scale, args.seed)
+    n_rows = write_registry_xlsx(registry, args.out, seed=args.seed)
+    print(f"✅ 제품 {len(registry)}개 (전체 {n_rows}행) 저장 완료 → {args.out}")
@@ -0,0 +1,212 @@
+// ATC 그룹별 주성분 Chord Diagram 대시보드
+// index.html이 로컬 BokehJS(bokeh.min.js, core + plotting API)와 이 파일을 한 번만 불러오고,
+// 그룹을 바꿀 때마다 groups/<ATC>.json만 가져와서 브라우저에서 Chord 그래프를 만듦
+// payload: {atc, title, nodes: [{name, color}], edges: [{source, target, lift, rule_count, value}], options}
+// 노드/chord 배치는 HoloViews layout_chords와 같은 방식 (html 모드와 같은 그림)
+// 한 번 그린 그룹은 DOM을 그대로 두고 숨김/표시만 전환 (다시 그리지 않음)
+(function () {
+  "use strict";
+
+  var MAX_CHORDS = 500;
+  var CHORD_SAMPLES = 50;
+
+  function linspace(start, end, num) {
+    var values = [];
+    for (var i = 0; i < num; i++) {
+      values.push(num === 1 ? start : start + (end - start) * i / (num - 1));
+    }
+    return values;
+  }
+
+  // 두 끝점 + 제어점 두 개(끝점의 절반 지점)를 지나는 곡선 (holoviews quadratic_bezier와 같은 식)
+  function bezier(x0, y0, x1, y1, steps) {
+    var xs = [], ys = [];
+    linspace(0, 1, steps).forEach(function (t) {
+      var a = (1 - t) * (1 - t) * (1 - t), b = 3 * (1 - t) * (1 - t) * t, c = 3 * (1 - t) * t * t, d = t * t * t;
+      xs.push(a * x0 + b * x0 / 2 + c * x1 / 2 + d * x1);
+      ys.push(a * y0 + b * y0 / 2 + c * y1 / 2 + d * y1);
+    });
+    return [xs, ys];
+  }
+
+  // 노드 위치(원 위) + 엣지별 chord 경로 (여러 chord는 NaN으로 구분)
+  // lift가 클수록 엣지에 chord를 더 많이 배정하고, 노드가 차지하는 호의 길이는 연결된 chord 수에 비례
+  function chordLayout(nodes, edges) {
+    var n = nodes.length;
+    var lifts = edges.map(function (e) { return e.lift; });
+    var minLift = Math.min.apply(null, lifts);
+    var values = lifts.map(function (lift) { return Math.ceil(lift * (1 / minLift)); });
+    var total = values.reduce(function (a, b) { return a + b; }, 0);
+    if (total > MAX_CHORDS) {
+      values = values.map(function (v) { return Math.ceil(v / total * MAX_CHORDS); });
+    }
+
+    var matrix = {};
+    var weights = nodes.map(function () { return 0; });
+    edges.forEach(function (e, i) {
+      var key = e.source * n + e.target;
+      matrix[key] = (matrix[key] || 0) + values[i];
+      weights[e.source] += values[i];
+      weights[e.target] += values[i];
+    });
+    var weightSum = weights.reduce(function (a, b) { return a + b; }, 0);
+
+    var points = [0];
+    weights.forEach(function (w, i) { points.push(points[i] + w / weightSum * 2 * Math.PI); });
+    var areas = weights.map(function (w, i) {
+      return linspace(points[i], points[i + 1], Math.floor(w)).map(function (a) { return [Math.cos(a), Math.sin(a)]; });
+    });
+    var nodeX = [], nodeY = [];
+    for (var i = 0; i < n; i++) {
+      var mid = (points[i] + points[i + 1]) / 2;
+      nodeX.push(Math.cos(mid));
+      nodeY.push(Math.sin(mid));
+    }
+
+    var paths = edges.map(function (e) {
+      var srcArea = areas[e.source], tgtArea = areas[e.target];
+      var xs = [], ys = [];
+      for (var c = 0; c < matrix[e.source * n + e.target]; c++) {
+        if (!srcArea.length || !tgtArea.length) {
+          continue;
+        }
+        var start = srcArea.pop();
+        if (!tgtArea.length) {
+          continue;
+        }
+        var end = tgtArea.pop();
+        var curve = bezier(start[0], start[1], end[0], end[1], CHORD_SAMPLES);
+        if (xs.length) {
+          xs.push(NaN);
+          ys.push(NaN);
+        }
+        xs = xs.concat(curve[0]);
+        ys = ys.concat(curve[1]);
+      }
+      return [xs, ys];
+    });
+    return {nodeX: nodeX, nodeY: nodeY, paths: paths};
+  }
+
+  // 그룹 하나의 Bokeh figure (html 모드와 같은 스타일: 축 없음, 엣지 색 = source 노드 색, 굵기 = value)
+  function chordFigure(payload) {
+    var options = payload.options;
+    var names = payload.nodes.map(function (node) { return node.name; });
+    var colors = payload.nodes.map(function (node) { return node.color; });
+    var layout = chordLayout(payload.nodes, payload.edges);
+
+    var range = function () { return new Bokeh.Range1d({start: -1.1, end: 1.1}); };
+    var fig = Bokeh.Plotting.figure({
+      width: options.width, height: options.height, title: payload.title,
+      x_axis_type: null, y_axis_type: null, x_range: range(), y_range: range(),
+      tools: "pan,wheel_zoom,box_zoom,reset,save"
+    });
+
+    var edgeSource = new Bokeh.ColumnDataSource({data: {
+      xs: layout.paths.map(function (p) { return p[0]; }),
+      ys: layout.paths.map(function (p) { return p[1]; }),
+      source: payload.edges.map(function (e) { return names[e.source]; }),
+      target: payload.edges.map(function (e) { return names[e.target]; }),
+      lift: payload.edges.map(function (e) { return e.lift; }),
+      rule_count: payload.edges.map(function (e) { return e.rule_count; }),
+      value: payload.edges.map(function (e) { return e.value; }),
+      edge_color: payload.edges.map(function (e) { return colors[e.source]; }),
+      edge_line_width: payload.edges.map(function (e) { return e.value * options.edge_width_scale; })
+    }});
+    var edges = fig.multi_line({field: "xs"}, {field: "ys"}, {
+      source: edgeSource, line_color: {field: "edge_color"}, line_width: {field: "edge_line_width"}, line_alpha: 0.7,
+      hover_line_color: "black", hover_line_width: 5, hover_line_alpha: 1.0
+    });
+    fig.scatter({field: "x"}, {field: "y"}, {
+      source: new Bokeh.ColumnDataSource({data: {x: layout.nodeX, y: layout.nodeY, name: names, node_color: colors}}),
+      size: options.node_size, fill_color: {field: "node_color"}, line_color: "black"
+    });
+    fig.add_tools(new Bokeh.HoverTool({
+      renderers: [edges],
+      tooltips: [["source", "@source"], ["target", "@target"], ["lift", "@lift"], ["rule_count", "@rule_count"],
+                 ["value", "@value"]]
+    }));
+    return fig;
+  }
+
+  // 그룹마다 자식 div 하나에 figure를 그림
+  function renderChord(container, payload) {
+    var view = document.createElement("div");
+    container.appendChild(view);
+    Bokeh.Plotting.show(chordFigure(payload), view);
+    return view;
+  }
+
+  // 주성분 범례 (html 모드 범례와 같은 모양, 이름은 textContent로만 넣음)
+  function renderLegend(container, payload) {
+    var title = document.createElement("h3");
+    title.style.fontFamily = "sans-serif";
+    title.textContent = payload.atc + " 주성분";
+
+    var list = document.createElement("ul");
+    list.style.listStyle = "none";
+    list.style.paddingLeft = "0";
+    payload.nodes.forEach(function (node) {
+      var item = document.createElement("li");
+      item.style.marginBottom = "4px";
+      var swatch = document.createElement("span");
+      swatch.style.display = "inline-block";
+      swatch.style.width = "14px";
+      swatch.style.height = "14px";
+      swatch.style.background = node.color;
+      swatch.style.marginRight = "6px";
+      swatch.style.borderRadius = "50%";
+      item.appendChild(swatch);
+      item.appendChild(document.createTextNode(node.name));
+      list.appendChild(item);
+    });
+
+    container.replaceChildren(title, list);
+  }
+
+  // 그룹 목록을 불러와 선택 상자를 만들고, 선택한 그룹 payload만 가져와서 렌더링
+  function initDashboard(select, chordContainer, legendContainer) {
+    var views = {};
+    var payloads = {};
+
+    function show(group) {
+      var render = function (payload) {
+        Object.keys(views).forEach(function (atc) { views[atc].style.display = "none"; });
+        if (!views[group.atc]) {
+          views[group.atc] = renderChord(chordContainer, payload);
+        }
+        views[group.atc].style.display = "";
+        renderLegend(legendContainer, payload);
+        window.location.hash = group.atc;
+      };
+      if (payloads[group.atc]) {
+        render(payloads[group.atc]);
+        return;
+      }
+      fetch(group.file).then(function (r) { return r.json(); }).then(function (payload) {
+        payloads[group.atc] = payload;
+        render(payload);
+      });
+    }
+
+    fetch("groups.json").then(function (r) { return r.json(); }).then(function (groups) {
+      groups.forEach(function (group, i) {
+        var option = document.createElement("option");
+        option.value = i;
+        option.textContent = group.atc;
+        select.appendChild(option);
+      });
+      var initial = groups.findIndex(function (g) { return "#" + g.atc === window.location.hash; });
+      select.value = initial < 0 ? 0 : initial;
+      select.addEventListener("change", function () { show(groups[select.value]); });
+      if (groups.length) {
+        show(groups[select.value]);
+      }
+    });
+  }
+
+  window.ChordViewer = {
+    chordLayout: chordLayout, chordFigure: chordFigure, renderChord: renderChord, renderLegend: renderLegend,
+    initDashboard: initDashboard
+  };
+})();
@@ -0,0 +1,39 @@
+"""
+ATC 그룹별 주성분 비트셋 (성분 조합 포함 제품 비율 계산용)
+그룹마다 성분 → 정수 비트마스크(그룹 내 제품 번호 비트)를 미리 만들어 두고
+"그룹 내 제품 중 성분 조합을 모두 포함하는 제품 수" = 성분 비트마스크 AND → popcount(bit_count)
+"""
+
+
+class GroupCoverage:
+    """
+    masks: 그룹 → {성분: 그룹 내 해당 성분을 가진 제품 비트마스크(int)}
+    sizes: 그룹 → 제품 수, rows: 그룹 → 그룹 내 비트 순서의 원본 행 번호 (진단 출력용)
+    """
+
+    def __init__(self, medicine_df, level="atc_3", ing_column="ing_list"):
+        self.masks, self.sizes, self.rows = {}, {}, {}
+        for row, (group, ings) in enumerate(zip(medicine_df[level], medicine_df[ing_column])):
+            if not isinstance(group, str):
+                continue
+            bit = self.sizes.get(group, 0)
+            group_masks = self.masks.setdefault(group, {})
+            for ing in set(ings):
+                group_masks[ing] = group_masks.get(ing, 0) | (1 << bit)
+            self.sizes[group] = bit + 1
+            self.rows.setdefault(group, []).append(row)
+
+    def covered_mask(self, group, ingredients):
+        """그룹 내 성분 조합을 모두 포함하는 제품 비트마스크 (없는 성분이 있으면 0)"""
+        group_masks = self.masks.get(group, {})
+        mask = (1 << self.sizes.get(group, 0)) - 1
+        for ing in set(ingredients):
+            mask &= group_masks.get(ing, 0)
+            if not mask:
+                break
+        return mask
+
+    def coverage(self, group, ingredients):
+        """(포함 제품 수, 그룹 제품 수)"""
+        return self.covered_mask(group, ingredients).bit_count(), self.sizes.get(group, 0)
+
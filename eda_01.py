@@ -1,7 +1,15 @@
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 from wordcloud import WordCloud
+import instrumentation
+from atc_groups import get_atc_groups
 
 # macOS용 한글 폰트 설정 (AppleGothic)
 mpl.rc('font', family='AppleGothic')
@@ -12,96 +20,221 @@ plt.rcParams['axes.unicode_minus'] = False  # 마이너스 깨짐 방지
 그룹들 중에서 빈도가 적어 의미없는 그룹 cutoff(빈도 30이하)
 """
 
-# 데이터 불러오기
-file_path = 'raw_Medicine_data/filtered_medicine_info.csv'
-medicine_info = pd.read_csv(file_path)
-
-# atc_3 컬럼(앞 4자리)을 기준으로 그룹화
-atc_group_counts = medicine_info['atc_3'].value_counts().reset_index()
-atc_group_counts.columns = ['atc_3', 'count']
+# 데이터 불러오기 + atc_3 컬럼(앞 4자리)을 기준으로 그룹화, 그룹별 빈도에서 50개 이상인 그룹만 선택
+# (그룹 계산은 atc_groups 모듈에서 수행 → 마이닝 코드는 이 모듈 대신 atc_groups를 직접 사용)
+atc_groups = get_atc_groups(min_count=50, level='atc_3')
+atc_group_counts = atc_groups.group_counts
 
 # 결과 출력 -> 총 97개의 ATC 그룹 발생(효능이 일치하는 그룹)
 print("************************ATC 앞 4자리 기준 그룹************************")
 print(atc_group_counts)
 
-# 그룹별 빈도에서 50개 이상인 그룹만 선택
-selected_groups = atc_group_counts[atc_group_counts['count'] >= 50]['atc_3'].tolist()
-# print(len(selected_groups)) # 100개 이상: 21개 그룹 / 50개 이상: 38개 그룹 / 30개 이상: 50개 그룹
+# 100개 이상: 21개 그룹 / 50개 이상: 38개 그룹 / 30개 이상: 50개 그룹
+selected_groups = atc_groups.selected_groups
 
 # 원본 데이터에서 해당 그룹들만 필터링
-atc_group_cutoff = medicine_info[medicine_info['atc_3'].isin(selected_groups)]
+atc_group_cutoff = atc_groups.group_cutoff
 
 # selected_groups 기준으로 필터링된 그룹 빈도 데이터프레임 만들기
-filtered_group_counts = atc_group_counts[atc_group_counts['atc_3'].isin(selected_groups)]
+filtered_group_counts = atc_groups.filtered_group_counts
 
 """
 ATC 그룹별 주성분 빈도 시각화
 각 ATC 그룹에서 많이 사용되는 주성분들 확인
+- 기본: 그래프를 화면에 표시(plt.show)
+- --report: 화면 없이(Agg) 그룹별 WordCloud / Top N 막대 그래프를 파일로 저장하고 index.html 하나로 묶음
 """
 
-# 직접 실행될 때만 실행될 수 있도록 설정
-if __name__ == "__main__":
-
-    # 그룹 내 OTC 수 상위 10개, 하위 10개 ATC 그룹 추출하여 시각화
+REPORT_DIR = "eda_report"
+TOP_N = 15
+WORDCLOUD_OPTIONS = {
+    "width": 800,
+    "height": 400,
+    "background_color": "white",
+    "colormap": "tab10",
+    "prefer_horizontal": 1.0,
+    "max_words": 60,
+    "min_font_size": 10,
+}
+
+
+def ingredient_counts_by_group(group_df, level="atc_3"):
+    """
+    그룹별 주성분 빈도 (정규화된 ing_list를 전체 제품에서 한 번 explode → groupby)
+    반환: {그룹: 성분 빈도 Series(빈도 내림차순, 동점은 그룹 안 첫 등장 순서)}
+    """
+    exploded = group_df[[level, 'ing_list']].explode('ing_list').dropna(subset=['ing_list'])
+
+    counts = exploded.groupby([level, 'ing_list'], sort=False, observed=True).size().rename('count').reset_index()
+    counts = counts.sort_values('count', ascending=False, kind='stable')
+    return {code: sub.set_index('ing_list')['count'].rename_axis(None)
+            for code, sub in counts.groupby(level, sort=False, observed=True)}
+
+
+def plot_top_bottom_groups(filtered_group_counts):
+    """그룹 내 OTC 수 상위 10개, 하위 10개 ATC 그룹 막대 그래프"""
     top_10 = filtered_group_counts.nlargest(10, 'count')
     bottom_10 = filtered_group_counts.nsmallest(10, 'count')
 
     combined = pd.concat([top_10, bottom_10])
     colors = ['skyblue'] * 10 + ['gray'] * 10
 
-    plt.figure(figsize=(12, 6))
+    fig = plt.figure(figsize=(12, 6))
     plt.bar(combined['atc_3'], combined['count'], color=colors)
     plt.title('Top & Bottom 10 ATC groups')
     plt.xlabel('ATC group')
     plt.ylabel('OTC count')
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    return fig
 
 
-    # 분석 대상 그룹 리스트 (전체 50개)
-    target_groups = selected_groups
+def make_wordcloud(ingredient_counts):
+    return WordCloud(**WORDCLOUD_OPTIONS).generate_from_frequencies(ingredient_counts)
 
-    # 분석할 그룹 리스트(38개 그룹)
-    groups_to_plot = target_groups
-    top_n = 15
 
-    # 폰트 설정
-    plt.rc('font', family='AppleGothic')
+def plot_wordcloud(atc_code, ingredient_counts):
+    fig = plt.figure(figsize=(10, 5))
+    plt.imshow(make_wordcloud(ingredient_counts), interpolation='bilinear')
+    plt.axis('off')
+    plt.title(f'{atc_code} 주요 성분 WordCloud', fontsize=14)
+    return fig
 
-    # 각 ATC 그룹별 주성분 빈도 시각화
-    for atc_code in groups_to_plot:
-        group_df = atc_group_cutoff[atc_group_cutoff['atc_3'] == atc_code]
 
-        # 성분 분리
-        transactions = group_df['ing_en'].dropna().apply(lambda x: [i.strip().lower() for i in x.split('/')])
-        all_ingredients = [i for sublist in transactions for i in sublist]
-        ingredient_counts = pd.Series(all_ingredients).value_counts()
+def plot_top_ingredients(atc_code, ingredient_counts, top_n=TOP_N):
+    """가로 막대 그래프"""
+    fig = plt.figure(figsize=(8, 6))
+    ingredient_counts.head(top_n).sort_values().plot(kind='barh', color='skyblue')
+    plt.title(f'{atc_code} 주요 성분 Top {top_n}', fontsize=14)
+    plt.xlabel('빈도수')
+    plt.tight_layout()
+    return fig
+
+
+def render_group_report(atc_code, ingredient_counts, output_dir=REPORT_DIR, top_n=TOP_N):
+    """그룹 하나의 WordCloud / Top N 막대 그래프를 PNG로 저장 (프로세스 풀에서 실행) → (파일 이름들, 렌더링 시간)"""
+    start = time.perf_counter()
+    wordcloud_file = f"{atc_code}_wordcloud.png"
+    bar_file = f"{atc_code}_top{top_n}.png"
+
+    # WordCloud는 matplotlib을 거치지 않고 바로 이미지로 저장 (제목은 index.html에 표시)
+    make_wordcloud(ingredient_counts).to_file(os.path.join(output_dir, wordcloud_file))
+    fig = plot_top_ingredients(atc_code, ingredient_counts, top_n)
+    fig.savefig(os.path.join(output_dir, bar_file), dpi=100)
+    plt.close(fig)
+    return (wordcloud_file, bar_file), time.perf_counter() - start
+
+
+def write_report_index(sections, skipped, output_dir=REPORT_DIR, top_n=TOP_N):
+    """
+    리포트 index.html 저장
+    sections: [(그룹, 제품 수, 성분 수, (WordCloud 파일, 막대 그래프 파일))], skipped: 유효한 성분이 없는 그룹
+    """
+    lines = [
+        '<!DOCTYPE html>',
+        '<html lang="ko">',
+        '<head><meta charset="utf-8"><title>ATC 그룹별 주성분 빈도 리포트</title></head>',
+        '<body style="font-family:sans-serif;">',
+        '<h1>ATC 그룹별 주성분 빈도 리포트</h1>',
+        '<img src="group_counts.png" alt="Top &amp; Bottom 10 ATC groups">',
+        '<p>' + ' · '.join(f'<a href="#{code}">{code}</a>' for code, *_ in sections) + '</p>',
+    ]
+    if skipped:
+        lines.append(f'<p>유효한 성분 없음: {html.escape(", ".join(skipped))}</p>')
+    for code, n_products, n_ingredients, (wordcloud_file, bar_file) in sections:
+        lines += [
+            f'<h2 id="{code}">{code} <small>(제품 {n_products}개 / 성분 {n_ingredients}종)</small></h2>',
+            f'<h3>{code} 주요 성분 WordCloud</h3>',
+            f'<img src="{wordcloud_file}" alt="{code} WordCloud">',
+            f'<h3>{code} 주요 성분 Top {top_n}</h3>',
+            f'<img src="{bar_file}" alt="{code} Top {top_n}">',
+        ]
+    lines += ['</body>', '</html>']
+    with open(os.path.join(output_dir, "index.html"), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def generate_report(groups, group_df, group_counts, output_dir=REPORT_DIR, top_n=TOP_N, workers=1):
+    """
+    화면 없이 리포트 생성: 그룹별 빈도표를 한 번에 계산 → 그룹별 이미지를 workers개 프로세스로 렌더링 → index.html
+    반환: {그룹: 렌더링 시간(초)}, 건너뛴 그룹 리스트
+    """
+    plt.switch_backend('Agg')
+    os.makedirs(output_dir, exist_ok=True)
+
+    fig = plot_top_bottom_groups(group_counts)
+    fig.savefig(os.path.join(output_dir, "group_counts.png"), dpi=100)
+    plt.close(fig)
+
+    with instrumentation.stage("frequency_tables"):
+        counts_by_group = ingredient_counts_by_group(group_df)
+        n_products = group_df['atc_3'].value_counts()
+    codes = [code for code in groups if code in counts_by_group]
+    skipped = [code for code in groups if code not in counts_by_group]
+
+    args = ([counts_by_group[code] for code in codes], [output_dir] * len(codes), [top_n] * len(codes))
+    with instrumentation.stage("render_groups"):
+        if workers > 1 and len(codes) > 1:
+            # spawn 방식으로 시작된 프로세스도 화면 없이 그리도록 Agg 지정
+            with ProcessPoolExecutor(max_workers=workers, initializer=plt.switch_backend,
+                                     initargs=('Agg',)) as executor:
+                results = list(executor.map(render_group_report, codes, *args))
+        else:
+            results = list(map(render_group_report, codes, *args))
+
+    sections = [(code, int(n_products[code]), len(counts_by_group[code]), files)
+                for code, (files, _) in zip(codes, results)]
+    write_report_index(sections, skipped, output_dir, top_n)
+
+    # 그룹별 제품 수 / 서로 다른 성분 수 / 렌더링 시간
+    for code, products, ingredients, _ in sections:
+        instrumentation.record("products", products, group=code)
+        instrumentation.record("distinct_ingredients", ingredients, group=code)
+    for code, (_, elapsed) in zip(codes, results):
+        instrumentation.record("render_seconds", elapsed, group=code)
+    instrumentation.record("groups_rendered", len(codes))
+    instrumentation.record("groups_skipped", len(skipped))
+    return {code: elapsed for code, (_, elapsed) in zip(codes, results)}, skipped
+
+
+# 직접 실행될 때만 실행될 수 있도록 설정
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ATC 그룹별 주성분 빈도 시각화")
+    parser.add_argument("--report", action="store_true", help="화면에 표시하지 않고 이미지 + index.html 리포트로 저장")
+    parser.add_argument("--out", default=REPORT_DIR, help="리포트 저장 폴더")
+    parser.add_argument("--top-n", type=int, default=TOP_N, help="그룹별 막대 그래프에 표시할 성분 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="리포트 렌더링 프로세스 수 (1이면 순차 실행)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.start_run("eda", args)
+
+    # 분석할 그룹 리스트(38개 그룹)
+    groups_to_plot = selected_groups
 
-        if ingredient_counts.empty:
+    if args.report:
+        start = time.perf_counter()
+        render_times, skipped = generate_report(groups_to_plot, atc_group_cutoff, filtered_group_counts,
+                                                args.out, args.top_n, args.workers)
+        for atc_code in skipped:
             print(f"⚠️ {atc_code}: 유효한 성분 없음 → 스킵")
-            continue
-
-        # WordCloud
-        wordcloud = WordCloud(
-            width=800, height=400,
-            background_color='white',
-            colormap='tab10',
-            prefer_horizontal=1.0,
-            max_words=60,
-            min_font_size=10
-        ).generate_from_frequencies(ingredient_counts)
-
-        plt.figure(figsize=(10, 5))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
-        plt.title(f'{atc_code} 주요 성분 WordCloud', fontsize=14)
+        print(f"\n리포트 {len(render_times)}개 그룹 저장 완료 (전체 {time.perf_counter() - start:.2f}s, "
+              f"프로세스 {args.workers}개) → {os.path.join(args.out, 'index.html')}")
+    else:
+        plot_top_bottom_groups(filtered_group_counts)
         plt.show()
 
-        # 가로 막대 그래프
-        plt.figure(figsize=(8, 6))
-        ingredient_counts.head(top_n).sort_values().plot(kind='barh', color='skyblue')
-        plt.title(f'{atc_code} 주요 성분 Top {top_n}', fontsize=14)
-        plt.xlabel('빈도수')
-        plt.tight_layout()
-        plt.show()
\ No newline at end of file
+        # 각 ATC 그룹별 주성분 빈도 시각화
+        counts_by_group = ingredient_counts_by_group(atc_group_cutoff)
+        for atc_code in groups_to_plot:
+            ingredient_counts = counts_by_group.get(atc_code)
+            if ingredient_counts is None:
+                print(f"⚠️ {atc_code}: 유효한 성분 없음 → 스킵")
+                continue
+
+            # WordCloud
+            plot_wordcloud(atc_code, ingredient_counts)
+            plt.show()
+
+            # 가로 막대 그래프
+            plot_top_ingredients(atc_code, ingredient_counts, args.top_n)
+            plt.show()
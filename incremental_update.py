@@ -0,0 +1,142 @@
+import argparse
+import os
+import shutil
+import time
+
+import pandas as pd
+
+import instrumentation
+from association_02 import extract_transactions, mine_groups, summarize_rules, SUMMARY_COLUMNS
+from atc_groups import select_groups
+from medicine_data import MEDICINE_PATH, load_medicine_info, load_vocabulary
+from rule_store import STORE_PATH, RuleStore, write_rule_store
+
+"""
+제품 목록 변경분만 반영하는 연관 규칙 증분 갱신
+이전 스냅샷과 새 filtered_medicine_info.csv를 product_code 기준으로 비교 → 변경된 atc_3 그룹만 다시 마이닝
+기존 atc_rule_summary.csv / 규칙 저장 폴더(data/fp_rules)에서 해당 그룹 결과만 교체
+스냅샷이 없으면 전체 그룹을 마이닝하고 스냅샷 생성
+"""
+
+NEW_PATH = MEDICINE_PATH
+SNAPSHOT_PATH = "data/filtered_medicine_info.snapshot.csv"
+SUMMARY_PATH = "data/atc_rule_summary.csv"
+RULES_PATH = STORE_PATH
+MIN_GROUP_COUNT = 50  # association_02와 같은 그룹 cutoff (기본값)
+
+
+def diff_registry(old_df, new_df):
+    """
+    product_code 기준 추가/삭제/변경 제품 비교
+    반환: (추가 코드, 삭제 코드, 변경 코드, 영향받은 atc_3 그룹 집합)
+    """
+    old = old_df.set_index('product_code')
+    new = new_df.set_index('product_code')
+
+    added = new.index.difference(old.index)
+    removed = old.index.difference(new.index)
+    common = old.index.intersection(new.index)
+
+    # 공통 제품은 전체 컬럼 비교 (양쪽 모두 NaN이면 같은 값으로 취급)
+    columns = [c for c in new.columns if c in old.columns]
+    old_common = old.loc[common, columns].astype(object)
+    new_common = new.loc[common, columns].astype(object)
+    differs = (old_common != new_common) & ~(old_common.isna() & new_common.isna())
+    changed = common[differs.any(axis=1).to_numpy()]
+
+    # 변경 전후 그룹 모두 영향 (다른 그룹으로 이동한 제품)
+    affected = set(new.loc[added, 'atc_3']) | set(old.loc[removed, 'atc_3'])
+    affected |= set(old.loc[changed, 'atc_3']) | set(new.loc[changed, 'atc_3'])
+    return added, removed, changed, {g for g in affected if isinstance(g, str)}
+
+
+def update_rules(new_path=NEW_PATH, snapshot_path=SNAPSHOT_PATH, summary_path=SUMMARY_PATH,
+                 rules_path=RULES_PATH, workers=1, min_support=0.1, max_len=3, full=False, top_n=50,
+                 backend="fpgrowth", min_confidence=0.6, min_lift=1.5, min_count=MIN_GROUP_COUNT):
+    """
+    마이닝 / 요약 파라미터는 association_02와 같은 의미 (전체 재마이닝과 같은 결과를 얻으려면 같은 값을 사용)
+    반환: 재마이닝한 그룹 리스트
+    """
+    new_df = load_medicine_info(new_path)
+    selected_groups = select_groups(new_df, min_count)
+
+    # 스냅샷 또는 기존 산출물이 없으면 전체 재마이닝
+    full = full or not all(os.path.exists(p) for p in (snapshot_path, summary_path, rules_path))
+    if full:
+        to_mine = list(selected_groups)
+        old_summary = pd.DataFrame(columns=SUMMARY_COLUMNS)
+        old_rules = {}
+        print(f"🔄 전체 재마이닝: ATC 그룹 {len(to_mine)}개")
+    else:
+        with instrumentation.stage("diff"):
+            added, removed, changed, affected = diff_registry(pd.read_csv(snapshot_path), new_df)
+        instrumentation.record("products_added", len(added))
+        instrumentation.record("products_removed", len(removed))
+        instrumentation.record("products_changed", len(changed))
+        to_mine = [g for g in selected_groups if g in affected]
+        old_summary = pd.read_csv(summary_path)
+        old_rules = RuleStore(rules_path)  # 유지되는 그룹만 병합 시점에 읽음
+        print(f"🔍 추가 {len(added)}개, 삭제 {len(removed)}개, 변경 {len(changed)}개 → 재마이닝 그룹 {len(to_mine)}개 {to_mine}")
+
+    instrumentation.record("groups_remined", len(to_mine))
+    if not full and not to_mine and set(old_rules) <= set(selected_groups):
+        print("✅ 변경된 그룹 없음 → 기존 결과 유지")
+        shutil.copyfile(new_path, snapshot_path)
+        return []
+
+    # 변경된 그룹만 마이닝
+    group_transactions = {}
+    for atc_code in to_mine:
+        transactions = extract_transactions(new_df[new_df['atc_3'] == atc_code])
+        if transactions:
+            group_transactions[atc_code] = transactions
+    _, rules_results, single_rules_results, _, _ = mine_groups(
+        group_transactions, workers=workers, min_support=min_support, max_len=max_len, top_n=top_n, backend=backend,
+        vocabulary=load_vocabulary(new_path)
+    )
+    new_summary = summarize_rules(rules_results, to_mine, min_support, min_confidence, min_lift)
+
+    # 병합: selected_groups 순서 유지, 재마이닝 그룹은 새 결과로 교체, 선택에서 빠진 그룹은 제거
+    remined = set(to_mine)
+    summary_parts, merged_rules = [], {}
+    with instrumentation.stage("merge"):
+        for atc_code in selected_groups:
+            source_summary = new_summary if atc_code in remined else old_summary
+            summary_parts.append(source_summary[source_summary['ATC 그룹'] == atc_code])
+            source_rules = single_rules_results if atc_code in remined else old_rules
+            if atc_code in source_rules:
+                merged_rules[atc_code] = source_rules[atc_code]
+        merged_summary = pd.concat(summary_parts, ignore_index=True) if summary_parts else old_summary.iloc[0:0]
+    instrumentation.record("rules_kept", len(merged_summary))
+
+    with instrumentation.stage("save"):
+        merged_summary.to_csv(summary_path, index=False)
+        write_rule_store(merged_rules, rules_path)
+        shutil.copyfile(new_path, snapshot_path)
+    print(f"✅ 규칙 요약 {len(merged_summary)}개, 단항 규칙 그룹 {len(merged_rules)}개 저장 완료")
+    return to_mine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="제품 목록 변경분 기반 연관 규칙 증분 갱신")
+    parser.add_argument("--new", default=NEW_PATH, help="새 전처리 결과 CSV")
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH, help="이전 마이닝 기준 스냅샷 CSV")
+    parser.add_argument("--workers", type=int, default=1, help="그룹 병렬 마이닝 프로세스 수")
+    parser.add_argument("--min-support", type=float, default=0.1, help="FP-Growth 최소 지지도")
+    parser.add_argument("--max-len", type=int, default=3, help="최대 조합 성분 수")
+    parser.add_argument("--top-n", type=int, default=50, help="그룹별 마이닝에 사용할 상위 성분 수")
+    parser.add_argument("--backend", choices=["fpgrowth", "numpy"], default="fpgrowth",
+                        help="마이닝 백엔드 (numpy: 행렬곱 기반, max_len <= 3 전용)")
+    parser.add_argument("--min-count", type=int, default=MIN_GROUP_COUNT, help="마이닝 대상 ATC 그룹 최소 제품 수")
+    parser.add_argument("--min-confidence", type=float, default=0.6, help="규칙 요약 최소 confidence")
+    parser.add_argument("--min-lift", type=float, default=1.5, help="규칙 요약 최소 lift")
+    parser.add_argument("--full", action="store_true", help="스냅샷과 상관없이 전체 재마이닝")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.start_run("incremental_update", args)
+
+    start = time.perf_counter()
+    update_rules(args.new, args.snapshot, workers=args.workers, min_support=args.min_support,
+                 max_len=args.max_len, full=args.full, top_n=args.top_n, backend=args.backend,
+                 min_confidence=args.min_confidence, min_lift=args.min_lift, min_count=args.min_count)
+    print(f"⏱️ {time.perf_counter() - start:.2f}s")
@@ -1,14 +1,32 @@
+import numpy as np
 import pandas as pd
-import pickle
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import CountVectorizer
 import tabulate
+import instrumentation
+from coverage_index import GroupCoverage
+from ingredient_index import load_or_build
+from ingredient_vocab import normalize_ingredients, parse_ingredients
+from medicine_data import load_medicine_info
+from rule_index import RuleIndex
+from similarity_search import make_search
 
 # Load 데이터셋과 룰
-df = pd.read_csv('data/filtered_medicine_info.csv')
+df = load_medicine_info('data/filtered_medicine_info.csv')
 
-with open('data/fp_rules.pkl', 'rb') as f:
-    fp_rules = pickle.load(f)
+# FP-Growth 규칙 인덱스 (성분 → 규칙 역색인, 모듈 로드 시 한 번만 생성)
+with instrumentation.stage("load_rule_index"):
+    rule_index = RuleIndex.load('data/fp_rules')
+
+# 제품 성분 인덱스 (저장된 인덱스 로드, 원본 변경 시에만 재생성)
+with instrumentation.stage("load_ingredient_index"):
+    ingredient_index = load_or_build('data/filtered_medicine_info.csv', 'data/ingredient_index.npz')
+
+# 유사 제품 검색 백엔드 (exact: 정확한 희소 검색, minhash: MinHash-LSH 근사 검색)
+SIMILARITY_BACKEND = "exact"
+similar_search = make_search(ingredient_index, SIMILARITY_BACKEND)
+
+# ATC 그룹별 주성분 비트셋 (확장 조합 포함 제품 비율 계산용)
+with instrumentation.stage("build_group_coverage"):
+    group_coverage = GroupCoverage(df, level='atc_3')
 
 # WHO 기반 ATC 효능 매핑 (예시 일부)
 atc_3_to_effect = {
@@ -18,68 +36,49 @@ atc_3_to_effect = {
     # 추가 필요
 }
 
-# 성분 정제 함수 (중복 제거, 소문자 통일, 공백 제거)
-def clean_ingredient_list(raw):
-    return sorted(list({i.strip().lower() for i in str(raw).split('/') if i.strip()}))
+def set_similarity_backend(backend, **options):
+    """유사 제품 검색 백엔드 교체 (예: set_similarity_backend("minhash", num_perm=64, bands=32))"""
+    global similar_search
+    similar_search = make_search(ingredient_index, backend, **options)
 
-def recommend_from_ingredients(input_ings: list):
-    input_ings = [i.strip().lower() for i in input_ings]
+# 성분 정제 함수 (공용 정규화 규칙 적용 + 중복 제거, 이름순)
+def clean_ingredient_list(raw):
+    return sorted(parse_ingredients(raw))
 
-    # 1. FP-Growth 룰 기반 추천 성분 Top 3
-    candidate_rules = []
-    for atc, rules in fp_rules.items():
-        for _, row in rules.iterrows():
-            if input_ings and row['antecedents'].issubset(set(input_ings)):
-                candidate_rules.append((atc, list(row['consequents'])[0], row['lift']))
+@instrumentation.timed()
+def recommend_from_ingredients(input_ings: list, verbose=False):
+    input_ings = normalize_ingredients(input_ings)
 
-    if candidate_rules:
-        # lift 기준 상위 3개 성분 추천
-        top_ings = sorted(candidate_rules, key=lambda x: -x[2])[:3]
-        recommended = list({item[1] for item in top_ings})
-    else:
-        recommended = []
+    # 1. FP-Growth 룰 기반 추천 성분 Top 3 (antecedent가 입력 성분에 모두 포함되는 규칙 중 lift 상위 3개)
+    recommended = rule_index.recommend(input_ings, top_n=3)
 
     # 2. 확장 조합 생성
     expanded_ings = sorted(list(set(input_ings + recommended)))
 
-    # 3. 제품 성분 벡터화
-    df['ing_list'] = df['ing_en'].fillna('').apply(lambda x: [i.strip().lower() for i in x.split('/')])
-    joined_ings = df['ing_list'].apply(lambda x: ' | '.join(x))
-    vectorizer = CountVectorizer(tokenizer=lambda x: x.split(' | '))
-    X = vectorizer.fit_transform(joined_ings)
-    expanded_vec = vectorizer.transform([' | '.join(expanded_ings)])
-
-    # 4. cosine 유사도 계산
-    cos_sim = cosine_similarity(expanded_vec, X)[0]
-    top_idx = cos_sim.argsort()[::-1][:5]
+    # 3~4. 저장된 성분 인덱스에서 확장 조합과 cosine 유사도 상위 5개 제품 검색 (설정된 검색 백엔드 사용)
+    top_idx, _ = similar_search.top_k(expanded_ings, k=5)
     similar_products = df.iloc[top_idx][['product_name', 'ing_en', 'atc_3']]
 
     # 5. 가장 많이 나온 ATC 코드 예측
     predicted_atc = similar_products['atc_3'].mode().iloc[0]
 
-    # 6. 확장 조합 포함 제품 비율 (예측된 ATC 그룹 내)
-    # 확장 조합을 정제해서 set으로 준비
-    expanded_ings = clean_ingredient_list('/'.join(input_ings + recommended))
-    expanded_set = set(expanded_ings)
-
-    # 예측 ATC 그룹 내 제품 리스트 정제
-    group_df = df[df['atc_3'] == predicted_atc].copy()
-    group_df['ing_list'] = group_df['ing_en'].fillna('').apply(clean_ingredient_list)
-
-    # 확장 조합이 포함된 제품 판별
-    group_df['has_all'] = group_df['ing_list'].apply(
-        lambda x: expanded_set.issubset(set(x))
-    )
-    # 🔍 디버깅
-    for i, row in group_df.iterrows():
-        missing = expanded_set - set(row['ing_list'])
-        if not missing:
-            print(f"✅ {row['product_name']} 포함")
-        else:
-            print(f"❌ {row['product_name']} 누락 → {missing}")
+    # 6. 확장 조합 포함 제품 비율 (예측된 ATC 그룹 내, 그룹별 성분 비트셋 AND + popcount)
+    expanded_ings = sorted(normalize_ingredients(input_ings + recommended))
+    covered, group_size = group_coverage.coverage(predicted_atc, expanded_ings)
+    instrumentation.count("products_matched", covered)
+
+    # 🔍 디버깅 (verbose=True일 때만 제품별 포함/누락 성분 출력)
+    if verbose:
+        expanded_set = set(expanded_ings)
+        for row in group_coverage.rows[predicted_atc]:
+            missing = expanded_set - set(df['ing_list'].iat[row])
+            if not missing:
+                print(f"✅ {df['product_name'].iat[row]} 포함")
+            else:
+                print(f"❌ {df['product_name'].iat[row]} 누락 → {missing}")
 
     # 비율 계산
-    coverage_percent = 100 * group_df['has_all'].sum() / len(group_df)
+    coverage_percent = 100 * covered / group_size
 
     # 7. 효능 요약
     effect = atc_3_to_effect.get(predicted_atc, '효능 정보 없음')
@@ -106,4 +105,52 @@ def recommend_from_ingredients(input_ings: list):
         'atc_internal_coverage_percent': round(coverage_percent, 2),
         'similar_products_table': table_str,
         'summary': summary
-    }
\ No newline at end of file
+    }
+
+
+@instrumentation.timed()
+def recommend_batch(baskets, top_n=3, k=5):
+    """
+    여러 성분 리스트를 한 번에 추천 (recommend_from_ingredients와 같은 규칙/검색/예측, 디버그 출력 없음)
+    규칙 매칭과 유사 제품 검색은 각각 희소 행렬곱 한 번으로 처리
+    반환: 입력 순서대로 한 행씩인 DataFrame
+    """
+    baskets = [normalize_ingredients(input_ings) for input_ings in baskets]
+
+    # 1~2. 규칙 기반 추천 성분 + 확장 조합
+    recommended = rule_index.recommend_batch(baskets, top_n=top_n)
+    expanded = [sorted(set(ings + rec)) for ings, rec in zip(baskets, recommended)]
+
+    # 3~4. 유사 제품 top k (쿼리 수 x k 행 번호)
+    top_rows, _ = similar_search.top_k_batch(expanded, k=k)
+
+    # 5. 유사 제품 중 가장 많이 나온 ATC 코드 (동점이면 코드 이름순 첫 번째 = Series.mode와 동일)
+    atc = df['atc_3'].astype('category')
+    atc_codes = atc.cat.codes.to_numpy()
+    counts = np.zeros((len(baskets), len(atc.cat.categories) + 1), dtype=np.int64)
+    np.add.at(counts, (np.arange(len(baskets))[:, None], atc_codes[top_rows] + 1), 1)
+    counts[:, 0] = 0  # 결측 코드 제외
+    predicted_codes = counts.argmax(axis=1) - 1
+    predicted_atc = [atc.cat.categories[code] if code >= 0 else None for code in predicted_codes]
+
+    # 6. 확장 조합 포함 제품 비율 (예측된 ATC 그룹 내, 그룹별 성분 비트셋 AND + popcount)
+    coverage = []
+    expanded_clean = []
+    for ings, rec, group in zip(baskets, recommended, predicted_atc):
+        combo = sorted(normalize_ingredients(ings + rec))
+        expanded_clean.append(combo)
+        covered, group_size = group_coverage.coverage(group, combo)
+        coverage.append(round(100 * covered / group_size, 2) if group_size else float('nan'))
+        instrumentation.count("products_matched", covered)
+    instrumentation.count("batch_queries", len(baskets))
+
+    product_names = df['product_name'].to_numpy()
+    return pd.DataFrame({
+        'input_ingredients': baskets,
+        'recommended_ingredients': recommended,
+        'expanded_combination': expanded_clean,
+        'predicted_atc': predicted_atc,
+        'expected_effect': [atc_3_to_effect.get(code, '효능 정보 없음') for code in predicted_atc],
+        'atc_internal_coverage_percent': coverage,
+        'similar_products': [product_names[rows].tolist() for rows in top_rows],
+    })
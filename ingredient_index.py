@@ -0,0 +1,247 @@
+import os
+from itertools import islice
+
+import numpy as np
+from scipy import sparse
+
+from ingredient_vocab import IngredientVocabulary, normalize_ingredient, parse_ingredients
+from medicine_data import MEDICINE_PATH, file_checksum, load_medicine_info, load_vocabulary
+
+"""
+제품-주성분 희소 인덱스
+전처리된 제품 목록에서 주성분 vocabulary + L2 정규화된 CSR 행렬을 한 번만 만들어 저장(.npz)
+추천 요청마다 CountVectorizer를 다시 fit하지 않고, 저장된 인덱스를 불러와 top-k cosine 검색
+같은 행렬의 열(CSC) = 성분 → 제품 번호 정렬 배열(posting list) → 성분 조합 포함 제품 검색(교집합)
+여러 쿼리는 쿼리 행렬을 만들어 희소 행렬곱 한 번으로 검색 (top_k_batch)
+성분 이름은 ingredient_vocab 정규화 기준 (제품 성분 = ing_ids, 쿼리 성분도 같은 규칙으로 정규화)
+"""
+
+INDEX_PATH = "data/ingredient_index.npz"
+INDEX_VERSION = 2  # 성분 정규화 / 행렬 구성 방식이 바뀌면 올릴 것 (저장된 인덱스 재생성)
+
+
+class IngredientIndex:
+    """
+    vocabulary: 주성분 이름 배열(열 순서)
+    matrix: (제품 수 x 주성분 수) L2 정규화된 CSR 행렬, 행 순서 = 원본 CSV 행 순서
+    """
+
+    def __init__(self, vocabulary, matrix, source_checksum=""):
+        self.vocabulary = np.asarray(vocabulary, dtype=str)
+        self.term_to_col = {term: col for col, term in enumerate(self.vocabulary.tolist())}
+        self.matrix = matrix.tocsr()
+        self.source_checksum = source_checksum
+        self.version = INDEX_VERSION
+        # 주성분(열) 기준 접근용 CSC → 쿼리 성분의 posting만 읽음
+        self._by_ingredient = self.matrix.tocsc()
+        self._by_ingredient.sort_indices()
+
+    @property
+    def n_products(self):
+        return self.matrix.shape[0]
+
+    @classmethod
+    def from_frame(cls, medicine_df, source_checksum="", vocabulary=None):
+        """
+        제품 목록 → 인덱스 (열 = vocabulary 순서 = 성분 이름순)
+        vocabulary를 주면 제품별 ing_ids를 그대로 열 번호로 사용, 없으면 ing_en에서 성분 리스트를 만들어 vocabulary 생성
+        """
+        if vocabulary is None:
+            if "ing_list" in medicine_df:
+                ing_lists = medicine_df["ing_list"]
+            else:
+                ing_lists = medicine_df["ing_en"].apply(parse_ingredients)
+            vocabulary = IngredientVocabulary.from_lists(ing_lists)
+            ing_ids = [vocabulary.encode(ings) for ings in ing_lists]
+        else:
+            ing_ids = medicine_df["ing_ids"]
+
+        # 제품별 성분은 중복 없이 정규화돼 있으므로 count는 0/1
+        lengths = np.fromiter(map(len, ing_ids), dtype=np.int64, count=len(ing_ids))
+        indptr = np.zeros(len(ing_ids) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        indices = np.concatenate(list(ing_ids)) if len(ing_ids) else np.empty(0, dtype=np.int32)
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices)), indices, indptr), shape=(len(ing_ids), len(vocabulary))
+        )
+        counts.sort_indices()
+
+        # 행별 L2 정규화
+        norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        normalized = sparse.diags(1.0 / norms) @ counts
+        return cls(vocabulary.names, normalized.tocsr(), source_checksum)
+
+    @classmethod
+    def build(cls, csv_path=MEDICINE_PATH):
+        return cls.from_frame(load_medicine_info(csv_path), file_checksum(csv_path), load_vocabulary(csv_path))
+
+    def save(self, path=INDEX_PATH):
+        np.savez(
+            path,
+            vocabulary=self.vocabulary,
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.asarray(self.matrix.shape),
+            source_checksum=np.asarray(self.source_checksum),
+            version=np.asarray(INDEX_VERSION)
+        )
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path, allow_pickle=False) as npz:
+            matrix = sparse.csr_matrix(
+                (npz["data"], npz["indices"], npz["indptr"]), shape=tuple(npz["shape"])
+            )
+            index = cls(npz["vocabulary"], matrix, str(npz["source_checksum"]))
+            index.version = int(npz["version"]) if "version" in npz else 1
+            return index
+
+    def query_columns(self, ingredients):
+        """쿼리 성분 → (열 번호, count) / vocabulary에 없는 성분은 무시"""
+        counts = {}
+        for ing in ingredients:
+            col = self.term_to_col.get(normalize_ingredient(ing))
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        cols = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        return cols, weights
+
+    def postings(self, ingredient):
+        """성분을 포함하는 제품 행 번호 (오름차순) / 없는 성분은 빈 배열"""
+        col = self.term_to_col.get(normalize_ingredient(ingredient))
+        if col is None:
+            return np.empty(0, dtype=self._by_ingredient.indices.dtype)
+        csc = self._by_ingredient
+        return csc.indices[csc.indptr[col]:csc.indptr[col + 1]]
+
+    def products_with_all(self, ingredients):
+        """
+        성분 조합을 모두 포함하는 제품 행 번호 (오름차순)
+        짧은 posting list부터 교집합 → 후보가 빠르게 줄어듦
+        """
+        lists = sorted((self.postings(ing) for ing in set(ingredients)), key=len)
+        if not lists:
+            return np.arange(self.n_products)
+        rows = lists[0]
+        for posting in lists[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, posting, assume_unique=True)
+        return rows
+
+    def top_k(self, ingredients, k=5):
+        """
+        쿼리 성분과 cosine 유사도 상위 k개 제품의 (행 번호, 유사도)
+        쿼리 성분을 가진 제품(posting)만 점수를 계산하고, argpartition으로 상위 k개 선택
+        동점은 행 번호 순
+        """
+        k = min(k, self.n_products)
+        if k <= 0:
+            return np.empty(0, dtype=self._by_ingredient.indices.dtype), np.empty(0)
+
+        cols, weights = self.query_columns(ingredients)
+        if len(cols):
+            weights = weights / np.sqrt((weights ** 2).sum())
+
+        csc = self._by_ingredient
+        starts, ends = csc.indptr[cols], csc.indptr[cols + 1]
+        if len(cols) and (ends > starts).any():
+            post_rows = np.concatenate([csc.indices[s:e] for s, e in zip(starts, ends)])
+            post_vals = np.concatenate([csc.data[s:e] * w for s, e, w in zip(starts, ends, weights)])
+            cand_rows, inverse = np.unique(post_rows, return_inverse=True)
+            cand_scores = np.bincount(inverse, weights=post_vals)
+        else:
+            cand_rows = np.empty(0, dtype=np.int64)
+            cand_scores = np.empty(0, dtype=np.float64)
+
+        if len(cand_rows) > k:
+            part = np.argpartition(-cand_scores, k - 1)[:k]
+            # 경계값과 동점인 후보까지 포함해서 행 번호 순으로 정렬
+            cutoff = cand_scores[part].min()
+            part = np.flatnonzero(cand_scores >= cutoff)
+            cand_rows, cand_scores = cand_rows[part], cand_scores[part]
+
+        order = np.lexsort((cand_rows, -cand_scores))[:k]
+        top_rows, top_scores = cand_rows[order], cand_scores[order]
+
+        return self.fill_zero_scores(top_rows, top_scores, k)
+
+    def fill_zero_scores(self, top_rows, top_scores, k):
+        """겹치는 성분이 있는 제품이 k개보다 적으면 유사도 0인 제품(행 번호 순)으로 채움"""
+        if len(top_rows) < k:
+            taken = set(top_rows.tolist())
+            fill = list(islice((row for row in range(self.n_products) if row not in taken), k - len(top_rows)))
+            top_rows = np.concatenate([top_rows, np.asarray(fill, dtype=top_rows.dtype)])
+            top_scores = np.concatenate([top_scores, np.zeros(len(fill))])
+        return top_rows, top_scores
+
+    def query_matrix(self, baskets):
+        """여러 쿼리 성분 리스트 → (쿼리 수 x 주성분 수) L2 정규화된 CSR 행렬 (query_columns와 같은 count)"""
+        rows, cols = [], []
+        for row, ingredients in enumerate(baskets):
+            for ing in ingredients:
+                col = self.term_to_col.get(normalize_ingredient(ing))
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        counts = sparse.coo_matrix(
+            (np.ones(len(rows)), (np.asarray(rows, dtype=np.int32), np.asarray(cols, dtype=np.int32))),
+            shape=(len(baskets), len(self.vocabulary))
+        ).tocsr()
+        counts.sum_duplicates()
+
+        norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return (sparse.diags(1.0 / norms) @ counts).tocsr()
+
+    def top_k_batch(self, baskets, k=5):
+        """
+        여러 쿼리의 top_k를 한 번에 계산 → (행 번호, 유사도) 배열, 각각 (쿼리 수 x k)
+        쿼리 행렬 x 제품 행렬^T 희소 행렬곱 한 번으로 전체 점수를 구하고,
+        (쿼리, -유사도, 행 번호) 정렬 후 쿼리별 앞에서 k개 선택 (top_k와 같은 순서/채움 규칙)
+        """
+        n_queries = len(baskets)
+        k = min(k, self.n_products)
+        if k <= 0:
+            return np.empty((n_queries, 0), dtype=np.int64), np.empty((n_queries, 0))
+
+        scores = (self.query_matrix(baskets) @ self.matrix.T).tocsr()
+
+        query_of = np.repeat(np.arange(n_queries), np.diff(scores.indptr))
+        order = np.lexsort((scores.indices, -scores.data, query_of))
+        rank = np.arange(len(order)) - scores.indptr[query_of[order]]
+        keep = order[rank < k]
+
+        top_rows = np.full((n_queries, k), -1, dtype=np.int64)
+        top_scores = np.zeros((n_queries, k))
+        top_rows[query_of[keep], rank[rank < k]] = scores.indices[keep]
+        top_scores[query_of[keep], rank[rank < k]] = scores.data[keep]
+
+        # 겹치는 성분이 있는 제품이 k개보다 적은 쿼리는 유사도 0인 제품으로 채움
+        for query in np.flatnonzero(top_rows[:, -1] < 0):
+            n_found = int((top_rows[query] >= 0).sum())
+            taken = set(top_rows[query, :n_found].tolist())
+            fill = list(islice((row for row in range(self.n_products) if row not in taken), k - n_found))
+            top_rows[query, n_found:] = fill
+        return top_rows, top_scores
+
+
+# 저장된 인덱스를 불러오고, 없거나 원본과 체크섬(또는 인덱스 버전)이 다르면 새로 만들어 저장
+def load_or_build(csv_path=MEDICINE_PATH, index_path=INDEX_PATH):
+    checksum = file_checksum(csv_path)
+    if os.path.exists(index_path):
+        index = IngredientIndex.load(index_path)
+        if index.source_checksum == checksum and index.version == INDEX_VERSION:
+            return index
+    index = IngredientIndex.from_frame(load_medicine_info(csv_path), checksum, load_vocabulary(csv_path))
+    index.save(index_path)
+    return index
+
+
+if __name__ == "__main__":
+    index = IngredientIndex.build(MEDICINE_PATH)
+    index.save(INDEX_PATH)
+    print(f"✅ 제품 {index.n_products}개, 주성분 {len(index.vocabulary)}개 인덱스 저장 완료 → {INDEX_PATH}")
@@ -0,0 +1,74 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+"""
+주성분 이름 정규화 + 정수 id vocabulary (모든 단계에서 같은 규칙으로 성분을 비교하기 위한 공용 모듈)
+정규화: 소문자, 공백 정리, 끝에 붙은 함량/제형/염 표기 제거 (성분 자체가 같은 표기를 하나로 합침)
+- 함량: "50%", "(10→1)"  예) cyanocobalamin powder 1% → cyanocobalamin
+- 제형: powder, granules, solution 등  예) glycyrrhiza extract powder (5→1) → glycyrrhiza extract
+- 염/수화물: hydrochloride, hydrate 등  예) lidocaine hydrochloride monohydrate → lidocaine
+이름 중간의 숫자(polysorbate 80, ginseng 30% ethanol dried extract)는 성분 이름의 일부로 보고 유지
+"""
+
+# 끝에서부터 반복 제거할 표기
+STRENGTH_SUFFIX = re.compile(r"\s*(\(\s*\d+(\.\d+)?\s*→\s*\d+(\.\d+)?\s*\)|\d+(\.\d+)?\s*%)$")
+FORM_SUFFIX = re.compile(r"\s+(dried powder|powder|granules?|suspension|solution|concentrate|triturate)$")
+SALT_SUFFIX = re.compile(r"\s+(hydrochloride|hydrobromide|hydrate|monohydrate|dihydrate|hemihydrate)$")
+
+
+def normalize_ingredient(name):
+    """주성분 이름 하나 → 정규화된 이름 (빈 값이면 '')"""
+    name = " ".join(str(name).lower().split())
+    previous = None
+    while name != previous:
+        previous = name
+        for suffix in (STRENGTH_SUFFIX, FORM_SUFFIX, SALT_SUFFIX):
+            name = suffix.sub("", name)
+    return name
+
+
+def normalize_ingredients(names):
+    """주성분 이름 리스트 → 정규화된 이름 리스트 (빈 값 제외, 중복은 처음 나온 것만)"""
+    seen = {}
+    for name in names:
+        name = normalize_ingredient(name)
+        if name:
+            seen.setdefault(name, None)
+    return list(seen)
+
+
+def parse_ingredients(raw):
+    """'/'로 구분된 주성분 문자열 → 정규화된 이름 리스트 (결측이면 빈 리스트)"""
+    if pd.isna(raw):
+        return []
+    return normalize_ingredients(str(raw).split('/'))
+
+
+class IngredientVocabulary:
+    """
+    정규화된 주성분 이름 ↔ 정수 id (이름순 정렬, id = 이름 순서)
+    names: 성분 이름 리스트, id_of: 이름 → id
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.id_of = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_lists(cls, ing_lists):
+        """정규화된 성분 리스트들 → vocabulary"""
+        return cls(sorted({ing for ings in ing_lists for ing in ings}))
+
+    def __len__(self):
+        return len(self.names)
+
+    def encode(self, ingredients):
+        """성분 이름 리스트 → id 배열 (int32, 입력 순서 유지, 정규화 후 vocabulary에 없는 성분은 제외)"""
+        ids = [self.id_of.get(normalize_ingredient(ing)) for ing in ingredients]
+        return np.fromiter((i for i in ids if i is not None), dtype=np.int32)
+
+    def decode(self, ids):
+        """id 배열 → 성분 이름 리스트"""
+        return [self.names[i] for i in ids]
@@ -0,0 +1,256 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+"""
+파이프라인 / 추천 공용 계측 (단계별 소요 시간, 카운터, 최대 메모리 → 실행마다 JSON manifest 한 개)
+- stage(name): with 블록 단위 타이머 (같은 이름은 누적)
+  메모리: 종료 시점의 프로세스 최대 메모리(rss_high_water_mb_at_exit, 앞 단계들의 최대치 포함)
+  + 단계 동안 최대 메모리가 늘어난 양(rss_high_water_growth_mb, 호출마다 누적, 동시에 실행 중인 단계끼리는 구분 안 됨)
+- timed(name): 함수 데코레이터 (호출 수 / 누적 / 최대 소요 시간, 추천처럼 자주 호출되는 함수용이라 메모리는 재지 않음)
+- count(name, value, group=None): 카운터 누적 (group을 주면 그룹별로 따로 누적, 예: 그룹별 트랜잭션 수)
+- record(name, value, group=None): 누적하지 않고 마지막 값으로 기록 (예: 제품 수, 성분 vocabulary 크기)
+계측은 항상 메모리에만 기록하고, 진입 스크립트가 start_run을 호출한 경우에만 종료 시 manifest를 저장
+(라이브러리 모듈을 import만 하는 쪽에는 파일이 생기지 않음)
+
+manifest: <manifest 폴더>/<실행 id>.json (실행 id = 시작 시각-스크립트 이름-pid)
+  스크립트 / 인자 / 커밋·플랫폼(start_run에서 한 번만 조회) / 상태(ok, error) / 전체 소요 시간 / 최대 메모리(ru_maxrss, 자식 프로세스 별도)
+  / stages / counters / per_group / profiles
+cProfile: --profile <단계 이름>(여러 개는 쉼표 구분) 또는 환경 변수 PIPELINE_PROFILE
+  → 해당 단계만 프로파일링해서 <manifest 폴더>/<실행 id>.<단계>.prof 저장 (python -m pstats로 확인)
+manifest 폴더: --manifest-dir 또는 환경 변수 PIPELINE_MANIFEST_DIR (빈 문자열이면 저장 안 함)
+"""
+
+MANIFEST_DIR = "data/run_manifests"
+MANIFEST_VERSION = 1
+MANIFEST_DIR_ENV = "PIPELINE_MANIFEST_DIR"
+PROFILE_ENV = "PIPELINE_PROFILE"
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """최대 상주 메모리(MB, ru_maxrss: Linux는 KB, macOS는 byte 단위)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit():
+    """이 저장소의 현재 커밋 (git이 없거나 저장소 밖이면 'unknown')"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def json_value(value):
+    """numpy 스칼라 등 json이 모르는 값 → 파이썬 값 (그 외는 문자열)"""
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def parse_profile(value):
+    """'mine,summarize' → {'mine', 'summarize'}"""
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+class RunRecorder:
+    """
+    한 번의 실행(프로세스)에 대한 계측 기록 (스레드 안전)
+    stages: {단계: {'seconds', 'calls', 'max_seconds', 'rss_high_water_mb_at_exit', 'rss_high_water_growth_mb'}}
+    counters: {이름: 값}, per_group: {이름: {그룹: 값}}
+    """
+
+    def __init__(self):
+        self.script = None
+        self.manifest_dir = None
+        self.profile = set()
+        self.run_id = None
+        self.git_commit = None
+        self.platform = None
+        self.started = datetime.now(timezone.utc)
+        self.start_time = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.per_group = {}
+        self.profiles = {}
+        self.error = None
+        self.lock = threading.Lock()
+        self.profiling = False
+
+    def record_stage(self, name, seconds, rss_at_start=None):
+        """rss_at_start: 단계 시작 시점의 peak_rss_mb (None이면 메모리는 기록하지 않음)"""
+        peak = peak_rss_mb() if rss_at_start is not None else None
+        with self.lock:
+            entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'max_seconds': 0.0})
+            entry['seconds'] += seconds
+            entry['calls'] += 1
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            if peak is not None:
+                entry['rss_high_water_mb_at_exit'] = peak
+                entry['rss_high_water_growth_mb'] = entry.get('rss_high_water_growth_mb', 0.0) + peak - rss_at_start
+
+    def count(self, name, value=1, group=None):
+        with self.lock:
+            if group is None:
+                self.counters[name] = self.counters.get(name, 0) + value
+            else:
+                counts = self.per_group.setdefault(name, {})
+                counts[group] = counts.get(group, 0) + value
+
+    def record(self, name, value, group=None):
+        with self.lock:
+            if group is None:
+                self.counters[name] = value
+            else:
+                self.per_group.setdefault(name, {})[group] = value
+
+    @contextmanager
+    def stage(self, name):
+        # 지정된 단계만 cProfile (프로파일러는 동시에 하나만 켤 수 있어서 중첩/다른 스레드 단계는 제외)
+        profiler = None
+        if name in self.profile and self.manifest_dir:
+            with self.lock:
+                if not self.profiling:
+                    self.profiling = True
+                    profiler = cProfile.Profile()
+        if profiler is not None:
+            profiler.enable()
+        rss_at_start = peak_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self.dump_profile(name, profiler)
+            self.record_stage(name, elapsed, rss_at_start)
+
+    def dump_profile(self, name, profiler):
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        path = os.path.join(self.manifest_dir, f"{self.run_id}.{name}.prof")
+        profiler.dump_stats(path)
+        with self.lock:
+            self.profiles[name] = path
+            self.profiling = False
+
+    def manifest(self, status="ok"):
+        with self.lock:
+            stages = {name: dict(entry) for name, entry in self.stages.items()}
+            counters = dict(self.counters)
+            per_group = {name: dict(counts) for name, counts in self.per_group.items()}
+            profiles = dict(self.profiles)
+        return {
+            'version': MANIFEST_VERSION,
+            'run_id': self.run_id,
+            'script': self.script,
+            'argv': sys.argv[1:],
+            'git_commit': self.git_commit,
+            'status': status,
+            'error': self.error,
+            'started': self.started.isoformat(timespec="seconds"),
+            'finished': datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            'seconds': time.perf_counter() - self.start_time,
+            'python': platform.python_version(),
+            'platform': self.platform,
+            'pid': os.getpid(),
+            'cpu_count': os.cpu_count(),
+            'peak_rss_mb': peak_rss_mb(),
+            'children_peak_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN),
+            'stages': stages,
+            'counters': counters,
+            'per_group': per_group,
+            'profiles': profiles,
+        }
+
+    def write_manifest(self):
+        """manifest JSON 저장 (임시 파일에 쓴 뒤 교체) → 저장 경로 (저장 안 하면 None)"""
+        if not self.manifest_dir:
+            return None
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        path = os.path.join(self.manifest_dir, f"{self.run_id}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest("error" if self.error else "ok"), f, ensure_ascii=False, indent=2,
+                      default=json_value)
+        os.replace(tmp_path, path)
+        return path
+
+
+# 프로세스 전체가 공유하는 기록 (프로세스 풀 작업자에서 기록한 값은 부모로 전달되지 않으므로 부모에서 기록)
+RUN = RunRecorder()
+
+
+def add_arguments(parser):
+    """argparse에 manifest / cProfile 옵션 추가 (기본값은 환경 변수)"""
+    parser.add_argument("--manifest-dir", default=os.environ.get(MANIFEST_DIR_ENV, MANIFEST_DIR),
+                        help="실행 manifest(JSON) 저장 폴더 (빈 문자열이면 저장 안 함)")
+    parser.add_argument("--profile", default=os.environ.get(PROFILE_ENV, ""),
+                        help="cProfile로 프로파일링할 단계 이름 (쉼표 구분)")
+
+
+def start_run(script, args=None):
+    """
+    진입 스크립트에서 한 번 호출: 실행 id를 정하고 종료 시 manifest 저장을 등록
+    args: add_arguments를 적용한 argparse 결과 (없으면 환경 변수 사용)
+    """
+    manifest_dir = getattr(args, "manifest_dir", None)
+    profile = getattr(args, "profile", None)
+    RUN.script = script
+    RUN.manifest_dir = os.environ.get(MANIFEST_DIR_ENV, MANIFEST_DIR) if manifest_dir is None else manifest_dir
+    RUN.profile = parse_profile(os.environ.get(PROFILE_ENV) if profile is None else profile)
+    RUN.run_id = f"{RUN.started.strftime('%Y%m%dT%H%M%SZ')}-{script}-{os.getpid()}"
+    # 커밋 / 플랫폼은 실행 중에 바뀌지 않으므로 한 번만 조회 (둘 다 subprocess를 띄우고, manifest()는 서비스 요청마다 호출될 수 있음)
+    RUN.git_commit = git_commit()
+    RUN.platform = platform.platform()
+
+    # 처리되지 않은 예외로 끝나면 manifest 상태를 error로 기록
+    previous_hook = sys.excepthook
+
+    def excepthook(exc_type, exc, tb):
+        RUN.error = f"{exc_type.__name__}: {exc}"
+        previous_hook(exc_type, exc, tb)
+
+    sys.excepthook = excepthook
+    atexit.register(RUN.write_manifest)
+    return RUN
+
+
+def stage(name):
+    return RUN.stage(name)
+
+
+def count(name, value=1, group=None):
+    RUN.count(name, value, group)
+
+
+def record(name, value, group=None):
+    RUN.record(name, value, group)
+
+
+def timed(name=None):
+    """함수 호출 소요 시간을 단계 name(기본: 함수 이름)으로 누적하는 데코레이터"""
+
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                RUN.record_stage(stage_name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
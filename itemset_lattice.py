@@ -0,0 +1,274 @@
+import argparse
+import itertools
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from association_02 import encode_top_n, extract_transactions, summarize_rules
+from atc_groups import get_atc_groups
+from medicine_data import MEDICINE_PATH, file_checksum, load_vocabulary
+from numpy_miner import RULE_METRICS, itemset_sets, rule_candidates, support_counts
+
+"""
+연관 규칙 임계값 탐색용 항목집합 캐시 (그룹별로 한 번만 마이닝)
+낮은 바닥 지지도(floor_support)로 그룹별 1~3개 조합 count를 구해 저장(.npz)해 두고,
+(min_support, min_confidence, min_lift, max_len) 조합마다 다시 마이닝하지 않고 캐시에서 규칙을 만듦
+- 바닥 지지도 이상 항목집합의 모든 규칙 후보 지표를 그룹별로 한 번 계산 → 임계값 조합은 배열 필터만 수행
+- 지지도 >= 바닥 지지도인 규칙의 부분집합도 모두 캐시에 있으므로 결과는 해당 임계값으로 마이닝한 것과 같음
+  (numpy_miner와 같은 방식: 그룹별 빈도 상위 top_n개 성분, max_len <= 3)
+실행: python itemset_lattice.py --support 0.05 0.1 --confidence 0.5 0.6 --lift 1.2 1.5 --max-len 2 3
+"""
+
+LATTICE_PATH = "data/itemset_lattice.npz"
+LATTICE_VERSION = 1
+FLOOR_SUPPORT = 0.02
+
+
+def support_min_count(min_support, n):
+    """support = count / n >= min_support를 만족하는 최소 count (association_02 요약의 지지도 비교와 같은 기준)"""
+    min_count = max(math.ceil(min_support * n), 1)
+    while min_count > 1 and (min_count - 1) / n >= min_support:
+        min_count -= 1
+    return min_count
+
+
+class ItemsetLattice:
+    """
+    groups: 그룹 리스트, n_transactions: 그룹별 트랜잭션 수, columns: 그룹별 성분 이름 배열(top_n개)
+    item_counts / pairs, pair_counts / triples, triple_counts: 그룹별 바닥 지지도 이상 조합 count (열 번호 기준)
+    """
+
+    def __init__(self, groups, n_transactions, columns, item_counts, pairs, pair_counts, triples, triple_counts,
+                 floor_support=FLOOR_SUPPORT, max_len=3, top_n=50, source_checksum=""):
+        self.groups = list(groups)
+        self.n_transactions = dict(zip(self.groups, n_transactions))
+        self.columns = dict(zip(self.groups, columns))
+        self.item_counts = dict(zip(self.groups, item_counts))
+        self.pairs = dict(zip(self.groups, zip(pairs, pair_counts)))
+        self.triples = dict(zip(self.groups, zip(triples, triple_counts)))
+        self.floor_support = floor_support
+        self.max_len = max_len
+        self.top_n = top_n
+        self.source_checksum = source_checksum
+        self._candidates = {}
+
+    @classmethod
+    def build(cls, group_transactions, floor_support=FLOOR_SUPPORT, max_len=3, top_n=50, source_checksum="",
+              vocabulary=None):
+        """
+        group_transactions: {ATC 그룹: 트랜잭션(주성분 id 배열) 리스트} → 그룹별 바닥 지지도 마이닝
+        vocabulary: 트랜잭션 id의 vocabulary (기본: 전체 제품 목록 vocabulary)
+        """
+        if max_len > 3:
+            raise ValueError("항목집합 캐시는 max_len <= 3만 지원합니다.")
+        fields = [[] for _ in range(7)]
+        for atc_code, transactions in group_transactions.items():
+            matrix, columns = encode_top_n(transactions, top_n, vocabulary)
+            n = matrix.shape[0]
+            c1, c2, _, (pair_i, pair_j), triples, c3 = support_counts(
+                matrix, support_min_count(floor_support, n), max_len)
+            values = (n, np.asarray(columns, dtype=str), c1, np.column_stack([pair_i, pair_j]), c2[pair_i, pair_j],
+                      triples, c3)
+            for field, value in zip(fields, values):
+                field.append(value)
+        return cls(list(group_transactions), *fields, floor_support=floor_support, max_len=max_len, top_n=top_n,
+                   source_checksum=source_checksum)
+
+    def save(self, path=LATTICE_PATH):
+        def concat(arrays, width=None):
+            offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(a) for a in arrays])
+            empty = np.empty((0, width) if width else 0, dtype=np.int64)
+            return offsets, (np.concatenate(arrays) if arrays else empty)
+
+        column_offsets, columns = concat([self.columns[g] for g in self.groups])
+        pair_offsets, pairs = concat([self.pairs[g][0] for g in self.groups], 2)
+        triple_offsets, triples = concat([self.triples[g][0] for g in self.groups], 3)
+        np.savez(
+            path,
+            groups=np.asarray(self.groups, dtype=str),
+            n_transactions=np.asarray([self.n_transactions[g] for g in self.groups], dtype=np.int64),
+            column_offsets=column_offsets,
+            columns=np.asarray(columns, dtype=str),
+            item_counts=concat([self.item_counts[g] for g in self.groups])[1],
+            pair_offsets=pair_offsets,
+            pairs=pairs,
+            pair_counts=concat([self.pairs[g][1] for g in self.groups])[1],
+            triple_offsets=triple_offsets,
+            triples=triples,
+            triple_counts=concat([self.triples[g][1] for g in self.groups])[1],
+            floor_support=np.asarray(self.floor_support),
+            max_len=np.asarray(self.max_len),
+            top_n=np.asarray(self.top_n),
+            source_checksum=np.asarray(self.source_checksum),
+            version=np.asarray(LATTICE_VERSION),
+        )
+
+    @classmethod
+    def load(cls, path=LATTICE_PATH):
+        with np.load(path, allow_pickle=False) as npz:
+            if int(npz["version"]) != LATTICE_VERSION:
+                raise ValueError(f"지원하지 않는 항목집합 캐시 버전: {int(npz['version'])}")
+
+            def split(name, offsets):
+                values, offsets = npz[name], npz[offsets]
+                return [values[s:e] for s, e in zip(offsets[:-1], offsets[1:])]
+
+            return cls(
+                npz["groups"].tolist(), npz["n_transactions"].tolist(), split("columns", "column_offsets"),
+                split("item_counts", "column_offsets"), split("pairs", "pair_offsets"),
+                split("pair_counts", "pair_offsets"), split("triples", "triple_offsets"),
+                split("triple_counts", "triple_offsets"), floor_support=float(npz["floor_support"]),
+                max_len=int(npz["max_len"]), top_n=int(npz["top_n"]), source_checksum=str(npz["source_checksum"]),
+            )
+
+    def candidates(self, group):
+        """
+        그룹의 바닥 지지도 이상 규칙 후보 (처음 요청할 때 한 번만 계산)
+        반환: (antecedent 키, consequent 키, 지표 dict, 항목집합 크기) / 후보가 없으면 None
+        """
+        if group not in self._candidates:
+            c1 = self.item_counts[group]
+            (pairs, pair_counts), (triples, triple_counts) = self.pairs[group], self.triples[group]
+            # 2개 조합 count 행렬 (빈발 2개 조합 위치만 채움)
+            c2 = np.zeros((len(c1), len(c1)), dtype=np.int64)
+            c2[pairs[:, 0], pairs[:, 1]] = pair_counts
+            c2[pairs[:, 1], pairs[:, 0]] = pair_counts
+            self._candidates[group] = rule_candidates(
+                c1, c2, pairs[:, 0], pairs[:, 1], triples, triple_counts, self.n_transactions[group])
+        return self._candidates[group]
+
+    def _check(self, min_support, max_len):
+        if min_support < self.floor_support:
+            raise ValueError(f"min_support {min_support}는 캐시 바닥 지지도 {self.floor_support}보다 작을 수 없습니다.")
+        if max_len > self.max_len:
+            raise ValueError(f"max_len {max_len}는 캐시 max_len {self.max_len}보다 클 수 없습니다.")
+
+    def _keep(self, group, min_support, min_confidence, min_lift, max_len):
+        candidates = self.candidates(group)
+        if candidates is None:
+            return None, np.empty(0, dtype=np.int64)
+        _, _, metrics, sizes = candidates
+        keep = ((metrics['support'] >= min_support) & (metrics['confidence'] >= min_confidence)
+                & (metrics['lift'] >= min_lift) & (sizes <= max_len))
+        return candidates, np.flatnonzero(keep)
+
+    def rules(self, group, min_support=0.1, min_confidence=0.0, min_lift=1.0, max_len=3):
+        """임계값을 넘는 그룹 규칙 DataFrame (association_02 / numpy_miner 규칙과 같은 컬럼)"""
+        self._check(min_support, max_len)
+        candidates, keep = self._keep(group, min_support, min_confidence, min_lift, max_len)
+        if candidates is None:
+            return pd.DataFrame(columns=['antecedents', 'consequents'] + RULE_METRICS)
+        ante, cons, metrics, _ = candidates
+        names = self.columns[group].astype(object)
+        rules = pd.DataFrame({
+            'antecedents': itemset_sets(ante[keep], names),
+            'consequents': itemset_sets(cons[keep], names),
+        })
+        for name in RULE_METRICS:
+            rules[name] = metrics[name][keep]
+        return rules
+
+    def rules_by_group(self, min_support=0.1, min_confidence=0.0, min_lift=1.0, max_len=3):
+        """{그룹: 규칙 DataFrame} (규칙이 없는 그룹 제외)"""
+        by_group = {g: self.rules(g, min_support, min_confidence, min_lift, max_len) for g in self.groups}
+        return {g: rules for g, rules in by_group.items() if not rules.empty}
+
+    def rule_counts(self, min_support=0.1, min_confidence=0.0, min_lift=1.0, max_len=3):
+        """{그룹: 임계값을 넘는 규칙 수} (규칙 DataFrame을 만들지 않고 후보 지표 배열만 필터)"""
+        self._check(min_support, max_len)
+        return {g: len(self._keep(g, min_support, min_confidence, min_lift, max_len)[1]) for g in self.groups}
+
+
+def sweep(lattice, supports, confidences, lifts, max_lens):
+    """
+    임계값 격자 전체의 그룹별 규칙 수
+    반환: 행 = (min_support, min_confidence, min_lift, max_len) 조합, 열 = 그룹 + 전체 합계(total)
+    """
+    rows = []
+    for min_support, min_confidence, min_lift, max_len in itertools.product(supports, confidences, lifts, max_lens):
+        counts = lattice.rule_counts(min_support, min_confidence, min_lift, max_len)
+        rows.append({'min_support': min_support, 'min_confidence': min_confidence, 'min_lift': min_lift,
+                     'max_len': max_len, **counts, 'total': sum(counts.values())})
+    return pd.DataFrame(rows)
+
+
+def group_transactions_for(min_count=50, csv_path=MEDICINE_PATH):
+    """association_02와 같은 그룹 선택 / 트랜잭션 (트랜잭션 없는 그룹 제외)"""
+    selected_groups, _, atc_group_cutoff, _ = get_atc_groups(min_count=min_count, level='atc_3', csv_path=csv_path)
+    group_transactions = {}
+    for atc_code, group_df in atc_group_cutoff.groupby('atc_3', sort=False, observed=True):
+        transactions = extract_transactions(group_df)
+        if transactions:
+            group_transactions[atc_code] = transactions
+    return {g: group_transactions[g] for g in selected_groups if g in group_transactions}
+
+
+# 저장된 캐시를 불러오고, 없거나 원본 체크섬 / 마이닝 설정이 다르면 새로 만들어 저장
+def load_or_build(csv_path=MEDICINE_PATH, path=LATTICE_PATH, floor_support=FLOOR_SUPPORT, max_len=3, top_n=50,
+                  min_count=50, rebuild=False):
+    checksum = f"{file_checksum(csv_path)}:{min_count}"
+    if not rebuild and os.path.exists(path):
+        with instrumentation.stage("load_lattice"):
+            lattice = ItemsetLattice.load(path)
+        if (lattice.source_checksum == checksum and lattice.floor_support == floor_support
+                and lattice.max_len == max_len and lattice.top_n == top_n):
+            return lattice
+    with instrumentation.stage("build_lattice"):
+        lattice = ItemsetLattice.build(group_transactions_for(min_count, csv_path), floor_support, max_len, top_n,
+                                       checksum, load_vocabulary(csv_path))
+        lattice.save(path)
+    return lattice
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="항목집합 캐시 기반 연관 규칙 임계값 탐색 (그룹별 규칙 수)")
+    parser.add_argument("--support", type=float, nargs="+", default=[0.1], help="min_support 후보")
+    parser.add_argument("--confidence", type=float, nargs="+", default=[0.6], help="min_confidence 후보")
+    parser.add_argument("--lift", type=float, nargs="+", default=[1.5], help="min_lift 후보")
+    parser.add_argument("--max-len", type=int, nargs="+", default=[3], help="max_len 후보 (<= 캐시 max_len)")
+    parser.add_argument("--floor-support", type=float, default=FLOOR_SUPPORT, help="캐시 마이닝 바닥 지지도")
+    parser.add_argument("--top-n", type=int, default=50, help="그룹별 마이닝에 사용할 상위 성분 수")
+    parser.add_argument("--min-count", type=int, default=50, help="마이닝 대상 ATC 그룹 최소 제품 수")
+    parser.add_argument("--rebuild", action="store_true", help="캐시를 무시하고 다시 마이닝")
+    parser.add_argument("--out", default=None, help="그룹별 규칙 수 표 저장 CSV")
+    parser.add_argument("--summary", default=None,
+                        help="임계값 조합이 하나일 때 규칙 요약 CSV 저장 (atc_rule_summary.csv 형식)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    # 캐시를 만들거나 탐색하기 전에 확인
+    if args.summary and len(args.support) * len(args.confidence) * len(args.lift) * len(args.max_len) != 1:
+        parser.error("--summary는 임계값 조합이 하나일 때만 사용할 수 있습니다.")
+    instrumentation.start_run("itemset_lattice", args)
+
+    start = time.perf_counter()
+    lattice = load_or_build(floor_support=args.floor_support, top_n=args.top_n, min_count=args.min_count,
+                            rebuild=args.rebuild)
+    loaded = time.perf_counter()
+    with instrumentation.stage("sweep"):
+        table = sweep(lattice, args.support, args.confidence, args.lift, args.max_len)
+    swept = time.perf_counter()
+    for group in lattice.groups:
+        min_count = support_min_count(lattice.floor_support, lattice.n_transactions[group])
+        n_itemsets = (np.count_nonzero(lattice.item_counts[group] >= min_count) + len(lattice.pairs[group][1])
+                      + len(lattice.triples[group][1]))
+        instrumentation.record("floor_itemsets", n_itemsets, group=group)
+    instrumentation.record("threshold_combinations", len(table))
+
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print(table.set_index(['min_support', 'min_confidence', 'min_lift', 'max_len']).T)
+    print(f"\n캐시 준비 {loaded - start:.2f}s, 임계값 조합 {len(table)}개 x 그룹 {len(lattice.groups)}개 "
+          f"탐색 {(swept - loaded) * 1000:.1f} ms")
+    if args.out:
+        table.to_csv(args.out, index=False)
+
+    if args.summary:
+        min_support, min_confidence, min_lift, max_len = table.iloc[0][['min_support', 'min_confidence', 'min_lift',
+                                                                         'max_len']]
+        rules = lattice.rules_by_group(min_support, min_confidence, min_lift, int(max_len))
+        summarize_rules(rules, lattice.groups, min_support, min_confidence, min_lift).to_csv(args.summary, index=False)
+        print(f"✅ 규칙 요약 저장 → {args.summary}")
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from ingredient_vocab import IngredientVocabulary, parse_ingredients
+
+"""
+전처리된 제품 목록(filtered_medicine_info.csv) 공용 로더
+모든 스크립트가 같은 원본(data/filtered_medicine_info.csv)을 사용하도록 경로 통일
+CSV를 매번 파싱하지 않도록 컬럼별 .npy 캐시 폴더(<CSV 이름>.cache/)를 함께 저장 (pickle 없이 로드)
+- 숫자 컬럼: 그대로 / 문자열 컬럼: 사전 인코딩 (int32 코드 + 고유값, 결측은 코드 -1)
+- 주성분: ing_ids를 CSR(offsets + ids)로, vocabulary 이름은 고유값과 같은 방식으로 저장
+- 고유값 목록은 NUL 문자로 이어 붙인 UTF-8 바이트(uint8 배열)로 저장 (고정 폭 유니코드 배열은 가장 긴 값 기준이라 너무 커짐)
+로드한 DataFrame의 컬럼 타입은 CSV를 그대로 읽은 것과 같음 (문자열 컬럼은 문자열, category 변환 없음) + 아래 컬럼 추가
+- ing_list: 정규화된 주성분 리스트 ('/' 분리 → ingredient_vocab.normalize_ingredient, 빈 값/중복 제외)
+- ing_ids: ing_list의 정수 id 배열 (전체 제품 기준 vocabulary, load_vocabulary로 같은 vocabulary를 얻음)
+원본 CSV의 체크섬이 캐시 메타데이터와 다르면 캐시를 다시 생성
+(Parquet은 pyarrow가 필요하고 import 비용 때문에 첫 로드가 CSV보다 느려서 사용하지 않음)
+"""
+
+MEDICINE_PATH = "data/filtered_medicine_info.csv"
+CACHE_VERSION = 3
+
+
+# 원본 파일 체크섬 (원본이 바뀌면 캐시/인덱스 재생성)
+def file_checksum(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_dir(csv_path=MEDICINE_PATH):
+    return os.path.splitext(csv_path)[0] + ".cache"
+
+
+def prepare_frame(medicine_df):
+    """CSV 원본 DataFrame → 주성분 리스트 / id 컬럼 추가"""
+    medicine_df = medicine_df.copy()
+    medicine_df['ing_list'] = medicine_df['ing_en'].apply(parse_ingredients)
+    vocabulary = IngredientVocabulary.from_lists(medicine_df['ing_list'])
+    medicine_df['ing_ids'] = [vocabulary.encode(ings) for ings in medicine_df['ing_list']]
+    return medicine_df
+
+
+def _save_array(path, name, array):
+    # 임시 파일에 쓴 뒤 교체 (중간에 실패해도 이전 파일이 깨지지 않음)
+    tmp_path = os.path.join(path, name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, array, allow_pickle=False)
+    os.replace(tmp_path, os.path.join(path, name))
+
+
+def _save_strings(path, name, values):
+    _save_array(path, name, np.frombuffer("\0".join(values).encode("utf-8"), dtype=np.uint8))
+
+
+def _load_strings(path, name, count):
+    values = np.load(os.path.join(path, name), allow_pickle=False).tobytes().decode("utf-8").split("\0")
+    return values if count else []
+
+
+def write_cache(medicine_df, path, checksum):
+    """prepare_frame 결과 → 컬럼별 .npy + meta.json (meta.json을 마지막에 써서 완성된 캐시만 유효)"""
+    os.makedirs(path, exist_ok=True)
+    columns = {}
+    for col in medicine_df.columns.drop(['ing_list', 'ing_ids']):
+        values = medicine_df[col]
+        if pd.api.types.is_numeric_dtype(values):
+            _save_array(path, f"{col}.npy", values.to_numpy())
+            columns[col] = None
+        else:
+            codes, uniques = pd.factorize(values)
+            _save_array(path, f"{col}.codes.npy", codes.astype(np.int32))
+            _save_strings(path, f"{col}.values.npy", list(uniques))
+            columns[col] = len(uniques)
+
+    vocabulary = IngredientVocabulary.from_lists(medicine_df['ing_list'])
+    ing_ids = medicine_df['ing_ids'].tolist()
+    offsets = np.zeros(len(ing_ids) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(ids) for ids in ing_ids])
+    _save_array(path, "ing_offsets.npy", offsets)
+    _save_array(path, "ing_ids.npy", np.concatenate(ing_ids) if ing_ids else np.empty(0, dtype=np.int32))
+    _save_strings(path, "vocabulary.npy", vocabulary.names)
+
+    tmp_path = os.path.join(path, "meta.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "source_checksum": checksum,
+            "version": CACHE_VERSION,
+            "rows": len(medicine_df),
+            "vocabulary": len(vocabulary),
+            "columns": columns,
+        }, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, "meta.json"))
+
+
+def read_cache(path, meta):
+    """캐시 폴더 → DataFrame (CSV 컬럼 순서 + ing_list, ing_ids)
+    meta['columns']: {컬럼: 고유값 수 (숫자 컬럼은 None)}
+    """
+    def load(name):
+        return np.load(os.path.join(path, name), allow_pickle=False)
+
+    data = {}
+    for col, n_values in meta["columns"].items():
+        if n_values is None:
+            data[col] = load(f"{col}.npy")
+        else:
+            codes = load(f"{col}.codes.npy")
+            # 마지막 자리에 None을 붙여서 결측 코드(-1)가 None을 가리키게 함
+            values = np.array(_load_strings(path, f"{col}.values.npy", n_values) + [None], dtype=object)
+            data[col] = values[codes]
+    medicine_df = pd.DataFrame(data)
+
+    offsets, ids = load("ing_offsets.npy"), load("ing_ids.npy")
+    names = _load_strings(path, "vocabulary.npy", meta["vocabulary"])
+    bounds = offsets.tolist()
+    flat_names = [names[i] for i in ids.tolist()]
+    medicine_df['ing_list'] = [flat_names[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    medicine_df['ing_ids'] = [ids[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    return medicine_df
+
+
+def build_cache(csv_path=MEDICINE_PATH, checksum=None):
+    with instrumentation.stage("build_cache"):
+        medicine_df = prepare_frame(pd.read_csv(csv_path))
+        write_cache(medicine_df, cache_dir(csv_path), checksum or file_checksum(csv_path))
+    instrumentation.record("products", len(medicine_df))
+    return medicine_df
+
+
+def load_medicine_info(csv_path=MEDICINE_PATH, use_cache=True):
+    """
+    전처리된 제품 목록 로드 (캐시가 최신이면 캐시에서, 아니면 CSV를 읽어 캐시 생성)
+    """
+    if not use_cache:
+        return prepare_frame(pd.read_csv(csv_path))
+
+    checksum = file_checksum(csv_path)
+    path = cache_dir(csv_path)
+    meta_path = os.path.join(path, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("source_checksum") == checksum and meta.get("version") == CACHE_VERSION:
+            with instrumentation.stage("load_cache"):
+                medicine_df = read_cache(path, meta)
+            instrumentation.record("products", len(medicine_df))
+            return medicine_df
+
+    return build_cache(csv_path, checksum)
+
+
+@lru_cache(maxsize=None)
+def load_vocabulary(csv_path=MEDICINE_PATH):
+    """제품 목록의 주성분 vocabulary (ing_ids 컬럼의 id와 같은 순서)"""
+    return IngredientVocabulary.from_lists(load_medicine_info(csv_path)['ing_list'])
+
+
+if __name__ == "__main__":
+    medicine_df = build_cache(MEDICINE_PATH)
+    print(f"✅ 제품 {len(medicine_df)}개, 주성분 {len(load_vocabulary(MEDICINE_PATH))}개 캐시 저장 완료 → "
+          f"{cache_dir(MEDICINE_PATH)}")
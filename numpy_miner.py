@@ -0,0 +1,166 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+"""
+짧은 항목집합(max_len <= 3) 전용 NumPy 벡터화 마이닝 백엔드
+그룹 원-핫 행렬 X(트랜잭션 x 성분)에 대해
+1개 조합 지지도 = X 열 합, 2개 조합 = X^T X, 3개 조합 = (빈발 2개 조합 열 곱)^T X 행렬곱으로 한 번에 계산
+연관 규칙 지표도 배열 연산으로 계산 → mlxtend fpgrowth + association_rules와 같은 스키마
+support_counts / rule_candidates는 itemset_lattice(임계값 탐색용 항목집합 캐시)에서도 사용
+"""
+
+RULE_METRICS = ['antecedent support', 'consequent support', 'support', 'confidence', 'lift',
+                'representativity', 'leverage', 'conviction', 'zhangs_metric', 'jaccard',
+                'certainty', 'kulczynski']
+
+
+def support_counts(matrix, min_count, max_len):
+    """항목집합별 등장 횟수 (성분 열 번호 기준) 와 2개 조합 count 행렬"""
+    X = matrix.toarray().astype(np.float32) if hasattr(matrix, 'toarray') else np.asarray(matrix, dtype=np.float32)
+
+    c1 = X.sum(axis=0).round().astype(np.int64)
+    c2 = (X.T @ X).round().astype(np.int64) if max_len >= 2 else np.zeros((len(c1), len(c1)), dtype=np.int64)
+
+    items1 = np.flatnonzero(c1 >= min_count)
+    pair_i, pair_j = np.nonzero(np.triu(c2 >= min_count, k=1)) if max_len >= 2 else (np.empty(0, int), np.empty(0, int))
+
+    triples = np.empty((0, 3), dtype=np.int64)
+    c3 = np.empty(0, dtype=np.int64)
+    if max_len >= 3 and len(pair_i):
+        # 빈발 2개 조합(i, j)을 모두 가진 트랜잭션 열 x 전체 성분 → 3개 조합 count (k > j만 사용)
+        both = X[:, pair_i] * X[:, pair_j]
+        counts = (both.T @ X).round().astype(np.int64)
+        counts[np.arange(X.shape[1])[None, :] <= pair_j[:, None]] = 0
+        p, k = np.nonzero(counts >= min_count)
+        triples = np.column_stack([pair_i[p], pair_j[p], k])
+        c3 = counts[p, k]
+
+    return c1, c2, items1, (pair_i, pair_j), triples, c3
+
+
+def rule_metrics(sAC, sA, sC):
+    """mlxtend association_rules와 같은 정의 (null 값 없는 경우)"""
+    confidence = sAC / sA
+    lift = confidence / sC
+    leverage = sAC - sA * sC
+
+    conviction = np.full(confidence.shape, np.inf)
+    below = confidence < 1.0
+    conviction[below] = (1.0 - sC[below]) / (1.0 - confidence[below])
+
+    denominator = np.maximum(sAC * (1 - sA), sA * (sC - sAC))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zhangs_metric = np.where(denominator == 0, 0, leverage / denominator)
+        certainty = np.where(1 - sC == 0, 0, (confidence - sC) / (1 - sC))
+
+    return {
+        'antecedent support': sA,
+        'consequent support': sC,
+        'support': sAC,
+        'confidence': confidence,
+        'lift': lift,
+        'representativity': np.ones_like(sAC),
+        'leverage': leverage,
+        'conviction': conviction,
+        'zhangs_metric': zhangs_metric,
+        'jaccard': sAC / (sA + sC - sAC),
+        'certainty': certainty,
+        'kulczynski': (sAC / sA + sAC / sC) / 2,
+    }
+
+
+def pair_key(first, second, m):
+    """antecedent/consequent(성분 1~2개) → 정수 키 (첫 열 * (m + 1) + 둘째 열 + 1, 둘째 열이 없으면 -1)"""
+    second = np.full(len(first), -1) if second is None else second
+    return first * (m + 1) + (second + 1)
+
+
+def rule_candidates(c1, c2, pair_i, pair_j, triples, c3, n):
+    """
+    빈발 2~3개 조합에서 나오는 모든 규칙 후보 (지표 필터 전)
+    c2는 (성분 x 성분) count 행렬 (빈발 2개 조합 위치만 쓰임)
+    반환: (antecedent 키, consequent 키, 지표 dict, 항목집합 크기) / 후보가 없으면 None
+    """
+    m = len(c1)
+    s1 = c1 / n
+    s2 = c2 / n
+    ante, cons, sAC, sA, sC, sizes = [], [], [], [], [], []
+
+    # 2개 조합: i → j, j → i
+    if len(pair_i):
+        pair_s = s2[pair_i, pair_j]
+        for a, c in ((pair_i, pair_j), (pair_j, pair_i)):
+            ante.append(pair_key(a, None, m))
+            cons.append(pair_key(c, None, m))
+            sAC.append(pair_s)
+            sA.append(s1[a])
+            sC.append(s1[c])
+            sizes.append(np.full(len(pair_s), 2))
+
+    # 3개 조합: 2 → 1 규칙 3개, 1 → 2 규칙 3개 (mlxtend와 같이 큰 antecedent부터)
+    if len(triples):
+        triple_s = c3 / n
+        i, j, k = triples[:, 0], triples[:, 1], triples[:, 2]
+        splits = [((i, j), (k,)), ((i, k), (j,)), ((j, k), (i,)),
+                  ((i,), (j, k)), ((j,), (i, k)), ((k,), (i, j))]
+        for a, c in splits:
+            ante.append(pair_key(a[0], a[1] if len(a) == 2 else None, m))
+            cons.append(pair_key(c[0], c[1] if len(c) == 2 else None, m))
+            sAC.append(triple_s)
+            sA.append(s1[a[0]] if len(a) == 1 else s2[a[0], a[1]])
+            sC.append(s1[c[0]] if len(c) == 1 else s2[c[0], c[1]])
+            sizes.append(np.full(len(triple_s), 3))
+
+    if not ante:
+        return None
+    metrics = rule_metrics(np.concatenate(sAC), np.concatenate(sA), np.concatenate(sC))
+    return np.concatenate(ante), np.concatenate(cons), metrics, np.concatenate(sizes)
+
+
+def itemset_sets(keys, names):
+    """pair_key 배열 → frozenset 배열 (서로 다른 키마다 frozenset을 한 번만 생성)"""
+    m = len(names)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    first, second = unique_keys // (m + 1), unique_keys % (m + 1) - 1
+    sets = np.empty(len(unique_keys), dtype=object)
+    sets[:] = [frozenset((names[a],) if b < 0 else (names[a], names[b])) for a, b in zip(first, second)]
+    return sets[inverse]
+
+
+def mine_itemsets_and_rules(matrix, columns, min_support=0.1, max_len=3, metric='lift', min_threshold=1.0):
+    """
+    matrix: (트랜잭션 x 성분) 0/1 행렬 (scipy 희소 행렬 또는 ndarray), columns: 성분 이름
+    반환: (빈발 항목집합 DataFrame[support, itemsets], 연관 규칙 DataFrame[antecedents, consequents, 지표...])
+    """
+    if max_len is None or max_len > 3:
+        raise ValueError("numpy 백엔드는 max_len <= 3만 지원합니다.")
+
+    n = matrix.shape[0]
+    # fpgrowth와 같은 최소 count 기준
+    min_count = math.ceil(min_support * n)
+    c1, c2, items1, (pair_i, pair_j), triples, c3 = support_counts(matrix, min_count, max_len)
+    names = np.asarray(columns, dtype=object)
+
+    # 빈발 항목집합 (크기 → 열 번호 순)
+    itemsets = [frozenset([names[i]]) for i in items1]
+    itemsets += [frozenset([names[i], names[j]]) for i, j in zip(pair_i, pair_j)]
+    itemsets += [frozenset(names[t]) for t in triples]
+    supports = np.concatenate([c1[items1], c2[pair_i, pair_j], c3]) / n
+    freq_items = pd.DataFrame({'support': supports, 'itemsets': itemsets})
+
+    # 규칙 후보: antecedent/consequent는 (첫 열, 둘째 열 또는 -1) 정수 키로 표현
+    candidates = rule_candidates(c1, c2, pair_i, pair_j, triples, c3, n)
+    if candidates is None:
+        return freq_items, pd.DataFrame(columns=['antecedents', 'consequents'] + RULE_METRICS)
+
+    ante, cons, metrics, _ = candidates
+    keep = np.flatnonzero(metrics[metric] >= min_threshold)
+    rules = pd.DataFrame({
+        'antecedents': itemset_sets(ante[keep], names),
+        'consequents': itemset_sets(cons[keep], names),
+    })
+    for name in RULE_METRICS:
+        rules[name] = metrics[name][keep]
+    return freq_items, rules
@@ -0,0 +1,158 @@
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import Customer_medicine_recommand as symptom_rec
+import ing_recommendation as ing_rec
+import instrumentation
+
+"""
+의약품 추천 로컬 HTTP 서비스 (키오스크 프론트엔드용, 외부 서비스 없이 로컬에서만 동작)
+제품 목록 / 규칙 인덱스 / 성분 인덱스는 모듈 import 시 한 번만 로드해서 모든 요청이 공유 (읽기 전용)
+요청은 ThreadingHTTPServer가 스레드별로 동시에 처리
+
+엔드포인트 (응답은 모두 JSON)
+- GET  /symptom?q=두통                       : 증상 기반 효능별 제품 목록
+- GET  /ingredients?q=acetaminophen,caffeine  : 성분 기반 추천 (쉼표 구분)
+- POST /ingredients  {"ingredients": [...]}   : 성분 기반 추천
+- GET  /stats                                 : 엔드포인트별 요청 수, p50/p99 지연시간(ms)
+- GET  /run                                   : 현재 실행의 계측 기록 (instrumentation manifest 형식, 종료 시 파일로 저장)
+- GET  /health
+실행: python recommend_server.py --port 8000
+"""
+
+LATENCY_WINDOW = 10000  # 지연시간 통계에 사용할 최근 요청 수
+
+
+class LatencyStats:
+    """엔드포인트별 최근 요청 지연시간 (스레드 안전)"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self.lock:
+            self.samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+
+    def summary(self):
+        with self.lock:
+            snapshot = {endpoint: np.array(s) for endpoint, s in self.samples.items()}
+            counts = dict(self.counts)
+        return {
+            endpoint: {
+                'requests': counts[endpoint],
+                'p50_ms': round(float(np.percentile(s, 50)) * 1000, 3),
+                'p99_ms': round(float(np.percentile(s, 99)) * 1000, 3),
+            }
+            for endpoint, s in snapshot.items()
+        }
+
+
+def symptom_response(symptom_keyword):
+    result = symptom_rec.recommend_by_symptom(symptom_keyword)
+    if result is None:
+        return 404, {'error': f"'{symptom_keyword}'에 해당하는 등록된 효능이 없습니다."}
+    return 200, result
+
+
+def ingredient_response(ingredients):
+    ingredients = [i for i in ingredients if i.strip()]
+    if not ingredients:
+        return 400, {'error': '성분을 하나 이상 입력하세요.'}
+    result = ing_rec.recommend_from_ingredients(ingredients)
+    result['predicted_atc'] = str(result['predicted_atc'])
+    return 200, result
+
+
+class RecommendHandler(BaseHTTPRequestHandler):
+    stats = LatencyStats()
+
+    def send_json(self, status, body):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def handle_timed(self, endpoint, handler, *args):
+        start = time.perf_counter()
+        try:
+            status, body = handler(*args)
+        except Exception as e:
+            status, body = 500, {'error': str(e)}
+        self.stats.record(endpoint, time.perf_counter() - start)
+        self.send_json(status, body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query).get('q', [''])[0]
+
+        if url.path == '/symptom':
+            self.handle_timed('symptom', symptom_response, query.strip())
+        elif url.path == '/ingredients':
+            self.handle_timed('ingredients', ingredient_response, query.split(','))
+        elif url.path == '/stats':
+            self.send_json(200, self.stats.summary())
+        elif url.path == '/run':
+            self.send_json(200, instrumentation.RUN.manifest())
+        elif url.path == '/health':
+            self.send_json(200, {'status': 'ok'})
+        else:
+            self.send_json(404, {'error': f'알 수 없는 경로: {url.path}'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/ingredients':
+            self.send_json(404, {'error': f'알 수 없는 경로: {self.path}'})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            ingredients = list(body.get('ingredients', []))
+        except (ValueError, AttributeError, TypeError):
+            self.send_json(400, {'error': '요청 본문은 {"ingredients": [...]} 형식의 JSON이어야 합니다.'})
+            return
+        self.handle_timed('ingredients', ingredient_response, ingredients)
+
+    def log_message(self, format, *args):
+        # 요청마다 stderr 로그를 남기지 않음 (지연시간은 /stats로 확인)
+        pass
+
+
+def make_server(host='127.0.0.1', port=8000):
+    server = ThreadingHTTPServer((host, port), RecommendHandler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="의약품 추천 로컬 HTTP 서비스")
+    parser.add_argument("--host", default="127.0.0.1", help="바인딩 주소 (기본: 로컬 전용)")
+    parser.add_argument("--port", type=int, default=8000)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.start_run("recommend_server", args)
+
+    server = make_server(args.host, args.port)
+    print(f"💊 추천 서비스 시작: http://{args.host}:{server.server_port} (종료: Ctrl+C)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        summary = RecommendHandler.stats.summary()
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        # 엔드포인트별 지연시간 통계도 manifest에 함께 기록
+        for endpoint, stats in summary.items():
+            for name, value in stats.items():
+                instrumentation.record(name, value, group=endpoint)
+        server.server_close()
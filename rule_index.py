@@ -0,0 +1,146 @@
+import numpy as np
+from scipy import sparse
+
+from rule_store import STORE_PATH, RuleStore
+
+"""
+FP-Growth 연관 규칙 조회 인덱스
+규칙 저장 폴더(rule_store)를 한 번만 읽어서 성분 → 규칙 번호 역색인(posting list)과 antecedent 크기 배열로 압축
+입력 성분 집합이 antecedent를 모두 포함하는 규칙 = 입력 성분 posting에서 등장 횟수가 antecedent 크기와 같은 규칙
+→ 입력 성분이 언급된 규칙만 확인 (전체 규칙 iterrows 불필요)
+여러 입력은 (입력 x 성분) 행렬 x (규칙 x 성분) antecedent 행렬^T 행렬곱 한 번으로 같은 등장 횟수를 계산
+"""
+
+RULES_PATH = STORE_PATH
+
+
+class RuleIndex:
+    """
+    규칙 번호 순서 = fp_rules의 그룹 순서 → 그룹 내 규칙 순서 (기존 전체 스캔 순서와 동일)
+    atc: 규칙별 ATC 그룹, consequent: 규칙별 대표 추천 성분, lift: 규칙별 향상도
+    antecedent_size: 규칙별 antecedent 성분 수, postings: 성분 → 해당 성분이 antecedent에 있는 규칙 번호 배열
+    antecedents: (규칙 수 x 성분 수) 0/1 희소 행렬, 열 순서 = ingredients
+    """
+
+    def __init__(self, fp_rules):
+        atc, consequent, lift, antecedent_size = [], [], [], []
+        postings = {}
+        rule_id = 0
+        for atc_code, rules in fp_rules.items():
+            for antecedents, consequents, rule_lift in zip(rules['antecedents'], rules['consequents'], rules['lift']):
+                atc.append(atc_code)
+                # consequent가 여러 개인 규칙은 이름순 첫 성분을 대표로 사용 (frozenset 순서는 실행마다 달라짐)
+                consequent.append(min(consequents))
+                lift.append(rule_lift)
+                antecedent_size.append(len(antecedents))
+                for ing in antecedents:
+                    postings.setdefault(ing, []).append(rule_id)
+                rule_id += 1
+
+        self._set_arrays(atc, consequent, lift, antecedent_size,
+                         {ing: np.asarray(ids, dtype=np.int32) for ing, ids in postings.items()})
+
+    def _set_arrays(self, atc, consequent, lift, antecedent_size, postings):
+        self.atc = np.asarray(atc, dtype=object)
+        self.consequent = np.asarray(consequent, dtype=object)
+        self.lift = np.asarray(lift, dtype=np.float64)
+        self.antecedent_size = np.asarray(antecedent_size, dtype=np.int32)
+        self.postings = postings
+
+        self.ingredients = list(self.postings)
+        self.ing_to_col = {ing: col for col, ing in enumerate(self.ingredients)}
+        rule_ids = np.concatenate([ids for ids in self.postings.values()]) if self.postings else np.empty(0, np.int32)
+        cols = np.repeat(np.arange(len(self.ingredients)), [len(ids) for ids in self.postings.values()])
+        self.antecedents = sparse.csr_matrix(
+            (np.ones(len(rule_ids), dtype=np.int32), (rule_ids, cols)),
+            shape=(len(self.lift), len(self.ingredients))
+        )
+
+    @classmethod
+    def from_store(cls, store):
+        """
+        규칙 저장 폴더의 배열에서 바로 생성 (frozenset/DataFrame을 만들지 않음)
+        vocabulary가 이름순이므로 consequent 대표 성분 = consequent 성분 집합의 첫 id (id 오름차순 저장)
+        """
+        n_rules = store.n_rules
+        vocabulary = np.asarray(store.vocabulary).astype(object)
+        itemset_offsets = np.asarray(store.itemset_offsets)
+        itemset_items = np.asarray(store.itemset_items)
+        itemset_size = np.diff(itemset_offsets)
+        antecedents = np.asarray(store.antecedents)
+        antecedent_size = itemset_size[antecedents]
+        # 규칙별 antecedent 성분 id (규칙 순서대로 이어 붙임)
+        antecedent_starts = np.repeat(itemset_offsets[:-1][antecedents] - np.r_[0, np.cumsum(antecedent_size)[:-1]],
+                                      antecedent_size)
+        antecedent_items = itemset_items[antecedent_starts + np.arange(len(antecedent_starts))]
+
+        atc = np.repeat(np.asarray(store.groups, dtype=object), np.diff(store.group_offsets))
+        # consequent 성분 집합의 첫 성분 = 최소 id
+        consequent = vocabulary[itemset_items[itemset_offsets[:-1][np.asarray(store.consequents)]]] \
+            if n_rules else np.empty(0, dtype=object)
+
+        # antecedent 성분 id별로 규칙 번호 모으기 (안정 정렬 → 규칙 번호 오름차순 유지)
+        rule_of_item = np.repeat(np.arange(n_rules, dtype=np.int32), antecedent_size)
+        order = np.argsort(antecedent_items, kind='stable')
+        items, rule_ids = antecedent_items[order], rule_of_item[order]
+        starts = np.flatnonzero(np.r_[True, items[1:] != items[:-1]]) if len(items) else np.empty(0, dtype=np.int64)
+        ends = np.r_[starts[1:], len(items)]
+        postings = {vocabulary[items[s]]: rule_ids[s:e] for s, e in zip(starts, ends)}
+
+        index = cls.__new__(cls)
+        index._set_arrays(atc, consequent, np.asarray(store.metric('lift')), antecedent_size, postings)
+        return index
+
+    @classmethod
+    def load(cls, path=RULES_PATH):
+        """규칙 저장 폴더에서 로드 (기존 fp_rules.pkl은 rule_store CLI로 먼저 변환)"""
+        return cls.from_store(RuleStore(path))
+
+    def __len__(self):
+        return len(self.lift)
+
+    def match(self, input_ings):
+        """antecedent가 입력 성분 집합에 모두 포함되는 규칙 번호 (오름차순)"""
+        lists = [self.postings[ing] for ing in set(input_ings) if ing in self.postings]
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+        rule_ids, hits = np.unique(np.concatenate(lists), return_counts=True)
+        return rule_ids[hits == self.antecedent_size[rule_ids]]
+
+    def candidate_rules(self, input_ings):
+        """기존 전체 스캔과 같은 (atc, 추천 성분, lift) 튜플 리스트"""
+        rule_ids = self.match(input_ings)
+        return list(zip(self.atc[rule_ids], self.consequent[rule_ids], self.lift[rule_ids]))
+
+    def recommend(self, input_ings, top_n=3):
+        """lift 기준 상위 top_n개 규칙의 추천 성분 (중복 제거, lift 순서 유지)"""
+        rule_ids = self.match(input_ings)
+        # lift 내림차순, 동점은 규칙 번호 순 (기존 sorted(..., key=-lift)와 동일한 안정 정렬)
+        top = rule_ids[np.argsort(-self.lift[rule_ids], kind='stable')[:top_n]]
+        return list(dict.fromkeys(self.consequent[top]))
+
+    def recommend_batch(self, baskets, top_n=3):
+        """
+        여러 입력 성분 리스트의 recommend 결과 리스트
+        입력별 antecedent 성분 등장 횟수 = 입력 행렬 x antecedent 행렬^T → antecedent 크기와 같으면 매칭
+        """
+        rows, cols = [], []
+        for row, input_ings in enumerate(baskets):
+            for ing in set(input_ings):
+                col = self.ing_to_col.get(ing)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        queries = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(baskets), len(self.ingredients))
+        )
+        hits = (queries @ self.antecedents.T).tocoo()
+        matched = hits.data == self.antecedent_size[hits.col]
+        query_ids, rule_ids = hits.row[matched], hits.col[matched]
+
+        # 입력 번호 → lift 내림차순 → 규칙 번호 순으로 정렬 후 입력별 앞에서 top_n개
+        order = np.lexsort((rule_ids, -self.lift[rule_ids], query_ids))
+        query_ids, rule_ids = query_ids[order], rule_ids[order]
+        starts = np.searchsorted(query_ids, np.arange(len(baskets)))
+        ends = np.minimum(np.searchsorted(query_ids, np.arange(len(baskets)), side='right'), starts + top_n)
+        return [list(dict.fromkeys(self.consequent[rule_ids[s:e]])) for s, e in zip(starts, ends)]
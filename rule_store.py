@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+"""
+연관 규칙 저장 형식 (fp_rules.pkl 대체)
+그룹별 DataFrame(frozenset 컬럼) pickle 대신 폴더 하나에 평평한 배열(.npy) + meta.json으로 저장
+- vocabulary.npy: 성분 이름 (이름순, 규칙에서는 정수 id로 참조)
+- itemset_offsets.npy / itemset_items.npy: 고유 성분 집합 s = items[offsets[s]:offsets[s + 1]] (성분 id 오름차순)
+  (antecedent / consequent에 같은 집합이 반복되므로 한 번만 저장)
+- antecedents.npy / consequents.npy: 규칙별 성분 집합 번호 (고유 집합이 65536개 미만이면 uint16, 아니면 int32)
+- metric_<이름>.npy: support / confidence / lift 등 규칙 지표 (float64, 규칙 순서)
+- group_offsets.npy: ATC 그룹 g의 규칙 = [group_offsets[g], group_offsets[g + 1]), 그룹 이름/순서는 meta.json
+pickle을 쓰지 않으므로 신뢰할 수 없는 파일도 안전하게 읽을 수 있고(allow_pickle=False),
+배열은 memory-map으로 열어서 필요한 그룹만 잘라 읽음
+읽을 때 성분 집합 번호별 frozenset을 한 번만 만들어 재사용 (같은 집합의 규칙은 같은 frozenset 객체를 공유)
+"""
+
+STORE_PATH = "data/fp_rules"
+FORMAT_NAME = "atc-rule-store"
+FORMAT_VERSION = 2
+ITEM_COLUMNS = ['antecedents', 'consequents']
+
+
+def metric_file(name):
+    return "metric_" + name.replace(" ", "_") + ".npy"
+
+
+def _save_array(path, name, array):
+    # 임시 파일에 쓰고 교체 → 기존 파일을 memory-map으로 열어 둔 reader가 깨지지 않음
+    tmp_path = os.path.join(path, name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, array, allow_pickle=False)
+    os.replace(tmp_path, os.path.join(path, name))
+
+
+def _encode_itemsets(itemsets, ids, table):
+    """frozenset 리스트 → 성분 집합 번호 배열 (table: {성분 id tuple: 번호}, 새 집합은 뒤에 추가)"""
+    numbers = {}
+    encoded = np.empty(len(itemsets), dtype=np.int32)
+    for i, itemset in enumerate(itemsets):
+        # 같은 frozenset 객체는 정렬/조회를 한 번만 함
+        number = numbers.get(itemset)
+        if number is None:
+            number = numbers[itemset] = table.setdefault(tuple(sorted(ids[ing] for ing in itemset)), len(table))
+        encoded[i] = number
+    return encoded
+
+
+def write_rule_store(rules_by_group, path=STORE_PATH):
+    """
+    {ATC 그룹: 규칙 DataFrame[antecedents, consequents, 지표...]} → 규칙 저장 폴더
+    지표 컬럼은 첫 그룹 기준 (association_02 / numpy_miner 결과는 모든 그룹이 같은 컬럼)
+    """
+    groups = list(rules_by_group)
+    frames = [rules_by_group[g] for g in groups]
+    metrics = [c for c in frames[0].columns if c not in ITEM_COLUMNS] if frames else []
+
+    vocabulary = sorted({ing for f in frames for col in ITEM_COLUMNS for itemset in f[col] for ing in itemset})
+    ids = {ing: i for i, ing in enumerate(vocabulary)}
+
+    group_offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+    group_offsets[1:] = np.cumsum([len(f) for f in frames])
+    arrays = {"vocabulary.npy": np.asarray(vocabulary, dtype=str), "group_offsets.npy": group_offsets}
+    table = {}
+    for col in ITEM_COLUMNS:
+        arrays[f"{col}.npy"] = _encode_itemsets([itemset for f in frames for itemset in f[col]], ids, table)
+    if len(table) <= np.iinfo(np.uint16).max:
+        for col in ITEM_COLUMNS:
+            arrays[f"{col}.npy"] = arrays[f"{col}.npy"].astype(np.uint16)
+    itemset_offsets = np.zeros(len(table) + 1, dtype=np.int64)
+    itemset_offsets[1:] = np.cumsum([len(items) for items in table])
+    arrays["itemset_offsets.npy"] = itemset_offsets
+    arrays["itemset_items.npy"] = np.fromiter((i for items in table for i in items), dtype=np.int32,
+                                              count=int(itemset_offsets[-1]))
+    for name in metrics:
+        values = [f[name].to_numpy(dtype=np.float64) for f in frames]
+        arrays[metric_file(name)] = np.concatenate(values) if values else np.empty(0)
+
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        _save_array(path, name, array)
+
+    # meta.json은 배열을 모두 쓴 뒤 마지막에 교체
+    meta = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "groups": groups,
+        "metrics": metrics,
+        "rules": int(group_offsets[-1]),
+        "itemsets": len(table),
+        "vocabulary": len(vocabulary),
+    }
+    tmp_path = os.path.join(path, "meta.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(path, "meta.json"))
+
+
+class RuleStore:
+    """
+    규칙 저장 폴더 reader (그룹 → 규칙 DataFrame 읽기 전용 mapping처럼 사용)
+    mmap=True면 배열을 memory-map으로 열고, 그룹 DataFrame은 요청한 그룹만 만들어 반환
+    """
+
+    def __init__(self, path=STORE_PATH, mmap=True):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_NAME or meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 규칙 저장 형식: {meta.get('format')} v{meta.get('version')} "
+                             f"(association_02.py를 다시 실행해서 v{FORMAT_VERSION}로 저장)")
+
+        self.path = path
+        self.mmap = mmap
+        load = self._load
+        self.groups = meta["groups"]
+        self.metrics = meta["metrics"]
+        self.vocabulary = load("vocabulary.npy")
+        self.group_offsets = load("group_offsets.npy")
+        self.itemset_offsets = load("itemset_offsets.npy")
+        self.itemset_items = load("itemset_items.npy")
+        self.antecedents = load("antecedents.npy")
+        self.consequents = load("consequents.npy")
+        self._metrics = {}  # 지표 배열은 처음 쓸 때 읽음
+        self._group_no = {g: i for i, g in enumerate(self.groups)}
+        self._names = None
+        self._itemsets = {}
+
+    def _load(self, name):
+        return np.load(os.path.join(self.path, name), mmap_mode="r" if self.mmap else None, allow_pickle=False)
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __iter__(self):
+        return iter(self.groups)
+
+    def __contains__(self, group):
+        return group in self._group_no
+
+    def __getitem__(self, group):
+        return self.group_frame(group)
+
+    @property
+    def n_rules(self):
+        return int(self.group_offsets[-1])
+
+    def group_range(self, group):
+        """그룹의 규칙 번호 범위 [start, end)"""
+        g = self._group_no[group]
+        return int(self.group_offsets[g]), int(self.group_offsets[g + 1])
+
+    def metric(self, name):
+        if name not in self._metrics:
+            if name not in self.metrics:
+                raise KeyError(name)
+            self._metrics[name] = self._load(metric_file(name))
+        return self._metrics[name]
+
+    def names(self):
+        """성분 이름 object 배열 (처음 쓸 때 한 번만 만듦, 같은 성분은 같은 str 객체를 공유)"""
+        if self._names is None:
+            self._names = np.array(self.vocabulary.tolist(), dtype=object)
+        return self._names
+
+    def itemset(self, number):
+        """성분 집합 번호 → frozenset (번호별로 한 번만 만듦)"""
+        itemset = self._itemsets.get(number)
+        if itemset is None:
+            start, end = self.itemset_offsets[number], self.itemset_offsets[number + 1]
+            itemset = self._itemsets[number] = frozenset(self.names()[self.itemset_items[start:end]].tolist())
+        return itemset
+
+    def itemsets(self, kind, start, end):
+        """kind: 'antecedents' / 'consequents' → 규칙 [start, end)의 frozenset object 배열"""
+        numbers, inverse = np.unique(getattr(self, kind)[start:end], return_inverse=True)
+        unique = np.empty(len(numbers), dtype=object)
+        unique[:] = [self.itemset(number) for number in numbers.tolist()]
+        return unique[inverse]
+
+    def group_frame(self, group):
+        """그룹 하나의 규칙 DataFrame (fp_rules.pkl의 그룹 DataFrame과 같은 컬럼)"""
+        start, end = self.group_range(group)
+        columns = {kind: self.itemsets(kind, start, end) for kind in ITEM_COLUMNS}
+        columns.update((name, np.array(self.metric(name)[start:end])) for name in self.metrics)
+        return pd.DataFrame(columns)
+
+    def to_dict(self):
+        return {group: self.group_frame(group) for group in self.groups}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="fp_rules.pkl(그룹별 규칙 DataFrame pickle) → 규칙 저장 폴더 변환")
+    parser.add_argument("pickle_path", help="변환할 pickle 파일 (신뢰할 수 있는 파일만)")
+    parser.add_argument("--out", default=STORE_PATH, help="규칙 저장 폴더")
+    args = parser.parse_args()
+
+    with open(args.pickle_path, "rb") as f:
+        rules_by_group = pickle.load(f)
+    write_rule_store(rules_by_group, args.out)
+    store = RuleStore(args.out)
+    print(f"✅ 그룹 {len(store)}개, 규칙 {store.n_rules}개, 성분 {len(store.vocabulary)}개 저장 완료 → {args.out}")
@@ -0,0 +1,107 @@
+import numpy as np
+
+"""
+유사 제품 검색 백엔드 (성분 조합 → cosine 유사도 상위 k개 제품)
+- exact: IngredientIndex의 희소 posting 기반 정확 검색 (기본값)
+- minhash: 주성분 집합 MinHash-LSH로 후보 제품을 뽑고, 후보만 정확한 cosine으로 다시 정렬 (근사 검색)
+두 백엔드 모두 top_k(ingredients, k) / top_k_batch(baskets, k) → (행 번호, 유사도) 를 제공
+제품 수가 크게 늘어날 때 후보 수를 제한하기 위한 실험용 백엔드, 결과는 exact와 다를 수 있음 (recall@k는 benchmarks/bench_similarity_search.py)
+측정한 규모(실제 제품 1x / 합성 10x)에서는 exact가 더 빠르고 정확해서 추천 서비스에는 노출하지 않음
+"""
+
+BACKENDS = ["exact", "minhash"]
+MERSENNE_PRIME = (1 << 31) - 1
+HASH_CHUNK = 8
+
+
+class MinHashLSH:
+    """
+    index: IngredientIndex (제품 x 주성분 행렬, vocabulary 공유)
+    num_perm: MinHash 해시 함수 수, bands: LSH 밴드 수 (밴드당 num_perm // bands개 값)
+    (밴드 키 정렬 배열, 제품 행 번호) 를 저장 → 쿼리 밴드 키를 이진 탐색해서 같은 버킷의 제품을 후보로 사용
+    """
+
+    def __init__(self, index, num_perm=64, bands=32, seed=0):
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        self.index = index
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+
+        # 성분 열 번호 → 해시값 (a * x + b) mod p, 해시 함수별 한 행
+        rng = np.random.default_rng(seed)
+        a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        cols = np.arange(len(index.vocabulary), dtype=np.int64)
+        self.hashes = (a[:, None] * cols[None, :] + b[:, None]) % MERSENNE_PRIME
+        # 밴드 값들을 하나의 uint64 키로 섞기 위한 계수
+        self.band_mix = rng.integers(1, 1 << 62, size=self.rows_per_band, dtype=np.int64).astype(np.uint64)
+
+        matrix = index.matrix
+        nonempty = np.flatnonzero(np.diff(matrix.indptr) > 0)
+        # 제품별 성분 해시 최솟값 = MinHash 서명 (해시 함수 HASH_CHUNK개씩 계산해서 메모리 제한)
+        signatures = np.vstack([
+            np.minimum.reduceat(self.hashes[i:i + HASH_CHUNK, matrix.indices], matrix.indptr[nonempty], axis=1)
+            for i in range(0, num_perm, HASH_CHUNK)
+        ]).T
+
+        # 밴드 키에 밴드별 salt를 더해 하나의 정렬 배열로 저장 → 모든 밴드를 searchsorted 한 번으로 조회
+        self.band_salt = rng.integers(1, 1 << 62, size=bands, dtype=np.int64).astype(np.uint64)
+        keys = self.band_keys(signatures).ravel()
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.rows = np.repeat(nonempty, bands)[order]
+
+    def band_keys(self, signatures):
+        """(n x num_perm) 서명 → (n x bands) 밴드 키 (밴드 값들을 섞은 uint64 + 밴드 salt)"""
+        n = signatures.shape[0]
+        grouped = signatures.astype(np.uint64).reshape(n, self.bands, self.rows_per_band)
+        return (grouped * self.band_mix).sum(axis=2) + self.band_salt
+
+    def candidates(self, cols):
+        """쿼리 성분 열 번호 → 적어도 한 밴드가 같은 버킷에 들어간 제품 행 번호"""
+        signature = self.hashes[:, cols].min(axis=1)
+        query_keys = self.band_keys(signature[None, :])[0]
+        lo = np.searchsorted(self.keys, query_keys)
+        hi = np.searchsorted(self.keys, query_keys, side='right')
+        found = [self.rows[s:e] for s, e in zip(lo, hi) if e > s]
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def top_k(self, ingredients, k=5):
+        """후보 제품만 cosine 유사도를 계산해서 상위 k개 (동점은 행 번호 순, 부족하면 유사도 0인 제품으로 채움)"""
+        cols, weights = self.index.query_columns(ingredients)
+        k = min(k, self.index.n_products)
+        cand_rows = self.candidates(cols) if len(cols) else np.empty(0, dtype=np.int64)
+
+        if len(cand_rows):
+            query = np.zeros(len(self.index.vocabulary))
+            query[cols] = weights / np.sqrt((weights ** 2).sum())
+            cand_scores = self.index.matrix[cand_rows] @ query
+            keep = cand_scores > 0
+            cand_rows, cand_scores = cand_rows[keep], cand_scores[keep]
+        else:
+            cand_scores = np.empty(0, dtype=np.float64)
+
+        order = np.lexsort((cand_rows, -cand_scores))[:k]
+        return self.index.fill_zero_scores(cand_rows[order], cand_scores[order], k)
+
+    def top_k_batch(self, baskets, k=5):
+        """여러 쿼리의 top_k → (쿼리 수 x k) 행 번호/유사도 배열 (쿼리별 top_k 반복, exact와 같은 인터페이스용)"""
+        results = [self.top_k(ingredients, k) for ingredients in baskets]
+        k = min(k, self.index.n_products)
+        top_rows = np.array([rows for rows, _ in results], dtype=np.int64).reshape(len(baskets), k)
+        top_scores = np.array([scores for _, scores in results], dtype=np.float64).reshape(len(baskets), k)
+        return top_rows, top_scores
+
+
+def make_search(index, backend="exact", **options):
+    """
+    유사 제품 검색 백엔드 생성
+    exact: index 자체 (IngredientIndex.top_k / top_k_batch), minhash: MinHashLSH(index, **options)
+    """
+    if backend == "exact":
+        return index
+    if backend == "minhash":
+        return MinHashLSH(index, **options)
+    raise ValueError(f"알 수 없는 유사 검색 백엔드: {backend} (가능: {', '.join(BACKENDS)})")